@@ -0,0 +1,407 @@
+# الملف: core/circuit_breaker.py
+"""
+⚡ Circuit Breaker حوالين كل عمليات MongoDB
+- بيفتح (open) بعد عدد فشل/بطء متتالي - وطول ما هو مفتوح الـ Repository بيقرا ويكتب من SQLite فوراً
+- بيجرب يرجع (half_open) بـ ping في الخلفية بـ exponential backoff
+- مهلة لكل عملية (collection.method) بتتعلم من الأوقات الفعلية (EWMA) بين حد أدنى وأقصى
+- GuardedDatabase: غلاف حوالين الـ db بيقيس كل عملية ويبلّغ الـ breaker
+- find/aggregate بيتقاسوا لحد أول batch بس (سحب cursor كبير مش "بطء")، والقراءات الكبيرة
+  (المزامنة / التصدير) بتتعمل جوه breaker.bulk_reads(): من غير maxTimeMS وبمهلة BULK_BUDGET_MS
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pymongo
+
+CIRCUIT_CLOSED = "closed"        # شغال عادي
+CIRCUIT_OPEN = "open"            # MongoDB معطل - كل العمليات بتروح SQLite
+CIRCUIT_HALF_OPEN = "half_open"  # بيجرب ping عشان يعرف لو رجع
+
+# ⚡ أخطاء الشبكة/المهلة بس هي اللي بتتحسب فشل (DuplicateKey وغيره معناه إن السيرفر رد)
+TRANSIENT_ERRORS = (pymongo.errors.ConnectionFailure, pymongo.errors.ExecutionTimeout)
+
+# أقل مهلة لكل نوع عملية (ms) - المهلة الفعلية = 4 × متوسط الأوقات بين الحد ده و MAX_BUDGET_MS
+DEFAULT_BUDGETS_MS = {
+    'find_one': 1000,
+    'count_documents': 1000,
+    'find': 3000,
+    'aggregate': 3000,
+    'insert_one': 2000,
+    'update_one': 2000,
+    'update_many': 3000,
+    'delete_one': 2000,
+    'delete_many': 3000,
+    'insert_many': 10000,
+    'bulk_write': 10000,
+    'create_index': 10000,
+}
+MAX_BUDGET_MS = 5000  # = socketTimeoutMS
+BULK_BUDGET_MS = 30000  # مهلة أول batch جوه bulk_reads (سحب كامل أول مزامنة)
+
+# عمليات القراءة اللي بتقبل maxTimeMS (المهلة بتتطبق على السيرفر نفسه)
+_READ_TIMEOUT_KWARG = {
+    'find': 'max_time_ms',
+    'find_one': 'max_time_ms',
+    'aggregate': 'maxTimeMS',
+    'count_documents': 'maxTimeMS',
+}
+
+
+class CircuitOpenError(Exception):
+    """عملية MongoDB اترفضت لأن الـ circuit مفتوح"""
+
+
+class LatencyBudgets:
+    """مهلة متكيفة لكل عملية: 4 × EWMA للأوقات، بين الحد الأدنى للعملية و MAX_BUDGET_MS"""
+
+    def __init__(self, alpha: float = 0.2, multiplier: float = 4.0, warmup: int = 5):
+        self.alpha = alpha
+        self.multiplier = multiplier
+        self.warmup = warmup
+        self._ewma: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _floor(operation: str) -> float:
+        method = operation.rsplit('.', 1)[-1]
+        return DEFAULT_BUDGETS_MS.get(method, 2000)
+
+    def budget_ms(self, operation: str) -> float:
+        floor = self._floor(operation)
+        ceiling = max(MAX_BUDGET_MS, floor)
+        with self._lock:
+            if self._samples.get(operation, 0) < self.warmup:
+                return floor
+            return min(max(floor, self._ewma[operation] * self.multiplier), ceiling)
+
+    def record(self, operation: str, elapsed_ms: float):
+        with self._lock:
+            previous = self._ewma.get(operation)
+            self._ewma[operation] = elapsed_ms if previous is None else (
+                self.alpha * elapsed_ms + (1 - self.alpha) * previous
+            )
+            self._samples[operation] = self._samples.get(operation, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            operations = list(self._ewma)
+        return {
+            op: {'ewma_ms': round(self._ewma[op], 1), 'budget_ms': round(self.budget_ms(op), 1)}
+            for op in operations
+        }
+
+
+class CircuitBreaker:
+    """
+    ⚡ Circuit breaker مشترك لكل عمليات MongoDB
+
+    - closed: العمليات بتعدي، وكل failure_threshold فشل أو بطء متتالي بيفتحه
+    - open: العمليات بترفض فوراً (CircuitOpenError) والـ Repository بيستخدم SQLite
+    - half_open: ping في الخلفية بعد backoff (بيتضاعف لحد max_backoff_seconds)
+    """
+
+    def __init__(self, probe: Optional[Callable[[], Any]] = None, failure_threshold: int = 3,
+                 base_backoff_seconds: float = 2.0, max_backoff_seconds: float = 120.0):
+        """
+        Args:
+            probe: دالة بتختبر الاتصال (ping) - بترمي exception لو فشلت
+            failure_threshold: عدد الفشل/البطء المتتالي اللي بيفتح الـ circuit
+            base_backoff_seconds: أول انتظار قبل محاولة الرجوع
+            max_backoff_seconds: أقصى انتظار بين المحاولات
+        """
+        self.probe = probe
+        self.failure_threshold = failure_threshold
+        self.base_backoff_seconds = base_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.budgets = LatencyBudgets()
+
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.backoff_seconds = base_backoff_seconds
+        self.opened_at: Optional[float] = None
+        self.next_probe_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._stats = {'calls': 0, 'failures': 0, 'slow': 0, 'rejected': 0, 'trips': 0}
+
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._listeners: List[Callable[[str], None]] = []
+        self._probe_timer: Optional[threading.Timer] = None
+
+    # --- الحالة ---
+
+    def add_listener(self, listener: Callable[[str], None]):
+        """دالة بتتنادى بالحالة الجديدة عند كل تغيير (من أي thread)"""
+        self._listeners.append(listener)
+
+    def allows_requests(self) -> bool:
+        return self.state == CIRCUIT_CLOSED
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        for listener in list(self._listeners):
+            try:
+                listener(state)
+            except Exception as e:
+                print(f"WARNING: [CircuitBreaker] فشل إبلاغ مستمع: {e}")
+
+    def get_state(self) -> Dict[str, Any]:
+        """حالة الـ breaker للعرض (شريط الحالة / الإعدادات)"""
+        with self._lock:
+            retry_in = None
+            if self.next_probe_at is not None:
+                retry_in = max(0.0, self.next_probe_at - time.monotonic())
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'backoff_seconds': self.backoff_seconds,
+                'retry_in_seconds': retry_in,
+                'last_error': self.last_error,
+                'budgets': self.budgets.snapshot(),
+                **self._stats,
+            }
+
+    # --- القراءات الكبيرة ---
+
+    @contextmanager
+    def bulk_reads(self) -> Iterator[None]:
+        """
+        قراءات كبيرة على الـ thread الحالي (سحب المزامنة / التصدير):
+        من غير maxTimeMS على السيرفر، وأول batch مهلته BULK_BUDGET_MS ومش بيدخل في الـ EWMA
+        """
+        previous = self.in_bulk_reads
+        self._local.bulk = True
+        try:
+            yield
+        finally:
+            self._local.bulk = previous
+
+    @property
+    def in_bulk_reads(self) -> bool:
+        return getattr(self._local, 'bulk', False)
+
+    # --- تسجيل نتايج العمليات ---
+
+    def before_call(self, operation: str):
+        """بيرمي CircuitOpenError لو الـ circuit مش مقفول"""
+        with self._lock:
+            if self.state != CIRCUIT_CLOSED:
+                self._stats['rejected'] += 1
+                raise CircuitOpenError(f"MongoDB غير متاح مؤقتاً ({operation})")
+            self._stats['calls'] += 1
+
+    def record_success(self, operation: str, elapsed_ms: float, bulk: bool = False):
+        if bulk:
+            budget = BULK_BUDGET_MS
+        else:
+            budget = self.budgets.budget_ms(operation)
+            self.budgets.record(operation, elapsed_ms)
+        if elapsed_ms > budget:
+            with self._lock:
+                self._stats['slow'] += 1
+            self._record_problem(f"{operation} بطيء ({elapsed_ms:.0f}ms > {budget:.0f}ms)")
+            return
+        with self._lock:
+            self.consecutive_failures = 0
+
+    def record_failure(self, operation: str, error: Exception):
+        with self._lock:
+            self._stats['failures'] += 1
+        self._record_problem(f"{operation}: {error}")
+
+    def _record_problem(self, description: str):
+        with self._lock:
+            self.last_error = description
+            self.consecutive_failures += 1
+            if self.state == CIRCUIT_CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._stats['trips'] += 1
+                print(f"WARNING: [CircuitBreaker] ⚡ تم فتح الـ circuit بعد {self.consecutive_failures} "
+                      f"مشاكل متتالية ({description}) - التحويل لـ SQLite")
+                self._open(self.base_backoff_seconds)
+
+    # --- الفتح والرجوع ---
+
+    def _open(self, backoff_seconds: float):
+        with self._lock:
+            self.opened_at = time.monotonic()
+            self.backoff_seconds = min(backoff_seconds, self.max_backoff_seconds)
+            self._set_state(CIRCUIT_OPEN)
+            self._schedule_probe(self.backoff_seconds)
+
+    def _schedule_probe(self, delay_seconds: float):
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+        self.next_probe_at = time.monotonic() + delay_seconds
+        self._probe_timer = threading.Timer(delay_seconds, self._run_probe)
+        self._probe_timer.daemon = True
+        self._probe_timer.start()
+
+    def probe_now(self):
+        """محاولة رجوع فورية (مثلاً لما فاحص الاتصال يلاقي الشبكة رجعت)"""
+        with self._lock:
+            if self.state != CIRCUIT_OPEN:
+                return
+            self._schedule_probe(0)
+
+    def _run_probe(self):
+        with self._lock:
+            if self.state != CIRCUIT_OPEN:
+                return
+            self._set_state(CIRCUIT_HALF_OPEN)
+            self.next_probe_at = None
+
+        try:
+            if self.probe is not None:
+                self.probe()
+        except Exception as e:
+            with self._lock:
+                self.last_error = f"ping: {e}"
+                next_backoff = self.backoff_seconds * 2
+                print(f"INFO: [CircuitBreaker] MongoDB لسه غير متاح - المحاولة الجاية بعد "
+                      f"{min(next_backoff, self.max_backoff_seconds):.1f} ثانية")
+                self._open(next_backoff)
+            return
+
+        with self._lock:
+            print("INFO: [CircuitBreaker] ✅ MongoDB رجع - تم قفل الـ circuit")
+            self.reset()
+
+    def reset(self):
+        """قفل الـ circuit ومسح العدادات (بعد اتصال ناجح)"""
+        with self._lock:
+            if self._probe_timer is not None:
+                self._probe_timer.cancel()
+                self._probe_timer = None
+            self.consecutive_failures = 0
+            self.backoff_seconds = self.base_backoff_seconds
+            self.opened_at = None
+            self.next_probe_at = None
+            self._set_state(CIRCUIT_CLOSED)
+
+    def shutdown(self):
+        """إلغاء أي ping مجدول (عند الإغلاق)"""
+        with self._lock:
+            if self._probe_timer is not None:
+                self._probe_timer.cancel()
+                self._probe_timer = None
+
+    # --- تنفيذ عملية ---
+
+    def call(self, operation: str, func: Callable, *args, **kwargs):
+        """تنفيذ عملية MongoDB تحت الـ breaker (قياس الوقت وتسجيل النتيجة)"""
+        self.before_call(operation)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            self.record_failure(operation, e)
+            raise
+        self.record_success(operation, (time.perf_counter() - started) * 1000)
+        return result
+
+
+class _GuardedCursor:
+    """
+    cursor بيتقاس من أول طلب لحد أول batch (الـ find بيتنفذ وقت الـ iteration) -
+    باقي الـ batches وقتها على حجم البيانات مش على حالة السيرفر، فمبتتحسبش بطء
+    """
+
+    def __init__(self, cursor, breaker: CircuitBreaker, operation: str, started: float,
+                 bulk: bool = False):
+        self._cursor = cursor
+        self._breaker = breaker
+        self._operation = operation
+        self._started = started
+        self._bulk = bulk
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # sort/limit/skip بيرجعوا نفس الـ cursor - نفضل ملفوفين
+            return self if result is self._cursor else result
+        return chained
+
+    def _record_first_batch(self):
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        self._breaker.record_success(self._operation, elapsed_ms, bulk=self._bulk)
+
+    def __iter__(self):
+        first_batch = True
+        try:
+            for document in self._cursor:
+                if first_batch:
+                    first_batch = False
+                    self._record_first_batch()
+                yield document
+        except TRANSIENT_ERRORS as e:
+            self._breaker.record_failure(self._operation, e)
+            raise
+        if first_batch:
+            self._record_first_batch()  # نتيجة فاضية
+
+
+class GuardedCollection:
+    """
+    collection ملفوف: كل عملية بتعدي على الـ breaker، والقراءة بتاخد maxTimeMS من المهلة المتكيفة
+    (إلا جوه breaker.bulk_reads() أو لو المستدعي حدد المهلة بنفسه)
+    """
+
+    def __init__(self, collection, breaker: CircuitBreaker):
+        self._collection = collection
+        self._breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if not callable(attr):
+            return attr
+        operation = f"{self._collection.name}.{name}"
+        timeout_kwarg = _READ_TIMEOUT_KWARG.get(name)
+
+        def guarded(*args, **kwargs):
+            bulk = self._breaker.in_bulk_reads
+            if timeout_kwarg and timeout_kwarg not in kwargs and not bulk:
+                kwargs[timeout_kwarg] = int(self._breaker.budgets.budget_ms(operation))
+            if name in ('find', 'aggregate'):
+                self._breaker.before_call(operation)
+                started = time.perf_counter()
+                try:
+                    cursor = attr(*args, **kwargs)
+                except TRANSIENT_ERRORS as e:
+                    self._breaker.record_failure(operation, e)
+                    raise
+                return _GuardedCursor(cursor, self._breaker, operation, started, bulk=bulk)
+            return self._breaker.call(operation, attr, *args, **kwargs)
+        return guarded
+
+
+class GuardedDatabase:
+    """db ملفوف: mongo_db.clients و mongo_db['clients'] بيرجعوا GuardedCollection"""
+
+    def __init__(self, database, breaker: CircuitBreaker):
+        self._database = database
+        self._breaker = breaker
+        self._collections: Dict[str, GuardedCollection] = {}
+
+    def __getitem__(self, name: str) -> GuardedCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = GuardedCollection(self._database[name], self._breaker)
+            self._collections[name] = collection
+        return collection
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if hasattr(type(self._database), name):
+            return getattr(self._database, name)  # client / name / command ...
+        return self[name]
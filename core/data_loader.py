@@ -0,0 +1,232 @@
+# الملف: core/data_loader.py
+"""
+⚡ تحميل بيانات الشاشات في الخلفية (QThreadPool + QRunnable)
+- بدل QApplication.processEvents() جوه دوال التحميل: الشغل التقيل (SQLite / Mongo / الحسابات)
+  بيتعمل في thread من الـ pool والنتيجة بترجع للـ UI thread بـ signal
+- كل طلب ليه CancellationToken: الطلب الأحدث في نفس الـ group بيلغي القديم
+  ونتيجة أي طلب اتلغى مش بتوصل للشاشة
+- طلبين بنفس المفتاح والأول لسه شغال = job واحد (الـ callbacks بتتجمع عليه)
+  طول ما مفيش كتابة حصلت بينهم (app_signals.data_changed) - غير كده الجديد بيلغي القديم
+
+الاستخدام:
+    data_loader.load(
+        key=("clients", archived),
+        fetch=lambda token: repo.get_clients_page(status=status),   # في الخلفية
+        on_result=self._apply_clients,                               # في الـ UI thread
+        group="ClientManager",
+    )
+
+قواعد الـ fetch: متلمسش أي widget (اقرا حالة الشاشة قبل load وابعتها للـ fetch)،
+والحلقات الطويلة تنادي token.raise_if_cancelled() عشان الإلغاء يوقفها بدري.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .signals import app_signals
+
+
+class LoadCancelled(Exception):
+    """بيترمي من جوه الـ fetch لما الطلب يتلغى (raise_if_cancelled)"""
+
+
+class CancellationToken:
+    """علامة إلغاء مشتركة بين الـ UI thread والـ job (قراءتها آمنة من أي thread)"""
+
+    __slots__ = ('_cancelled',)
+
+    def __init__(self):
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def raise_if_cancelled(self) -> None:
+        if self._cancelled:
+            raise LoadCancelled()
+
+
+@dataclass
+class _PendingLoad:
+    """طلب شغال: الـ callbacks بتاعة كل اللي طلبوا نفس المفتاح"""
+    key: Hashable
+    group: Optional[str]
+    token: CancellationToken
+    generation: int
+    callbacks: List[Tuple[Callable[[Any], None], Optional[Callable[[Exception], None]],
+                          Optional[Callable[[], None]]]] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+
+class _LoadJob(QRunnable):
+    """الـ job اللي بيشتغل في الـ pool - بيبعت النتيجة أو الخطأ بـ signal الـ loader"""
+
+    def __init__(self, loader: "DataLoader", job_id: int,
+                 fetch: Callable[[CancellationToken], Any], token: CancellationToken):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._loader = loader
+        self._job_id = job_id
+        self._fetch = fetch
+        self._token = token
+
+    def run(self):
+        result, error = None, None
+        try:
+            self._token.raise_if_cancelled()
+            result = self._fetch(self._token)
+        except Exception as e:
+            error = e
+        self._loader.job_done.emit(self._job_id, result, error)
+
+
+class DataLoader(QObject):
+    """
+    ⚡ طابور تحميل البيانات للشاشات.
+    الـ loader نفسه عايش في الـ UI thread فالـ callbacks بتتنفذ هناك (queued signal).
+    """
+
+    # (job_id, result, error)
+    job_done = pyqtSignal(int, object, object)
+
+    def __init__(self, max_threads: int = 4, parent=None):
+        """
+        Args:
+            max_threads: أقصى عدد jobs بالتوازي (= عدد اتصالات القراءة في SQLitePool)
+        """
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._job_ids = itertools.count(1)
+        self._pending: Dict[int, _PendingLoad] = {}
+        self._by_key: Dict[Hashable, int] = {}
+        # ⚡ بيزيد مع كل تغيير بيانات - طلب بدأ قبل الكتابة نتيجته قديمة ومينفعش ننضم له
+        self._generation = 0
+        self.job_done.connect(self._on_job_done)
+        app_signals.data_changed.connect(self._on_data_changed)
+
+    def load(self, key: Hashable, fetch: Callable[[CancellationToken], Any],
+             on_result: Callable[[Any], None],
+             on_error: Optional[Callable[[Exception], None]] = None,
+             on_finished: Optional[Callable[[], None]] = None,
+             group: Optional[str] = None) -> CancellationToken:
+        """
+        تشغيل fetch(token) في الخلفية وتسليم النتيجة لـ on_result في الـ UI thread
+
+        Args:
+            key: مفتاح الطلب - طلب بنفس المفتاح وهو شغال بينضم له بدل job جديد
+            fetch: الدالة التقيلة (بتاخد الـ token)
+            on_result: بتستلم النتيجة
+            on_error: بتستلم الـ exception (الافتراضي: طباعة ERROR)
+            on_finished: بعد النتيجة أو الخطأ (مش بعد الإلغاء) - لإخفاء الـ overlay مثلاً
+            group: الطلبات الأقدم في نفس الـ group بمفتاح مختلف بتتلغي (آخر طلب هو اللي يكسب)
+
+        Returns:
+            الـ CancellationToken بتاع الـ job
+        """
+        job_id = self._by_key.get(key)
+        pending = self._pending.get(job_id) if job_id is not None else None
+        if pending is not None and not pending.token.cancelled:
+            if pending.generation == self._generation:
+                pending.callbacks.append((on_result, on_error, on_finished))
+                return pending.token
+            # البيانات اتغيرت بعد ما الطلب ده بدأ - الجديد هو اللي يتعرض
+            self.cancel(key)
+
+        if group is not None:
+            self.cancel_group(group)
+
+        token = CancellationToken()
+        job_id = next(self._job_ids)
+        self._pending[job_id] = _PendingLoad(
+            key=key, group=group, token=token, generation=self._generation,
+            callbacks=[(on_result, on_error, on_finished)],
+        )
+        self._by_key[key] = job_id
+        self._pool.start(_LoadJob(self, job_id, fetch, token))
+        return token
+
+    def cancel(self, key: Hashable) -> bool:
+        """إلغاء الطلب الشغال بالمفتاح ده (نتيجته مش هتوصل)"""
+        job_id = self._by_key.pop(key, None)
+        pending = self._pending.get(job_id) if job_id is not None else None
+        if pending is None:
+            return False
+        pending.token.cancel()
+        return True
+
+    def cancel_group(self, group: str) -> int:
+        """إلغاء كل الطلبات الشغالة في الـ group"""
+        cancelled = 0
+        for job_id, pending in self._pending.items():
+            if pending.group == group and not pending.token.cancelled:
+                pending.token.cancel()
+                if self._by_key.get(pending.key) == job_id:
+                    del self._by_key[pending.key]
+                cancelled += 1
+        return cancelled
+
+    def is_loading(self, key: Hashable) -> bool:
+        return key in self._by_key
+
+    @property
+    def active_count(self) -> int:
+        """عدد الطلبات اللي لسه مرجعتش (منها الملغي اللي لسه شغال)"""
+        return len(self._pending)
+
+    def shutdown(self, msecs: int = 3000) -> bool:
+        """إلغاء كل الطلبات واستنى الشغال منها يخلص (قبل قفل قاعدة البيانات)"""
+        for pending in self._pending.values():
+            pending.token.cancel()
+        self._by_key.clear()
+        self._pool.clear()  # الـ jobs اللي لسه مبدأتش
+        return self._pool.waitForDone(msecs)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        """استنى الـ jobs تخلص (للإغلاق والـ benchmarks) - الـ callbacks بتوصل مع الـ event loop"""
+        return self._pool.waitForDone(msecs)
+
+    def _on_data_changed(self, *args):
+        self._generation += 1
+
+    def _on_job_done(self, job_id: int, result: Any, error: Optional[Exception]):
+        pending = self._pending.pop(job_id, None)
+        if pending is None:
+            return
+        if self._by_key.get(pending.key) == job_id:
+            del self._by_key[pending.key]
+
+        elapsed_ms = (time.perf_counter() - pending.started) * 1000
+        if pending.token.cancelled or isinstance(error, LoadCancelled):
+            print(f"INFO: [DataLoader] تم تجاهل نتيجة طلب ملغي {pending.key!r} ({elapsed_ms:.0f}ms)")
+            return
+
+        for on_result, on_error, on_finished in pending.callbacks:
+            try:
+                if error is None:
+                    on_result(result)
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"ERROR: [DataLoader] فشل تحميل {pending.key!r}: {error}")
+            except Exception as e:
+                # ممكن الـ widget يكون اتقفل قبل ما النتيجة توصل
+                print(f"ERROR: [DataLoader] فشل تطبيق نتيجة {pending.key!r}: {e}")
+            finally:
+                if on_finished is not None:
+                    try:
+                        on_finished()
+                    except Exception as e:
+                        print(f"WARNING: [DataLoader] فشل on_finished لـ {pending.key!r}: {e}")
+
+
+# ⚡ نسخة واحدة للتطبيق كله (زي app_signals)
+data_loader = DataLoader()
@@ -116,7 +116,8 @@ class EventBus:
     def publish(
         self,
         event_name: str,
-        data: Optional[Any] = None
+        data: Optional[Any] = None,
+        raise_errors: bool = False
     ) -> int:
         """
         نشر حدث
@@ -124,6 +125,8 @@ class EventBus:
         Args:
             event_name: اسم الحدث
             data: البيانات المرفقة مع الحدث
+            raise_errors: إعادة رفع أول خطأ من المستمعين بعد تسجيله
+                (جوه repo.unit_of_work عشان الـ transaction يرجع لو القيد فشل)
         
         Returns:
             عدد المستمعين الذين تم إخطارهم بنجاح
@@ -152,6 +155,8 @@ class EventBus:
                     f"فشل المستمع {func_name} في معالجة حدث {event_name}: {e}",
                     exc_info=True
                 )
+                if raise_errors:
+                    raise
         
         return success_count
 
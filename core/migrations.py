@@ -0,0 +1,780 @@
+# الملف: core/migrations.py
+"""
+⚡ Migrations مرقّمة لقاعدة SQLite المحلية (PRAGMA user_version)
+- كل migration ليها رقم، وبيتنفذ بس اللي رقمه أكبر من user_version المتسجل في الملف
+- كل الـ migrations الناقصة بتتنفذ في transaction واحد (لو واحد فشل كله بيرجع والرقم مبيتغيرش)
+- التشغيل العادي (مفيش جديد) = قراءة user_version بس
+- run_migrations بترجع تقرير بوقت كل migration
+
+لإضافة تعديل على الـ schema: دالة جديدة _mNNN_... وسطر جديد في آخر MIGRATIONS (متعدلش migration اتنفذ قبل كده)
+- كل migration فيه الـ DDL بتاعه متجمد (نص SQL هنا) - مش بينادي helpers شغالة في باقي الكود
+  عشان تعديلها بعدين ميغيرش اللي بيحصل لقاعدة بيانات قديمة لسه بتتحدث
+- الـ migration اللي يفشل بيرمي الخطأ: الـ transaction بيرجع و user_version مبيتغيرش
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+
+@dataclass(frozen=True)
+class Migration:
+    """migration واحد: apply(repo, cursor) بيتنفذ جوه transaction الـ runner"""
+    version: int
+    name: str
+    apply: Callable[[Any, sqlite3.Cursor], None]
+
+
+# --- 1. الجداول الأساسية ---
+
+BASE_TABLES = (
+    # الحسابات
+    """
+    CREATE TABLE IF NOT EXISTS accounts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        name TEXT NOT NULL,
+        code TEXT NOT NULL UNIQUE,
+        type TEXT NOT NULL,
+        parent_id TEXT,
+        balance REAL DEFAULT 0.0,
+        currency TEXT DEFAULT 'EGP',
+        description TEXT,
+        status TEXT DEFAULT 'نشط'
+    )""",
+
+    # المصروفات
+    """
+    CREATE TABLE IF NOT EXISTS expenses (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        date TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        description TEXT,
+        account_id TEXT NOT NULL,
+        payment_account_id TEXT,
+        project_id TEXT
+    )""",
+
+    # العملاء
+    """
+    CREATE TABLE IF NOT EXISTS clients (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        name TEXT NOT NULL,
+        company_name TEXT,
+        email TEXT,
+        phone TEXT,
+        address TEXT,
+        country TEXT,
+        vat_number TEXT,
+        status TEXT NOT NULL DEFAULT 'نشط',
+        client_type TEXT,
+        work_field TEXT,
+        logo_path TEXT,
+        client_notes TEXT
+    )""",
+
+    # الخدمات
+    """
+    CREATE TABLE IF NOT EXISTS services (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        name TEXT NOT NULL,
+        description TEXT,
+        default_price REAL NOT NULL,
+        category TEXT,
+        status TEXT NOT NULL DEFAULT 'نشط'
+    )""",
+
+    # الفواتير (البنود 'items' بتتخزن JSON)
+    """
+    CREATE TABLE IF NOT EXISTS invoices (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        invoice_number TEXT NOT NULL UNIQUE,
+        client_id TEXT NOT NULL,
+        issue_date TEXT NOT NULL,
+        due_date TEXT NOT NULL,
+        items TEXT NOT NULL, -- (JSON List of InvoiceItem)
+        subtotal REAL NOT NULL,
+        discount_rate REAL DEFAULT 0.0,
+        discount_amount REAL DEFAULT 0.0,
+        tax_rate REAL DEFAULT 0.0,
+        tax_amount REAL DEFAULT 0.0,
+        total_amount REAL NOT NULL,
+        amount_paid REAL DEFAULT 0.0,
+        status TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        notes TEXT,
+        project_id TEXT
+    )""",
+
+    # المشاريع
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        name TEXT NOT NULL UNIQUE,
+        client_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        status_manually_set INTEGER DEFAULT 0,
+        description TEXT,
+        start_date TEXT,
+        end_date TEXT,
+        
+        items TEXT,
+        subtotal REAL DEFAULT 0.0,
+        discount_rate REAL DEFAULT 0.0,
+        discount_amount REAL DEFAULT 0.0,
+        tax_rate REAL DEFAULT 0.0,
+        tax_amount REAL DEFAULT 0.0,
+        total_amount REAL DEFAULT 0.0,
+        currency TEXT,
+        project_notes TEXT
+    )""",
+
+    # قيود اليومية (البنود 'lines' بتتخزن JSON)
+    """
+    CREATE TABLE IF NOT EXISTS journal_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        date TEXT NOT NULL,
+        description TEXT NOT NULL,
+        lines TEXT NOT NULL, -- (JSON List of JournalEntryLine)
+        related_document_id TEXT
+    )""",
+
+    # ⚡ أرصدة الحسابات المجمّعة (materialized view من قيود اليومية)
+    """
+    CREATE TABLE IF NOT EXISTS account_balances (
+        account_key TEXT PRIMARY KEY,
+        debit_total REAL NOT NULL DEFAULT 0.0,
+        credit_total REAL NOT NULL DEFAULT 0.0,
+        last_modified TEXT NOT NULL
+    )""",
+
+    # ⚡ أسطر القيود - سطر لكل حساب في كل قيد (account_code = كود الحساب لو موجود، وإلا account_id)
+    """
+    CREATE TABLE IF NOT EXISTS journal_lines (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER NOT NULL,
+        line_no INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        account_id TEXT,
+        account_code TEXT,
+        account_name TEXT,
+        debit REAL NOT NULL DEFAULT 0.0,
+        credit REAL NOT NULL DEFAULT 0.0,
+        description TEXT
+    )""",
+
+    # الدفعات
+    """
+    CREATE TABLE IF NOT EXISTS payments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        project_id TEXT NOT NULL,
+        client_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        amount REAL NOT NULL,
+        account_id TEXT NOT NULL,
+        method TEXT
+    )""",
+
+    # عروض الأسعار
+    """
+    CREATE TABLE IF NOT EXISTS quotations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        quote_number TEXT NOT NULL UNIQUE,
+        client_id TEXT NOT NULL,
+        project_id TEXT,
+        issue_date TEXT NOT NULL,
+        expiry_date TEXT NOT NULL,
+        items TEXT NOT NULL,
+        subtotal REAL NOT NULL,
+        discount_rate REAL DEFAULT 0.0,
+        discount_amount REAL DEFAULT 0.0,
+        tax_rate REAL DEFAULT 0.0,
+        tax_amount REAL NOT NULL,
+        total_amount REAL NOT NULL,
+        status TEXT NOT NULL,
+        currency TEXT NOT NULL,
+        notes TEXT
+    )""",
+
+    # العملات
+    """
+    CREATE TABLE IF NOT EXISTS currencies (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        code TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        rate REAL NOT NULL DEFAULT 1.0,
+        is_base INTEGER DEFAULT 0,
+        active INTEGER DEFAULT 1
+    )""",
+
+    # الإشعارات
+    """
+    CREATE TABLE IF NOT EXISTS notifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        type TEXT NOT NULL,
+        priority TEXT NOT NULL DEFAULT 'متوسطة',
+        is_read INTEGER DEFAULT 0,
+        related_entity_type TEXT,
+        related_entity_id TEXT,
+        action_url TEXT,
+        expires_at TEXT
+    )""",
+
+    # المستخدمين
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        username TEXT NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL,
+        full_name TEXT,
+        email TEXT,
+        is_active INTEGER DEFAULT 1,
+        last_login TEXT,
+        custom_permissions TEXT
+    )""",
+
+    # المهام (TODO)
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT,
+        priority TEXT NOT NULL DEFAULT 'MEDIUM',
+        status TEXT NOT NULL DEFAULT 'TODO',
+        category TEXT NOT NULL DEFAULT 'GENERAL',
+        due_date TEXT,
+        due_time TEXT,
+        completed_at TEXT,
+        related_project_id TEXT,
+        related_client_id TEXT,
+        tags TEXT,
+        reminder INTEGER DEFAULT 0,
+        reminder_minutes INTEGER DEFAULT 30,
+        assigned_to TEXT,
+        FOREIGN KEY (related_project_id) REFERENCES projects(name),
+        FOREIGN KEY (related_client_id) REFERENCES clients(id)
+    )""",
+
+    # ⚡ حالة المزامنة - watermark الـ delta pull لكل collection
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        collection TEXT PRIMARY KEY,
+        last_pulled_at TEXT,
+        last_sync_at TEXT
+    )""",
+
+    # قائمة انتظار المزامنة
+    """
+    CREATE TABLE IF NOT EXISTS sync_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        _mongo_id TEXT,
+        sync_status TEXT NOT NULL DEFAULT 'new_offline',
+        created_at TEXT NOT NULL,
+        last_modified TEXT NOT NULL,
+        entity_type TEXT NOT NULL,
+        entity_id TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        action TEXT,
+        priority TEXT NOT NULL DEFAULT 'medium',
+        status TEXT NOT NULL DEFAULT 'pending',
+        retry_count INTEGER DEFAULT 0,
+        max_retries INTEGER DEFAULT 3,
+        data TEXT,
+        error_message TEXT,
+        last_attempt TEXT
+    )""",
+)
+
+# أعمدة اتضافت بعد أول إصدار - قواعد البيانات القديمة (user_version = 0) ممكن متكونش فيها
+LEGACY_COLUMNS = {
+    'accounts': [("currency", "TEXT DEFAULT 'EGP'"), ("description", "TEXT"), ("status", "TEXT DEFAULT 'نشط'")],
+    'expenses': [("payment_account_id", "TEXT")],
+    'projects': [("status_manually_set", "INTEGER DEFAULT 0")],
+    'users': [("custom_permissions", "TEXT")],
+    'sync_queue': [("action", "TEXT")],
+}
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> set:
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cursor.fetchall()}
+
+
+def _add_missing_columns(cursor: sqlite3.Cursor, table: str, columns: List[tuple]):
+    """إضافة الأعمدة الناقصة بس (بدل ALTER TABLE جوه try/except في كل تشغيل)"""
+    existing = _table_columns(cursor, table)
+    for column, definition in columns:
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            print(f"INFO: [Migrations] تمت إضافة العمود {table}.{column}")
+
+
+def _m001_base_schema(repo, cursor: sqlite3.Cursor):
+    """كل الجداول + الأعمدة اللي كانت بتتضاف بـ ALTER TABLE في الإصدارات القديمة"""
+    for sql in BASE_TABLES:
+        cursor.execute(sql)
+    for table, columns in LEGACY_COLUMNS.items():
+        _add_missing_columns(cursor, table, columns)
+
+
+# --- 2. الـ indexes ---
+
+BASE_INDEXES = (
+    # sync_queue
+    "CREATE INDEX IF NOT EXISTS idx_sync_queue_status ON sync_queue(status)",
+    "CREATE INDEX IF NOT EXISTS idx_sync_queue_priority ON sync_queue(priority, status)",
+    "CREATE INDEX IF NOT EXISTS idx_sync_queue_entity ON sync_queue(entity_type, entity_id)",
+    # clients
+    "CREATE INDEX IF NOT EXISTS idx_clients_name ON clients(name)",
+    "CREATE INDEX IF NOT EXISTS idx_clients_status ON clients(status)",
+    # projects
+    "CREATE INDEX IF NOT EXISTS idx_projects_client ON projects(client_id)",
+    "CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status)",
+    "CREATE INDEX IF NOT EXISTS idx_projects_start_date ON projects(start_date)",
+    # journal_entries
+    "CREATE INDEX IF NOT EXISTS idx_journal_date ON journal_entries(date)",
+    "CREATE INDEX IF NOT EXISTS idx_journal_related ON journal_entries(related_document_id)",
+    # journal_lines (كشف الحساب بالكود والفترة + أسطر القيد الواحد)
+    "CREATE INDEX IF NOT EXISTS idx_journal_lines_account_date ON journal_lines(account_code, date)",
+    "CREATE INDEX IF NOT EXISTS idx_journal_lines_entry ON journal_lines(entry_id)",
+    # expenses
+    "CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses(date)",
+    "CREATE INDEX IF NOT EXISTS idx_expenses_project ON expenses(project_id)",
+    # invoices
+    "CREATE INDEX IF NOT EXISTS idx_invoices_client ON invoices(client_id)",
+    "CREATE INDEX IF NOT EXISTS idx_invoices_status ON invoices(status)",
+    # payments
+    "CREATE INDEX IF NOT EXISTS idx_payments_project ON payments(project_id)",
+    "CREATE INDEX IF NOT EXISTS idx_payments_date ON payments(date)",
+    # notifications
+    "CREATE INDEX IF NOT EXISTS idx_notifications_is_read ON notifications(is_read)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_type ON notifications(type)",
+    "CREATE INDEX IF NOT EXISTS idx_notifications_created ON notifications(created_at)",
+)
+
+# ⚡ Unique indexes لمنع التكرار - بتفشل لو في تكرارات موجودة فعلاً (بنكمل من غيرها)
+UNIQUE_INDEXES = (
+    # منع تكرار العملاء بنفس الاسم (case insensitive)
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_clients_name_unique ON clients(LOWER(name)) WHERE status != 'مؤرشف'",
+    # منع تكرار المشاريع بنفس الاسم لنفس العميل
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_name_client_unique ON projects(LOWER(name), client_id) WHERE status != 'مؤرشف'",
+    # منع تكرار الدفعات (نفس المشروع + نفس التاريخ + نفس المبلغ)
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_payments_unique ON payments(project_id, date, amount)",
+)
+
+
+def _m002_indexes(repo, cursor: sqlite3.Cursor):
+    for sql in BASE_INDEXES:
+        cursor.execute(sql)
+    for sql in UNIQUE_INDEXES:
+        try:
+            cursor.execute(sql)
+        except sqlite3.IntegrityError as e:
+            print(f"WARNING: [Migrations] تخطي unique index بسبب تكرارات موجودة: {e}")
+
+
+# --- 3. الجداول المشتقة من قيود اليومية ---
+
+# ⚡ نسخة مجمّدة من منطق Repository._rebuild_balances / _rebuild_journal_lines وقت الإصدار 3
+# (الـ migration متتغيرش لو الـ Repository اتغير بعدين) - SQL بـ json_each على عمود lines
+_M003_LINES = """
+    FROM journal_entries AS e, json_each(CASE WHEN json_valid(e.lines) THEN
+        CASE WHEN json_type(e.lines) = 'array' THEN e.lines ELSE '[]' END ELSE '[]' END) AS l
+    WHERE l.type = 'object'
+"""
+_M003_ACCOUNT_KEY = (
+    "CAST(COALESCE(NULLIF(json_extract(l.value, '$.account_code'), ''), "
+    "json_extract(l.value, '$.account_id')) AS TEXT)"
+)
+_M003_BACKFILL_BALANCES = f"""
+    INSERT INTO account_balances (account_key, debit_total, credit_total, last_modified)
+    SELECT {_M003_ACCOUNT_KEY},
+           SUM(COALESCE(json_extract(l.value, '$.debit'), 0.0)),
+           SUM(COALESCE(json_extract(l.value, '$.credit'), 0.0)),
+           strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')
+    {_M003_LINES}
+      AND NULLIF({_M003_ACCOUNT_KEY}, '') IS NOT NULL
+    GROUP BY {_M003_ACCOUNT_KEY}
+"""
+_M003_BACKFILL_LINES = f"""
+    INSERT INTO journal_lines (
+        entry_id, line_no, date, account_id, account_code,
+        account_name, debit, credit, description
+    )
+    SELECT e.id, l.key, e.date,
+           CAST(json_extract(l.value, '$.account_id') AS TEXT),
+           {_M003_ACCOUNT_KEY},
+           json_extract(l.value, '$.account_name'),
+           COALESCE(json_extract(l.value, '$.debit'), 0.0),
+           COALESCE(json_extract(l.value, '$.credit'), 0.0),
+           json_extract(l.value, '$.description')
+    {_M003_LINES}
+"""
+
+
+def _m003_backfill_journal_tables(repo, cursor: sqlite3.Cursor):
+    """
+    ملء account_balances و journal_lines من عمود lines لقواعد البيانات اللي فيها قيود قبلهم
+    (على cursor الـ migration - أي خطأ بيفشّل التحديث كله بدل ما الإصدار يتسجل بجداول فاضية)
+    """
+    cursor.execute("SELECT 1 FROM journal_entries LIMIT 1")
+    if not cursor.fetchone():
+        return
+    cursor.execute("SELECT 1 FROM account_balances LIMIT 1")
+    if not cursor.fetchone():
+        cursor.execute(_M003_BACKFILL_BALANCES)
+    cursor.execute("SELECT 1 FROM journal_lines LIMIT 1")
+    if not cursor.fetchone():
+        cursor.execute(_M003_BACKFILL_LINES)
+
+
+# --- 4. indexes المزامنة ---
+
+# الجداول اللي بتتزامن مع MongoDB (نفس SYNC_TABLES في core/sync_engine.py)
+SYNCED_TABLES = (
+    'accounts', 'clients', 'projects', 'payments', 'journal_entries', 'invoices',
+    'services', 'expenses', 'quotations', 'currencies', 'notifications', 'tasks',
+)
+
+# ⚡ لازم يبقى نفس النص بالظبط اللي في الـ queries عشان SQLite يستخدم الـ partial index
+UNSYNCED_CONDITION = "sync_status IN ('new_offline', 'modified_offline')"
+
+
+def _m004_sync_indexes(repo, cursor: sqlite3.Cursor):
+    """
+    - partial index على السجلات غير المتزامنة (الرفع كل دورة بيدور عليها في كل جدول)
+    - unique index على _mongo_id (الدمج في الـ pull والربط بعد الرفع)
+    - covering index على (project_id, amount) للدفعات والمصروفات (إجماليات المشاريع من الـ index بس)
+    """
+    for table in SYNCED_TABLES:
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_unsynced ON {table}(sync_status) "
+            f"WHERE {UNSYNCED_CONDITION}"
+        )
+        try:
+            cursor.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_mongo_id ON {table}(_mongo_id) "
+                f"WHERE _mongo_id IS NOT NULL"
+            )
+        except sqlite3.IntegrityError:
+            # في _mongo_id مكرر من نسخ قديمة - index عادي لحد ما التكرار يتنضف
+            print(f"WARNING: [Migrations] _mongo_id مكرر في {table} - تم إنشاء index غير unique")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_mongo_id ON {table}(_mongo_id) "
+                f"WHERE _mongo_id IS NOT NULL"
+            )
+
+    # الـ covering indexes بتغطي (project_id) لوحده - القديمة ملهاش لازمة
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_payments_project_amount ON payments(project_id, amount)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_project_amount ON expenses(project_id, amount)")
+    cursor.execute("DROP INDEX IF EXISTS idx_payments_project")
+    cursor.execute("DROP INDEX IF EXISTS idx_expenses_project")
+
+
+# --- 5. indexes صفحات القوائم ---
+
+def _m005_keyset_indexes(repo, cursor: sqlite3.Cursor):
+    """
+    indexes لـ ORDER BY created_at DESC, id DESC في صفحات المشاريع والعملاء
+    (الـ id = rowid فبيبقى جزء من أي index تلقائياً). الدفعات بتستخدم idx_payments_date.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_projects_created ON projects(created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_status_created ON clients(status, created_at)")
+    # idx_clients_status بقى prefix من الجديد
+    cursor.execute("DROP INDEX IF EXISTS idx_clients_status")
+
+
+# --- 6. فهرس البحث الشامل ---
+
+# نسخة الإصدار 6 من مصادر الفهرس: (الجدول, كود النوع, title, body, الأعمدة المراقبة)
+# {r} = new أو اسم الجدول - rowid الفهرس = id * 8 + كود النوع (ROWID_STRIDE)
+_M006_SEARCH_SOURCES = (
+    ("projects", 1,
+     "COALESCE({r}.name, '') || ' ' || "
+     "COALESCE('SW-' || substr('0000' || substr(COALESCE({r}._mongo_id, {r}.id), -4), -4), '')",
+     "COALESCE({r}.client_id, '') || ' ' || COALESCE({r}.project_notes, '') || ' ' || "
+     "COALESCE({r}.description, '') || ' ' || COALESCE({r}.status, '')",
+     "name, _mongo_id, client_id, project_notes, description, status"),
+    ("clients", 2,
+     "COALESCE({r}.name, '') || ' ' || COALESCE({r}.company_name, '')",
+     "COALESCE({r}.phone, '') || ' ' || COALESCE({r}.email, '') || ' ' || "
+     "COALESCE({r}.address, '') || ' ' || COALESCE({r}.work_field, '')",
+     "name, company_name, phone, email, address, work_field"),
+    ("expenses", 3,
+     "COALESCE({r}.category, '')",
+     "COALESCE({r}.description, '') || ' ' || COALESCE(CAST({r}.amount AS TEXT), '') || ' ' || "
+     "COALESCE({r}.project_id, '')",
+     "category, description, amount, project_id"),
+    ("accounts", 4,
+     "COALESCE({r}.name, '') || ' ' || COALESCE({r}.code, '')",
+     "COALESCE({r}.description, '') || ' ' || COALESCE({r}.type, '')",
+     "name, code, description, type"),
+    ("invoices", 5,
+     "COALESCE({r}.invoice_number, '')",
+     "COALESCE({r}.client_id, '') || ' ' || COALESCE({r}.project_id, '') || ' ' || "
+     "COALESCE({r}.notes, '') || ' ' || COALESCE({r}.status, '')",
+     "invoice_number, client_id, project_id, notes, status"),
+    ("quotations", 6,
+     "COALESCE({r}.quote_number, '')",
+     "COALESCE({r}.client_id, '') || ' ' || COALESCE({r}.project_id, '') || ' ' || "
+     "COALESCE({r}.notes, '') || ' ' || COALESCE({r}.status, '')",
+     "quote_number, client_id, project_id, notes, status"),
+)
+
+
+def _fill_search_index(cursor: sqlite3.Cursor, sources, wrap: str = "{}"):
+    """
+    triggers الفهرس + ملئه من الجداول لنسخة متجمدة من المصادر
+    (wrap = تعبير حوالين title و body - الإصدار 7 بيوحد النص بـ index_text)
+    """
+    for table, code, title, body, watched in sources:
+        def values(row: str, title: str = title, body: str = body) -> str:
+            return f"{wrap.format(title.format(r=row))}, {wrap.format(body.format(r=row))}"
+
+        insert = f"INSERT INTO search_index(rowid, title, body) VALUES (new.id * 8 + {code}, {values('new')});"
+        prefix = f"trg_{table}_search"
+        for suffix in ("ai", "au", "ad"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_{suffix}")
+        cursor.execute(f"CREATE TRIGGER {prefix}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+        cursor.execute(
+            f"CREATE TRIGGER {prefix}_au AFTER UPDATE OF {watched} ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 8 + {code}; {insert} END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER {prefix}_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM search_index WHERE rowid = old.id * 8 + {code}; END"
+        )
+        cursor.execute(
+            f"INSERT INTO search_index(rowid, title, body) SELECT id * 8 + {code}, {values(table)} FROM {table}"
+        )
+    cursor.execute("INSERT INTO search_index(search_index) VALUES ('optimize')")
+
+
+def _m006_search_index(repo, cursor: sqlite3.Cursor):
+    """جدول FTS5 للبحث الذكي + triggers بتحدثه مع أي كتابة (الاستعلام في core/search_index.py)"""
+    try:
+        # prefix='2 3': indexes جاهزة لأول حرفين وتلاتة (البحث أثناء الكتابة)
+        cursor.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+    except sqlite3.OperationalError as e:
+        # نسخة SQLite من غير FTS5 - البحث بيرجع للطريقة القديمة (مسح الصفوف في Python)
+        print(f"WARNING: [Migrations] تعذر إنشاء فهرس البحث (FTS5): {e}")
+        return
+    _fill_search_index(cursor, _M006_SEARCH_SOURCES)
+
+
+# --- 7. توحيد النص العربي للبحث ---
+
+# الإصدار 7: العملاء بيتفهرسوا بالتليفون بشكله المحلي كمان (+20 ← 0)
+_M007_SEARCH_SOURCES = tuple(
+    (table, code, title,
+     "COALESCE({r}.phone, '') || ' ' || COALESCE(normalize_phone({r}.phone), '') || ' ' || "
+     "COALESCE({r}.email, '') || ' ' || COALESCE({r}.address, '') || ' ' || COALESCE({r}.work_field, '')"
+     if table == "clients" else body,
+     watched)
+    for table, code, title, body, watched in _M006_SEARCH_SOURCES
+)
+
+_M007_CLIENT_NORMALIZE = (
+    "name_norm = normalize_text({r}.name), company_norm = normalize_text({r}.company_name), "
+    "phone_norm = normalize_phone({r}.phone)"
+)
+
+
+def _m007_normalized_search(repo, cursor: sqlite3.Cursor):
+    """
+    أعمدة متوحدة للعملاء (name_norm / company_norm / phone_norm) محسوبة بـ triggers
+    + إعادة ملء فهرس البحث بالنص المتوحد (normalize_text / normalize_phone / index_text
+    دوال Python متسجلة على اتصالات SQLitePool - core/text_normalize.py)
+    """
+    _add_missing_columns(cursor, "clients", [("name_norm", "TEXT"), ("company_norm", "TEXT"), ("phone_norm", "TEXT")])
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_normalize_ai")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_normalize_au")
+    cursor.execute(
+        "CREATE TRIGGER trg_clients_normalize_ai AFTER INSERT ON clients BEGIN "
+        f"UPDATE clients SET {_M007_CLIENT_NORMALIZE.format(r='new')} WHERE id = new.id; END"
+    )
+    cursor.execute(
+        "CREATE TRIGGER trg_clients_normalize_au AFTER UPDATE OF name, company_name, phone ON clients BEGIN "
+        f"UPDATE clients SET {_M007_CLIENT_NORMALIZE.format(r='new')} WHERE id = new.id; END"
+    )
+    cursor.execute(f"UPDATE clients SET {_M007_CLIENT_NORMALIZE.format(r='clients')}")
+    # البحث بالتليفون ومنع تكرار العميل بنفس الرقم
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_phone_norm ON clients(phone_norm)")
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    if cursor.fetchone() is None:
+        return  # مفيش FTS5 (الإصدار 6 اتخطى الفهرس)
+    cursor.execute("DELETE FROM search_index")
+    _fill_search_index(cursor, _M007_SEARCH_SOURCES, wrap="index_text({})")
+
+
+# --- 8. triggers من غير دوال Python ---
+
+# الإصدار 8: الـ triggers بتسجل الصف المتغير في search_pending بس (SQL عادي يشتغل على أي اتصال)
+# والتوحيد والفهرسة بيحصلوا في Repository (core/search_index.py: flush_search_pending)
+_M008_PENDING_TABLE = (
+    "CREATE TABLE IF NOT EXISTS search_pending ("
+    "table_name TEXT NOT NULL, row_id INTEGER NOT NULL, PRIMARY KEY (table_name, row_id)) WITHOUT ROWID"
+)
+_M008_ENQUEUE = "INSERT OR IGNORE INTO search_pending(table_name, row_id) VALUES ('{table}', new.id);"
+_M008_CLIENT_NORMALIZE_WATCHED = "name, company_name, phone"
+
+
+def _m008_pure_sql_triggers(repo, cursor: sqlite3.Cursor):
+    """
+    استبدال triggers الإصدارين 6 و 7 (بتنادي index_text / normalize_text / normalize_phone
+    وبتفشل على أي اتصال مش متسجل عليه الدوال) بـ triggers بتسجل الصف في search_pending
+    """
+    cursor.execute(_M008_PENDING_TABLE)
+
+    enqueue = _M008_ENQUEUE.format(table="clients")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_normalize_ai")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_clients_normalize_au")
+    cursor.execute(f"CREATE TRIGGER trg_clients_normalize_ai AFTER INSERT ON clients BEGIN {enqueue} END")
+    cursor.execute(
+        f"CREATE TRIGGER trg_clients_normalize_au AFTER UPDATE OF {_M008_CLIENT_NORMALIZE_WATCHED} "
+        f"ON clients BEGIN {enqueue} END"
+    )
+
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'")
+    if cursor.fetchone() is None:
+        return  # مفيش FTS5 (الإصدار 6 اتخطى الفهرس)
+    for table, code, _title, _body, watched in _M006_SEARCH_SOURCES:
+        enqueue = _M008_ENQUEUE.format(table=table)
+        prefix = f"trg_{table}_search"
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_ai")
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_au")
+        cursor.execute(f"CREATE TRIGGER {prefix}_ai AFTER INSERT ON {table} BEGIN {enqueue} END")
+        cursor.execute(f"CREATE TRIGGER {prefix}_au AFTER UPDATE OF {watched} ON {table} BEGIN {enqueue} END")
+        # trg_{table}_search_ad (حذف صف الفهرس بالـ rowid) SQL عادي من الإصدار 6
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "base_schema", _m001_base_schema),
+    Migration(2, "indexes", _m002_indexes),
+    Migration(3, "backfill_journal_tables", _m003_backfill_journal_tables),
+    Migration(4, "sync_indexes", _m004_sync_indexes),
+    Migration(5, "keyset_indexes", _m005_keyset_indexes),
+    Migration(6, "search_index", _m006_search_index),
+    Migration(7, "normalized_search", _m007_normalized_search),
+    Migration(8, "pure_sql_triggers", _m008_pure_sql_triggers),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
+
+
+def run_migrations(repo, migrations: Optional[List[Migration]] = None) -> Dict[str, Any]:
+    """
+    تنفيذ الـ migrations الناقصة في transaction واحد على اتصال الكتابة
+
+    Returns:
+        تقرير: from_version, to_version, applied [{version, name, ms}], total_ms
+    """
+    migrations = sorted(migrations or MIGRATIONS, key=lambda m: m.version)
+    started = time.perf_counter()
+    with repo._reader() as cursor:
+        current = get_schema_version(cursor)
+    pending = [m for m in migrations if m.version > current]
+    report: Dict[str, Any] = {
+        'from_version': current,
+        'to_version': current,
+        'applied': [],
+        'total_ms': 0.0,
+    }
+    if not pending:
+        report['total_ms'] = (time.perf_counter() - started) * 1000
+        print(f"INFO: [Migrations] قاعدة البيانات محدثة (الإصدار {current}) - {report['total_ms']:.1f}ms")
+        return report
+
+    print(f"INFO: [Migrations] جاري تحديث قاعدة البيانات من الإصدار {current} إلى {pending[-1].version}...")
+    with repo._pool.writer() as cursor:
+        for migration in pending:
+            migration_started = time.perf_counter()
+            migration.apply(repo, cursor)
+            report['applied'].append({
+                'version': migration.version,
+                'name': migration.name,
+                'ms': (time.perf_counter() - migration_started) * 1000,
+            })
+        # ⚡ الرقم بيتكتب جوه نفس الـ transaction - لو حاجة فشلت الـ migrations هتتعاد كلها
+        cursor.execute(f"PRAGMA user_version = {int(pending[-1].version)}")
+
+    report['to_version'] = pending[-1].version
+    report['total_ms'] = (time.perf_counter() - started) * 1000
+    print(format_migration_report(report))
+    return report
+
+
+def format_migration_report(report: Dict[str, Any]) -> str:
+    """تقرير نصي بوقت كل migration"""
+    lines = [f"INFO: [Migrations] الإصدار {report['from_version']} -> {report['to_version']} "
+             f"في {report['total_ms']:.1f}ms"]
+    for item in report['applied']:
+        lines.append(f"  {item['version']:>4}  {item['name']:<30}{item['ms']:>10.1f}ms")
+    return "\n".join(lines)
@@ -8,7 +8,7 @@ import time
 import functools
 import logging
 import statistics
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from contextlib import contextmanager
@@ -413,6 +413,575 @@ def print_performance_report() -> None:
     print(profiler.get_report())
 
 
+class StartupTrace:
+    """
+    ⚡ زمن كل مكوّن في تشغيل البرنامج (cold start) بالترتيب
+    - step(): مدة مكوّن (ينفع تتداخل - التقرير بيبين المستوى)
+    - start() / stop(): نفس step من غير with (خطوة بتلف كود على مستوى الموديول زي الـ imports)
+    - mark(): لحظة مهمة محسوبة من أول التشغيل (ظهور الـ login / النافذة الرئيسية)
+    كل step بيتسجل كمان في PerformanceProfiler باسم startup.<name>
+
+    الاستخدام:
+        with startup_trace.step("Repository"):
+            repo = Repository()
+        startup_trace.mark("login shown")
+        startup_trace.report()
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._entries: List[Dict[str, Any]] = []
+        self._depth = 0
+        self._lock = Lock()
+
+    @contextmanager
+    def step(self, name: str):
+        entry = self.start(name)
+        try:
+            yield entry
+        finally:
+            self.stop(entry)
+
+    def start(self, name: str) -> Dict[str, Any]:
+        """بداية خطوة - بترجع الـ entry اللي بيتقفل بـ stop(entry)"""
+        offset_ms = (time.perf_counter() - self._origin) * 1000
+        with self._lock:
+            entry = {'name': name, 'kind': 'step', 'depth': self._depth,
+                     'offset_ms': offset_ms, 'ms': None}
+            self._entries.append(entry)
+            self._depth += 1
+        return entry
+
+    def stop(self, entry: Dict[str, Any]) -> float:
+        """نهاية خطوة بدأت بـ start() - بترجع مدتها بالـ ms"""
+        duration = time.perf_counter() - self._origin - entry['offset_ms'] / 1000
+        with self._lock:
+            self._depth -= 1
+            entry['ms'] = duration * 1000
+        get_profiler().record_metric(PerformanceMetric(name=f"startup.{entry['name']}", duration=duration))
+        return entry['ms']
+
+    def mark(self, name: str) -> float:
+        """تسجيل لحظة (ms من أول التشغيل)"""
+        offset_ms = (time.perf_counter() - self._origin) * 1000
+        with self._lock:
+            self._entries.append({'name': name, 'kind': 'mark', 'depth': self._depth,
+                                  'offset_ms': offset_ms, 'ms': None})
+        return offset_ms
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(entry) for entry in self._entries]
+
+    def report(self, title: str = "Startup trace") -> str:
+        """جدول بالمكوّنات والأزمنة (بيتكتب في الـ log وبيترجع كنص)"""
+        lines = [f"⏱️ {title} (الإجمالي {(time.perf_counter() - self._origin) * 1000:.0f}ms)"]
+        for entry in self.entries:
+            indent = "  " * entry['depth']
+            if entry['kind'] == 'mark':
+                lines.append(f"  {indent}▸ {entry['name']:<40} @ {entry['offset_ms']:8.0f}ms")
+            else:
+                duration = f"{entry['ms']:8.1f}ms" if entry['ms'] is not None else "   (شغال)"
+                lines.append(f"  {indent}{entry['name']:<42} {duration}")
+        text = "\n".join(lines)
+        logger.info(text)
+        return text
+
+
+# ⚡ trace واحد لتشغيل البرنامج (main.py + MainWindow)
+startup_trace = StartupTrace()
+
+
+# --- Benchmarks ---
+
+class _RoundTripCounter:
+    """
+    غلاف حوالين MongoDB database (mongomock) بيعد الـ round trips
+    ويضيف تأخير شبكة ثابت لكل طلب (لمحاكاة سيرفر بعيد)
+    """
+
+    _CALLS = ("find", "find_one", "aggregate", "count_documents")
+
+    def __init__(self, db, latency_s: float):
+        self._db = db
+        self._latency_s = latency_s
+        self.round_trips = 0
+
+    def __getattr__(self, collection_name: str):
+        collection = getattr(self._db, collection_name)
+        counter = self
+
+        class _Collection:
+            def __getattr__(self, name):
+                attr = getattr(collection, name)
+                if name not in _RoundTripCounter._CALLS:
+                    return attr
+
+                def call(*args, **kwargs):
+                    counter.round_trips += 1
+                    time.sleep(counter._latency_s)
+                    result = attr(*args, **kwargs)
+                    # الـ cursor بيتقرا مرة واحدة (زي batch واحد من السيرفر)
+                    return list(result) if hasattr(result, '__iter__') and not isinstance(result, dict) else result
+                return call
+
+        return _Collection()
+
+
+def _legacy_dashboard_kpis_mongo(db, open_statuses: List[str]) -> Dict[str, float]:
+    """الطريقة القديمة (N+1) - للمقارنة في الـ benchmark فقط"""
+    total_collected = sum(p.get("amount", 0) for p in db.payments.find({}, {"amount": 1}))
+    total_expenses = sum(e.get("amount", 0) for e in db.expenses.find({}, {"amount": 1}))
+    total_outstanding = 0.0
+    for project in db.projects.find({"status": {"$in": open_statuses}}, {"name": 1, "total_amount": 1}):
+        paid = sum(p.get("amount", 0) for p in db.payments.find({"project_id": project.get("name")}, {"amount": 1}))
+        remaining = project.get("total_amount", 0) - paid
+        if remaining > 0:
+            total_outstanding += remaining
+    return {"total_collected": total_collected, "total_expenses": total_expenses,
+            "total_outstanding": total_outstanding}
+
+
+def _legacy_dashboard_kpis_sqlite(cursor, open_statuses: List[str]) -> Dict[str, float]:
+    """الطريقة القديمة (query لكل مشروع) - للمقارنة في الـ benchmark فقط"""
+    total_collected = cursor.execute("SELECT SUM(amount) FROM payments").fetchone()[0] or 0.0
+    total_expenses = cursor.execute("SELECT SUM(amount) FROM expenses").fetchone()[0] or 0.0
+    total_outstanding = 0.0
+    projects = cursor.execute(
+        "SELECT name, total_amount FROM projects WHERE status IN (?, ?, ?)", open_statuses
+    ).fetchall()
+    for name, total in projects:
+        paid = cursor.execute("SELECT SUM(amount) FROM payments WHERE project_id = ?", (name,)).fetchone()[0] or 0.0
+        remaining = (total or 0.0) - paid
+        if remaining > 0:
+            total_outstanding += remaining
+    return {"total_collected": total_collected, "total_expenses": total_expenses,
+            "total_outstanding": total_outstanding}
+
+
+def make_repository(conn=None, migrate: bool = True, online: bool = False, mongo_db=None):
+    """
+    ⚡ Repository من غير __init__ (من غير skywave_local.db ومن غير اتصال MongoDB) للـ benchmarks
+    والاختبارات - على اتصال SQLite جاهز (None = قاعدة في الذاكرة)
+
+    Args:
+        conn: اتصال sqlite3 (autocommit - isolation_level=None) بيتلف بـ SQLitePool.wrap
+        migrate: تشغيل run_migrations على القاعدة
+        online: حالة الاتصال بـ MongoDB (مع mongo_db)
+        mongo_db: MongoDB database (mongomock أو _RoundTripCounter)
+    """
+    import sqlite3
+    import threading
+    from core.circuit_breaker import CircuitBreaker
+    from core.migrations import run_migrations
+    from core.repository import READ_LOCAL_FIRST, Repository
+    from core.sqlite_pool import SQLitePool
+
+    if conn is None:
+        conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+    repo = Repository.__new__(Repository)
+    repo.mongo_breaker = CircuitBreaker()
+    repo._uow_local = threading.local()
+    repo.online = online
+    repo.mongo_db = mongo_db
+    repo.read_policy = READ_LOCAL_FIRST
+    repo.sqlite_conn = conn
+    repo._pool = SQLitePool.wrap(conn)
+    repo._lock = repo._pool.write_lock
+    if migrate:
+        run_migrations(repo)
+    return repo
+
+
+def benchmark_dashboard_kpis(
+    project_counts: tuple = (10, 100, 500),
+    payments_per_project: int = 3,
+    latency_ms: float = 5.0
+) -> List[Dict[str, Any]]:
+    """
+    ⚡ Benchmark لـ Repository.get_dashboard_kpis: عدد الـ round trips والوقت
+    مقابل عدد المشاريع (الطريقة القديمة N+1 مقابل الـ aggregation)
+
+    - SQLite: قاعدة في الذاكرة، والـ round trips = عدد الـ statements
+    - MongoDB: بيشتغل لو mongomock متسطب، مع تأخير latency_ms لكل طلب
+
+    الاستخدام:
+        python -c "from core.performance import benchmark_dashboard_kpis; benchmark_dashboard_kpis()"
+
+    Returns:
+        قائمة نتايج: backend, projects, legacy/new round trips و ms
+    """
+    import sqlite3
+    from core import schemas
+
+    open_statuses = [
+        schemas.ProjectStatus.ACTIVE.value,
+        schemas.ProjectStatus.PLANNING.value,
+        schemas.ProjectStatus.ON_HOLD.value,
+    ]
+
+    def seed_rows(count: int):
+        projects, payments, expenses = [], [], []
+        for i in range(count):
+            name = f"Project {i}"
+            projects.append({"name": name, "total_amount": 1000.0,
+                             "status": open_statuses[i % len(open_statuses)]})
+            for _ in range(payments_per_project):
+                payments.append({"project_id": name, "amount": 100.0})
+            expenses.append({"amount": 50.0})
+        return projects, payments, expenses
+
+    try:
+        import mongomock
+    except ImportError:
+        mongomock = None
+        logger.warning("mongomock غير متسطب - الـ benchmark هيقيس SQLite بس")
+
+    results: List[Dict[str, Any]] = []
+    for count in project_counts:
+        projects, payments, expenses = seed_rows(count)
+
+        # --- SQLite ---
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.executescript("""
+            CREATE TABLE projects (name TEXT, total_amount REAL, status TEXT);
+            CREATE TABLE payments (project_id TEXT, amount REAL);
+            CREATE TABLE expenses (amount REAL);
+            CREATE INDEX idx_payments_project ON payments(project_id);
+        """)
+        conn.executemany("INSERT INTO projects VALUES (:name, :total_amount, :status)", projects)
+        conn.executemany("INSERT INTO payments VALUES (:project_id, :amount)", payments)
+        conn.executemany("INSERT INTO expenses VALUES (:amount)", expenses)
+
+        statements = [0]
+        conn.set_trace_callback(lambda _sql, counter=statements: counter.__setitem__(0, counter[0] + 1))
+        start = time.perf_counter()
+        _legacy_dashboard_kpis_sqlite(conn.cursor(), open_statuses)
+        legacy_ms = (time.perf_counter() - start) * 1000
+        legacy_trips, statements[0] = statements[0], 0
+
+        start = time.perf_counter()
+        make_repository(conn, migrate=False).get_dashboard_kpis()
+        new_ms = (time.perf_counter() - start) * 1000
+        results.append({"backend": "sqlite", "projects": count,
+                        "legacy_round_trips": legacy_trips, "legacy_ms": legacy_ms,
+                        "new_round_trips": statements[0], "new_ms": new_ms})
+        conn.close()
+
+        # --- MongoDB (mongomock) ---
+        if mongomock is not None:
+            db = mongomock.MongoClient().db
+            db.projects.insert_many([dict(p) for p in projects])
+            db.payments.insert_many([dict(p) for p in payments])
+            db.expenses.insert_many([dict(e) for e in expenses])
+
+            legacy_db = _RoundTripCounter(db, latency_ms / 1000)
+            start = time.perf_counter()
+            _legacy_dashboard_kpis_mongo(legacy_db, open_statuses)
+            legacy_ms = (time.perf_counter() - start) * 1000
+
+            new_db = _RoundTripCounter(db, latency_ms / 1000)
+            start = time.perf_counter()
+            make_repository(migrate=False, online=True, mongo_db=new_db).get_dashboard_kpis()
+            new_ms = (time.perf_counter() - start) * 1000
+            results.append({"backend": "mongo", "projects": count,
+                            "legacy_round_trips": legacy_db.round_trips, "legacy_ms": legacy_ms,
+                            "new_round_trips": new_db.round_trips, "new_ms": new_ms})
+
+    print(f"{'backend':<8}{'projects':>10}{'legacy trips':>14}{'legacy ms':>12}{'new trips':>11}{'new ms':>10}")
+    for row in results:
+        print(f"{row['backend']:<8}{row['projects']:>10}{row['legacy_round_trips']:>14}"
+              f"{row['legacy_ms']:>12.1f}{row['new_round_trips']:>11}{row['new_ms']:>10.1f}")
+    return results
+
+
+
+def benchmark_repository_startup(
+    runs: int = 3,
+    online_uri: Optional[str] = None,
+    offline_uri: str = "mongodb://127.0.0.1:9/"
+) -> List[Dict[str, Any]]:
+    """
+    ⚡ Benchmark لتشغيل الـ Repository على البارد: الاتصال بـ MongoDB قبل الـ SQLite
+    (الطريقة القديمة) مقابل الاتصال في الخلفية، أونلاين وأوفلاين
+
+    - ready_ms: من إنشاء الـ Repository لحد أول قراءة محلية (ده اللي بيأخر الـ splash)
+    - connect_ms: وقت محاولة الاتصال بـ MongoDB نفسها (نجحت أو فشلت)
+    - migrate_ms: وقت مرحلة الـ migrations (في التشغيل العادي = قراءة user_version بس)
+    - أوفلاين = سيرفر مش موجود (offline_uri) فالمحاولة بتستنى الـ timeout كامل
+
+    الاستخدام:
+        python -c "from core.performance import benchmark_repository_startup; benchmark_repository_startup()"
+
+    Returns:
+        قائمة نتايج: network, mode, online, ready_ms, connect_ms, migrate_ms (متوسط runs مرة)
+    """
+    from core.repository import MONGO_URI, Repository
+
+    scenarios = [("online", online_uri or MONGO_URI), ("offline", offline_uri)]
+    results: List[Dict[str, Any]] = []
+    for network, uri in scenarios:
+        for mode, connect_async in (("blocking", False), ("background", True)):
+            ready_total = connect_total = migrate_total = 0.0
+            connected = False
+            for _ in range(runs):
+                start = time.perf_counter()
+                repo = Repository(connect_async=connect_async, mongo_uri=uri)
+                with repo._reader() as cursor:
+                    cursor.execute("SELECT COUNT(*) FROM clients").fetchone()
+                ready_total += (time.perf_counter() - start) * 1000
+
+                connected = repo.wait_for_connection(timeout=30)
+                connect_total += (repo.mongo_connect_seconds or 0.0) * 1000
+                migrate_total += repo.migration_report['total_ms']
+                repo.close()
+            results.append({"network": network, "mode": mode, "online": connected,
+                            "ready_ms": ready_total / runs, "connect_ms": connect_total / runs,
+                            "migrate_ms": migrate_total / runs})
+
+    print(f"{'network':<9}{'mode':<12}{'online':>8}{'ready ms':>11}{'connect ms':>12}{'migrate ms':>12}")
+    for row in results:
+        print(f"{row['network']:<9}{row['mode']:<12}{str(row['online']):>8}"
+              f"{row['ready_ms']:>11.1f}{row['connect_ms']:>12.1f}{row['migrate_ms']:>12.1f}")
+    return results
+
+
+def query_plan_checks() -> List[Tuple[str, int, str]]:
+    """
+    أهم queries المزامنة والإجماليات والصفحات: (query, عدد الـ parameters, النص المطلوب في الـ plan)
+    (verify_query_plans و tests/test_query_plans.py)
+    """
+    from core.migrations import SYNCED_TABLES, UNSYNCED_CONDITION
+    from core.search_index import SOURCES_BY_ENTITY, SearchFilter
+
+    checks = []
+    for table in SYNCED_TABLES:
+        checks += [
+            (f"SELECT * FROM {table} WHERE {UNSYNCED_CONDITION}", 0, f"INDEX idx_{table}_unsynced"),
+            (f"SELECT COUNT(*) FROM {table} WHERE {UNSYNCED_CONDITION}", 0, f"COVERING INDEX idx_{table}_unsynced"),
+            (f"SELECT _mongo_id, sync_status FROM {table} WHERE _mongo_id IN (?, ?)", 2, f"INDEX idx_{table}_mongo_id"),
+            (f"UPDATE {table} SET sync_status = 'synced' WHERE _mongo_id = ?", 1, f"INDEX idx_{table}_mongo_id"),
+            (f"DELETE FROM {table} WHERE _mongo_id = ?", 1, f"INDEX idx_{table}_mongo_id"),
+        ]
+    checks += [
+        ("SELECT * FROM payments WHERE id = ? OR _mongo_id = ?", 2, "INDEX idx_payments_mongo_id"),
+        ("SELECT project_id, SUM(amount) FROM payments WHERE project_id IS NOT NULL GROUP BY project_id",
+         0, "COVERING INDEX idx_payments_project_amount"),
+        ("SELECT COALESCE(SUM(amount), 0) FROM payments WHERE project_id = ?",
+         1, "COVERING INDEX idx_payments_project_amount"),
+        ("SELECT COALESCE(SUM(amount), 0) FROM expenses WHERE project_id = ?",
+         1, "COVERING INDEX idx_expenses_project_amount"),
+        ("SELECT project_id, SUM(amount) FROM expenses WHERE project_id IS NOT NULL GROUP BY project_id",
+         0, "COVERING INDEX idx_expenses_project_amount"),
+        # صفحات القوائم (keyset) - من غير TEMP B-TREE للترتيب
+        ("SELECT * FROM projects WHERE status != ? AND (created_at, id) < (?, ?) "
+         "ORDER BY created_at DESC, id DESC LIMIT ?", 4, "INDEX idx_projects_created (created_at<?)"),
+        ("SELECT * FROM clients WHERE status = ? AND (created_at, id) < (?, ?) "
+         "ORDER BY created_at DESC, id DESC LIMIT ?", 4, "INDEX idx_clients_status_created (status=? AND created_at<?)"),
+        ("SELECT * FROM payments WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT ?",
+         3, "INDEX idx_payments_date (date<?)"),
+        # منع تكرار العميل بنفس التليفون (الرقم المتوحد)
+        ("SELECT * FROM clients WHERE phone_norm = ? AND status != ?", 2, "INDEX idx_clients_phone_norm"),
+    ]
+    # فلاتر البحث المتقدم (SearchFilter) - لو فهرس البحث مش متاح (Repository.get_search_rows)
+    today = datetime.now().date()
+    for entity, search_filter, expected in (
+        ("expense", SearchFilter(date_from=today, date_to=today), "INDEX idx_expenses_date (date>? AND date<?)"),
+        ("project", SearchFilter(status="نشط"), "INDEX idx_projects_status (status=?)"),
+    ):
+        source = SOURCES_BY_ENTITY[entity]
+        conditions, params = search_filter.sql_conditions(source)
+        checks.append((f"SELECT * FROM {source.table} WHERE {' AND '.join(conditions)}", len(params), expected))
+    return checks
+
+
+def explain_query_plan(conn, sql: str, param_count: int = 0) -> str:
+    """خطوات EXPLAIN QUERY PLAN في سطر واحد (مفصولة بـ |)"""
+    return " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", (None,) * param_count))
+
+
+def verify_query_plans(raise_on_failure: bool = True) -> List[Dict[str, Any]]:
+    """
+    ⚡ فحص EXPLAIN QUERY PLAN لأهم queries المزامنة والإجماليات على schema الـ migrations
+    (قاعدة في الذاكرة) - عشان أي تعديل يبوّظ استخدام الـ indexes يبان فوراً
+
+    الاستخدام:
+        python -c "from core.performance import verify_query_plans; verify_query_plans()"
+
+    Returns:
+        قائمة نتايج: query, expected, plan, ok
+
+    Raises:
+        AssertionError: لو query مش بيستخدم الـ index المتوقع (و raise_on_failure = True)
+    """
+    conn = make_repository().sqlite_conn
+
+    results: List[Dict[str, Any]] = []
+    for sql, param_count, expected in query_plan_checks():
+        plan = explain_query_plan(conn, sql, param_count)
+        results.append({"query": sql, "expected": expected, "plan": plan, "ok": expected in plan})
+    conn.close()
+
+    failures = [r for r in results if not r["ok"]]
+    print(f"INFO: [QueryPlans] {len(results) - len(failures)}/{len(results)} queries بتستخدم الـ index المتوقع")
+    for row in failures:
+        print(f"  ❌ {row['query']}\n     المتوقع: {row['expected']}\n     الفعلي: {row['plan']}")
+    if failures and raise_on_failure:
+        raise AssertionError(f"{len(failures)} query مش بيستخدم الـ index المتوقع")
+    return results
+
+def benchmark_row_views(
+    row_counts: tuple = (1000, 5000, 20000),
+    items_per_project: int = 5,
+    runs: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    ⚡ Benchmark لتحميل شاشات القوائم: Pydantic models كاملة مقابل row views
+    (get_all_payments / get_all_projects بـ as_views=True) على schema الـ migrations في الذاكرة
+
+    - load_ms: جلب الصفوف وبناء الـ models أو الـ views
+    - table_ms: التحميل + قراءة الحقول اللي الجدول بيعرضها (زي PaymentsManagerTab)
+    - الـ items بتاعة المشاريع JSON في الـ views مش بتتفك خالص لأن الجدول مش بيقراها
+
+    الاستخدام:
+        python -c "from core.performance import benchmark_row_views; benchmark_row_views()"
+
+    Returns:
+        قائمة نتايج: table, rows, mode, load_ms, table_ms (متوسط runs مرة)
+    """
+    import json
+
+    def read_payment_row(payment):
+        return (payment.date.strftime("%Y-%m-%d") if payment.date else "",
+                payment.project_id, payment.amount, payment.account_id, payment.id or payment._mongo_id)
+
+    def read_project_row(project):
+        return (project.name, project.client_id, project.status.value,
+                project.total_amount, project.start_date)
+
+    items_json = json.dumps([
+        {"service_id": f"S{i}", "description": f"بند {i}", "quantity": 1.0,
+         "unit_price": 100.0, "total": 100.0}
+        for i in range(items_per_project)
+    ])
+    scenarios = [
+        ("payments", lambda repo, views: repo.get_all_payments(as_views=views), read_payment_row),
+        ("projects", lambda repo, views: repo.get_all_projects(as_views=views), read_project_row),
+    ]
+
+    results: List[Dict[str, Any]] = []
+    for count in row_counts:
+        repo = make_repository()
+        conn = repo.sqlite_conn
+        now = datetime.now().isoformat()
+        conn.executemany(
+            "INSERT INTO payments (_mongo_id, sync_status, created_at, last_modified, project_id, "
+            "client_id, date, amount, account_id, method) VALUES (?, 'synced', ?, ?, ?, ?, ?, ?, '1110', 'Cash')",
+            [(f"p{i}", now, now, f"Project {i % 500}", f"C{i % 100}", now, 100.0 + i) for i in range(count)]
+        )
+        conn.executemany(
+            "INSERT INTO projects (_mongo_id, sync_status, created_at, last_modified, name, client_id, "
+            "status, start_date, items, total_amount, currency) VALUES (?, 'synced', ?, ?, ?, ?, 'نشط', ?, ?, ?, 'EGP')",
+            [(f"pr{i}", now, now, f"Project {i}", f"C{i % 100}", now, items_json, 500.0) for i in range(count)]
+        )
+
+        for table, load, read_row in scenarios:
+            for mode, views in (("pydantic", False), ("views", True)):
+                load_total = table_total = 0.0
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    rows = load(repo, views)
+                    load_total += (time.perf_counter() - start) * 1000
+                    for row in rows:
+                        read_row(row)
+                    table_total += (time.perf_counter() - start) * 1000
+                results.append({"table": table, "rows": count, "mode": mode,
+                                "load_ms": load_total / runs, "table_ms": table_total / runs})
+        conn.close()
+
+    print(f"{'table':<10}{'rows':>8}{'mode':>10}{'load ms':>11}{'table ms':>11}")
+    for row in results:
+        print(f"{row['table']:<10}{row['rows']:>8}{row['mode']:>10}"
+              f"{row['load_ms']:>11.1f}{row['table_ms']:>11.1f}")
+    return results
+
+
+def benchmark_search_index(
+    record_counts: tuple = (10000, 100000),
+    queries: tuple = ("sky", "skywave 77", "SW-0042", "0100000012", "تصميم"),
+    runs: int = 5,
+    legacy_max_records: int = 20000
+) -> List[Dict[str, Any]]:
+    """
+    ⚡ Benchmark للبحث الشامل: فهرس FTS5 (repo.search_index) مقابل مسح الصفوف في Python
+    (SmartSearchService القديم) على schema الـ migrations في الذاكرة
+
+    - السجلات متوزعة على المشاريع والعملاء والمصروفات (النص نصه عربي ونصه إنجليزي)
+    - الطريقة القديمة بتتقاس لحد legacy_max_records بس (بعد كده بتاخد ثواني)
+
+    الاستخدام:
+        python -c "from core.performance import benchmark_search_index; benchmark_search_index()"
+
+    Returns:
+        قائمة نتايج: records, query, mode, hits, ms (متوسط runs مرة)
+    """
+    from core.search_index import flush_search_pending
+    from services.search_service import SmartSearchService
+
+    words = ("skywave", "تصميم", "موقع", "marketing", "هوية", "campaign", "sky", "برمجة")
+    results: List[Dict[str, Any]] = []
+    for count in record_counts:
+        repo = make_repository()
+        conn = repo.sqlite_conn
+        now = datetime.now().isoformat()
+        per_table = count // 3
+        conn.executemany(
+            "INSERT INTO projects (_mongo_id, sync_status, created_at, last_modified, name, client_id, "
+            "status, items, total_amount, currency, project_notes) "
+            "VALUES (?, 'synced', ?, ?, ?, ?, 'نشط', '[]', 1000, 'EGP', ?)",
+            [(f"pr{i:06d}", now, now, f"{words[i % 8]} {words[(i // 8) % 8]} {i}",
+              f"Client {i % 500}", f"مشروع {words[(i + 3) % 8]}") for i in range(per_table)]
+        )
+        conn.executemany(
+            "INSERT INTO clients (sync_status, created_at, last_modified, name, phone, email, status) "
+            "VALUES ('synced', ?, ?, ?, ?, ?, 'نشط')",
+            [(now, now, f"Client {i} {words[i % 8]}", f"010{i:08d}", f"client{i}@mail.com")
+             for i in range(per_table)]
+        )
+        conn.executemany(
+            "INSERT INTO expenses (sync_status, created_at, last_modified, date, category, amount, "
+            "description, account_id) VALUES ('synced', ?, ?, ?, ?, ?, ?, '5110')",
+            [(now, now, now, words[i % 8], 100.0 + i, f"مصروف {words[(i // 8) % 8]}")
+             for i in range(count - 2 * per_table)]
+        )
+        # الصفوف اتكتبت من برا الـ Repository - الفهرسة قبل القياس مش جواه
+        with repo._local_transaction() as cursor:
+            flush_search_pending(cursor)
+        service = SmartSearchService(repo)
+
+        modes = [("fts5", True)]
+        if count <= legacy_max_records:
+            modes.append(("legacy", False))
+        for query in queries:
+            for mode, use_index in modes:
+                repo._search_index_available = use_index
+                total = 0.0
+                hits = 0
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    hits = len(service.search(query, limit=100))
+                    total += (time.perf_counter() - start) * 1000
+                results.append({"records": count, "query": query, "mode": mode,
+                                "hits": hits, "ms": total / runs})
+        conn.close()
+
+    print(f"{'records':>8}  {'query':<14}{'mode':>8}{'hits':>7}{'ms':>10}")
+    for row in results:
+        print(f"{row['records']:>8}  {row['query']:<14}{row['mode']:>8}{row['hits']:>7}{row['ms']:>10.1f}")
+    return results
+
 # --- اختبار ---
 if __name__ == "__main__":
     print("--- اختبار أدوات قياس الأداء ---\n")
@@ -0,0 +1,232 @@
+# الملف: core/row_views.py
+"""
+⚡ عرض خفيف لصفوف SQLite (Row Views) لشاشات القوائم
+- بدل ما نبني Pydantic model كامل لكل صف (validation + JSON + تواريخ) بنلف الصف نفسه
+- الحقل بيتفك (datetime / Enum / JSON) أول مرة بس يتقرا وبيتخزن - الباقي مش بيتلمس
+- الصفوف جاية من SQLite بتاعنا (اتعملها validation وقت الكتابة) فبنعتبرها موثوقة
+- الـ validation الكامل بيحصل وقت الكتابة بس: to_model() / model_copy() / model_dump()
+
+الاستخدام:
+    payments = repo.get_all_payments(as_views=True)
+    payments[0].amount          # قراءة مباشرة من الصف
+    payments[0].date            # datetime (بيتفك أول مرة بس)
+    payment = payments[0].to_model()   # schemas.Payment كامل قبل التعديل/الحفظ
+"""
+
+import json
+import typing
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+# الأسماء البديلة للأعمدة (اسم الخاصية ← اسم العمود في SQLite)
+_COLUMN_ALIASES = {'mongo_id': '_mongo_id'}
+
+
+def _unwrap_optional(annotation):
+    """Optional[X] ← X"""
+    if typing.get_origin(annotation) is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _decode_datetime(value):
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _enum_decoder(enum_cls: Type[Enum]) -> Callable[[Any], Any]:
+    def decode(value):
+        if value is None or isinstance(value, enum_cls):
+            return value
+        try:
+            return enum_cls(value)
+        except ValueError:
+            return value
+    return decode
+
+
+def _json_decoder(item_model: Optional[Type[BaseModel]], default_factory) -> Callable[[Any], Any]:
+    def decode(value):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                return default_factory()
+        if value is None:
+            return default_factory()
+        if item_model is not None and isinstance(value, list):
+            items = []
+            for item in value:
+                if isinstance(item, dict):
+                    try:
+                        item = item_model(**item)
+                    except Exception:
+                        item = item_model.model_construct(**item)
+                items.append(item)
+            return items
+        return value
+    return decode
+
+
+def _bool_decoder(value):
+    return bool(value) if value is not None else value
+
+
+def _build_decoders(schema: Type[BaseModel]) -> Dict[str, Callable[[Any], Any]]:
+    """مفكك لكل حقل محتاج تحويل (الباقي بيترجع زي ما هو من الصف)"""
+    decoders = {}
+    for name, field in schema.model_fields.items():
+        annotation = _unwrap_optional(field.annotation)
+        origin = typing.get_origin(annotation)
+        if annotation is datetime:
+            decoders[name] = _decode_datetime
+        elif isinstance(annotation, type) and issubclass(annotation, Enum):
+            decoders[name] = _enum_decoder(annotation)
+        elif annotation is bool:
+            decoders[name] = _bool_decoder
+        elif origin in (list, List, dict, Dict):
+            item_model = None
+            args = typing.get_args(annotation)
+            if origin in (list, List) and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+                item_model = args[0]
+            default_factory = list if origin in (list, List) else dict
+            decoders[name] = _json_decoder(item_model, default_factory)
+    return decoders
+
+
+def _none_fallbacks(schema: Type[BaseModel]) -> frozenset:
+    """الحقول اللي مش Optional وليها default - NULL في الصف بيتحول للـ default"""
+    names = set()
+    for name, field in schema.model_fields.items():
+        if field.is_required() or _unwrap_optional(field.annotation) is not field.annotation:
+            continue
+        names.add(name)
+    return frozenset(names)
+
+
+def _field_default(field):
+    if field.default_factory is not None:
+        return field.default_factory()
+    return field.default
+
+
+def _cached(name: str, load: Callable[[Any], Any]) -> property:
+    """خاصية بتحسب القيمة أول مرة بس وبتخزنها في _cache"""
+    def get(self):
+        cache = self._cache
+        if cache is None:
+            cache = {}
+            object.__setattr__(self, '_cache', cache)
+        elif name in cache:
+            return cache[name]
+        value = cache[name] = load(self)
+        return value
+    return property(get)
+
+
+def _field_accessor(name: str, field, position: Optional[int], decoder, none_fallback: bool) -> property:
+    """⚡ خاصية الحقل: العمود المباشر قراءة من الـ tuple على طول - والباقي بيتفك مرة واحدة"""
+    if position is None:
+        return _cached(name, lambda self: _field_default(field))
+    if decoder is None and not none_fallback:
+        return property(lambda self: self._values[position])
+
+    def load(self):
+        value = self._values[position]
+        if value is None and none_fallback:
+            return _field_default(field)
+        return decoder(value) if decoder is not None else value
+    return _cached(name, load)
+
+
+class RowView:
+    """
+    صف قراءة فقط فوق tuple/sqlite3.Row - نفس أسماء خصائص الـ schema.
+    الـ subclass لكل (schema, أعمدة) بيتعمل مرة واحدة بـ row_view_class()
+    وفيه خاصية لكل حقل بمكان العمود بتاعه (مفيش بحث بالاسم لكل قراءة).
+    """
+
+    __slots__ = ('_values', '_cache')
+
+    schema: Type[BaseModel] = BaseModel
+
+    def __init__(self, values: Sequence[Any]):
+        object.__setattr__(self, '_values', values)
+        object.__setattr__(self, '_cache', None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(
+            f"{type(self).__name__} للقراءة فقط - استخدم to_model() قبل تعديل '{name}'"
+        )
+
+    @property
+    def _mongo_id(self) -> Optional[str]:
+        return self.mongo_id
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self.id!r}, _mongo_id={self.mongo_id!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """كل الحقول بعد فكها (بأسماء الـ schema)"""
+        return {name: getattr(self, name) for name in self.schema.model_fields}
+
+    def to_model(self) -> BaseModel:
+        """⚡ الـ model الكامل بـ validation (قبل أي تعديل أو حفظ)"""
+        return self.schema(**self.to_dict())
+
+    def model_dump(self, **kwargs) -> Dict[str, Any]:
+        return self.to_model().model_dump(**kwargs)
+
+    def model_copy(self, **kwargs) -> BaseModel:
+        return self.to_model().model_copy(**kwargs)
+
+
+_VIEW_CLASSES: Dict[Tuple[Type[BaseModel], Tuple[str, ...]], Type[RowView]] = {}
+
+
+def row_view_class(schema: Type[BaseModel], columns: Sequence[str]) -> Type[RowView]:
+    """كلاس الـ view الخاص بـ schema وترتيب أعمدة معين (بيتعمل ويتخزن أول مرة بس)"""
+    key = (schema, tuple(columns))
+    view_cls = _VIEW_CLASSES.get(key)
+    if view_cls is None:
+        decoders = _build_decoders(schema)
+        none_fallbacks = _none_fallbacks(schema)
+        positions = {column: position for position, column in enumerate(key[1])}
+        namespace: Dict[str, Any] = {'__slots__': (), 'schema': schema}
+        for name, field in schema.model_fields.items():
+            namespace[name] = _field_accessor(
+                name, field, positions.get(_COLUMN_ALIASES.get(name, name)),
+                decoders.get(name), name in none_fallbacks,
+            )
+        view_cls = type(f"{schema.__name__}View", (RowView,), namespace)
+        _VIEW_CLASSES[key] = view_cls
+    return view_cls
+
+
+def views_from_cursor(cursor, rows: Sequence[Sequence[Any]], schema: Type[BaseModel]) -> List[RowView]:
+    """
+    ⚡ لف نتيجة query في views (الكلاس بيتحدد مرة واحدة للنتيجة كلها من cursor.description)
+
+    Args:
+        cursor: الـ cursor اللي نفذ الـ query
+        rows: الصفوف من fetchall()
+        schema: الـ Pydantic model اللي الصفوف بتمثله
+    """
+    view_cls = row_view_class(schema, [column[0] for column in cursor.description or ()])
+    return [view_cls(row) for row in rows]
+
+
+def ensure_model(obj: Any) -> Any:
+    """لو obj عبارة عن view بيرجع الـ model الكامل (validation وقت الكتابة) - غير كده بيرجعه زي ما هو"""
+    if isinstance(obj, RowView):
+        return obj.to_model()
+    return obj
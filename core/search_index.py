@@ -0,0 +1,525 @@
+# الملف: core/search_index.py
+"""
+⚡ فهرس البحث الشامل (SQLite FTS5) للبحث الذكي
+- جدول FTS5 واحد (search_index) فيه صف لكل مشروع/عميل/مصروف/حساب/فاتورة/عرض سعر
+- أي كتابة (من الشاشات أو المزامنة أو أي برنامج تاني) بتسجل الصف في search_pending بـ triggers
+  SQL عادية، و Repository بيحدّث الفهرس والأعمدة المتوحدة منه في آخر كل transaction (flush_search_pending)
+- rowid الفهرس = id الصف * ROWID_STRIDE + كود النوع (الحذف والتعديل بالـ rowid مباشرة)
+- الترتيب بـ bm25 (العنوان أهم من التفاصيل) والبحث prefix على كل كلمة (زي ما المستخدم بيكتب)
+- النص بيتخزن متوحد (core/text_normalize.py: همزات / تاء مربوطة / تشكيل / أرقام عربي)
+  ونص البحث بيتوحد بنفس الطريقة - والتليفونات بتتفهرس بشكلها المحلي كمان (+20 ← 0)
+- فلاتر البحث المتقدم (SearchFilter: تاريخ / مبلغ / حالة / عميل / مشروع) بتتنفذ في الـ query
+  نفسه (JOIN على الجدول) - وبتتحول لـ $match لو البحث من MongoDB (Repository.get_search_rows)
+
+الاستخدام:
+    hits = repo.search_index("sky wave", entities=["project", "client"], limit=50)
+    hits[0]['entity'], hits[0]['id'], hits[0]['score'], hits[0]['name']
+"""
+
+import heapq
+import sqlite3
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .text_normalize import looks_like_phone, normalize_phone, normalized_words
+
+SEARCH_TABLE = "search_index"
+
+# الصفوف اللي اتكتبت ولسه فهرسها / أعمدتها المتوحدة متحدثتش (الـ triggers بتملاه)
+PENDING_TABLE = "search_pending"
+
+# rowid = id * ROWID_STRIDE + code (لازم يبقى أكبر من أكبر code)
+ROWID_STRIDE = 8
+
+# وزن أعمدة الفهرس في bm25 (title, body)
+BM25_WEIGHTS = (10.0, 3.0)
+
+# ⚡ فوق العدد ده من التطابقات (أول حرف أو اتنين) bm25 على الكل بيبقى أبطأ من الكتابة:
+# الترتيب بيتقسم لكل نوع لوحده - النوع اللي تطابقاته تحت الحد بيترتب بـ bm25 كامل، واللي فوقه
+# بناخد أحدث limit تطابق منه بس (مرتبين بـ bm25) - ولما الكلمة تكمل التطابقات بتقل والترتيب بيبقى كامل
+FULL_RANK_MAX_MATCHES = 5000
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """
+    جدول بيتفهرس: title / body تعبيرات SQL على صف الجدول ({r} = اسم الجدول)
+    columns = الأعمدة اللي بترجع مع النتيجة (لعرضها من غير ما نجيب الصف كامل)
+    filter_columns = (نوع الفلتر, العمود): date / amount / status / client / project
+    """
+    entity: str
+    code: int
+    table: str
+    title: str
+    body: str
+    watched: Tuple[str, ...]
+    columns: Tuple[str, ...]
+    filter_columns: Tuple[Tuple[str, str], ...] = ()
+
+
+# رقم الفاتورة المعروض للمشروع (نفس ProjectManagerTab._invoice_number): SW- + آخر 4 من الـ id
+_PROJECT_INVOICE_SQL = "'SW-' || substr('0000' || substr(COALESCE({r}._mongo_id, {r}.id), -4), -4)"
+
+
+def _join(*parts: str) -> str:
+    return " || ' ' || ".join(f"COALESCE({part}, '')" for part in parts)
+
+
+SEARCH_SOURCES: Tuple[SearchSource, ...] = (
+    SearchSource(
+        entity="project", code=1, table="projects",
+        title=_join("{r}.name", _PROJECT_INVOICE_SQL),
+        body=_join("{r}.client_id", "{r}.project_notes", "{r}.description", "{r}.status"),
+        watched=("name", "_mongo_id", "client_id", "project_notes", "description", "status"),
+        columns=("name", "client_id", "total_amount", "status", "_mongo_id", "created_at"),
+        filter_columns=(("date", "start_date"), ("amount", "total_amount"), ("status", "status"),
+                        ("client", "client_id"), ("project", "name")),
+    ),
+    SearchSource(
+        entity="client", code=2, table="clients",
+        title=_join("{r}.name", "{r}.company_name"),
+        body=_join("{r}.phone", "normalize_phone({r}.phone)", "{r}.email", "{r}.address", "{r}.work_field"),
+        watched=("name", "company_name", "phone", "email", "address", "work_field"),
+        columns=("name", "company_name", "phone", "email", "status", "created_at"),
+        filter_columns=(("date", "created_at"), ("status", "status"), ("client", "name")),
+    ),
+    SearchSource(
+        entity="expense", code=3, table="expenses",
+        title=_join("{r}.category"),
+        body=_join("{r}.description", "CAST({r}.amount AS TEXT)", "{r}.project_id"),
+        watched=("category", "description", "amount", "project_id"),
+        columns=("category", "description", "amount", "date", "project_id"),
+        filter_columns=(("date", "date"), ("amount", "amount"), ("project", "project_id")),
+    ),
+    SearchSource(
+        entity="account", code=4, table="accounts",
+        title=_join("{r}.name", "{r}.code"),
+        body=_join("{r}.description", "{r}.type"),
+        watched=("name", "code", "description", "type"),
+        columns=("name", "code", "type", "balance", "status"),
+        filter_columns=(("amount", "balance"), ("status", "status")),
+    ),
+    SearchSource(
+        entity="invoice", code=5, table="invoices",
+        title=_join("{r}.invoice_number"),
+        body=_join("{r}.client_id", "{r}.project_id", "{r}.notes", "{r}.status"),
+        watched=("invoice_number", "client_id", "project_id", "notes", "status"),
+        columns=("invoice_number", "client_id", "project_id", "total_amount", "status", "issue_date"),
+        filter_columns=(("date", "issue_date"), ("amount", "total_amount"), ("status", "status"),
+                        ("client", "client_id"), ("project", "project_id")),
+    ),
+    SearchSource(
+        entity="quotation", code=6, table="quotations",
+        title=_join("{r}.quote_number"),
+        body=_join("{r}.client_id", "{r}.project_id", "{r}.notes", "{r}.status"),
+        watched=("quote_number", "client_id", "project_id", "notes", "status"),
+        columns=("quote_number", "client_id", "project_id", "total_amount", "status", "issue_date"),
+        filter_columns=(("date", "issue_date"), ("amount", "total_amount"), ("status", "status"),
+                        ("client", "client_id"), ("project", "project_id")),
+    ),
+)
+
+# ⚡ أعمدة متوحدة محسوبة وقت الكتابة (flush_search_pending): جدول ← (العمود, العمود الأصلي, دالة التوحيد)
+# ClientService.search_clients بيدور فيها مباشرة من غير ما يوحد كل صف في كل بحث
+NORMALIZED_COLUMNS: Dict[str, Tuple[Tuple[str, str, str], ...]] = {
+    "clients": (
+        ("name_norm", "name", "normalize_text"),
+        ("company_norm", "company_name", "normalize_text"),
+        ("phone_norm", "phone", "normalize_phone"),
+    ),
+}
+
+# أعمدة محلية بس (مش بتترفع لـ MongoDB)
+LOCAL_ONLY_COLUMNS = frozenset(
+    column for columns in NORMALIZED_COLUMNS.values() for column, _source, _function in columns
+)
+
+SOURCES_BY_ENTITY: Dict[str, SearchSource] = {source.entity: source for source in SEARCH_SOURCES}
+SOURCES_BY_CODE: Dict[int, SearchSource] = {source.code: source for source in SEARCH_SOURCES}
+
+# مقارنة الفلتر ← operator في MongoDB
+_MONGO_OPERATORS = {">=": "$gte", "<=": "$lte", "<": "$lt", "=": "$eq"}
+
+
+@dataclass
+class SearchFilter:
+    """
+    فلاتر البحث المتقدم (None = من غير فلتر) على أعمدة SearchSource.filter_columns
+    - sql_conditions: شروط WHERE (على indexes التاريخ والحالة) - mongo_match: نفس الشروط لـ MongoDB
+    - النوع اللي مفيهوش عمود لفلتر متحدد بيتشال من البحث (فلتر مبلغ ← مفيش عملاء)
+    - date_to شامل اليوم كله (< اليوم اللي بعده)
+    """
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    amount_min: Optional[float] = None
+    amount_max: Optional[float] = None
+    status: Optional[str] = None
+    client_id: Optional[str] = None
+    project_id: Optional[str] = None
+
+    def criteria(self) -> List[Tuple[str, str, Any]]:
+        """(نوع الفلتر, المقارنة, القيمة) لكل فلتر متحدد"""
+        criteria: List[Tuple[str, str, Any]] = []
+        if self.date_from is not None:
+            criteria.append(("date", ">=", self.date_from))
+        if self.date_to is not None:
+            criteria.append(("date", "<", self.date_to + timedelta(days=1)))
+        if self.amount_min is not None:
+            criteria.append(("amount", ">=", self.amount_min))
+        if self.amount_max is not None:
+            criteria.append(("amount", "<=", self.amount_max))
+        if self.status:
+            criteria.append(("status", "=", self.status))
+        if self.client_id:
+            criteria.append(("client", "=", self.client_id))
+        if self.project_id:
+            criteria.append(("project", "=", self.project_id))
+        return criteria
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.criteria()
+
+    def applies_to(self, source: SearchSource) -> bool:
+        """النوع فيه أعمدة كل الفلاتر المتحددة؟"""
+        columns = dict(source.filter_columns)
+        return all(kind in columns for kind, _operator, _value in self.criteria())
+
+    def sql_conditions(self, source: SearchSource, alias: str = "") -> Tuple[List[str], List[Any]]:
+        """(شروط WHERE, parameters) - التواريخ ISO text زي ما متخزنة في SQLite"""
+        columns = dict(source.filter_columns)
+        prefix = f"{alias}." if alias else ""
+        conditions: List[str] = []
+        params: List[Any] = []
+        for kind, operator, value in self.criteria():
+            conditions.append(f"{prefix}{columns[kind]} {operator} ?")
+            params.append(value.isoformat() if isinstance(value, date) else value)
+        return conditions, params
+
+    def mongo_match(self, source: SearchSource) -> Dict[str, Any]:
+        """نفس الشروط كـ filter لـ find / $match (التواريخ datetime زي ما المزامنة بترفعها)"""
+        columns = dict(source.filter_columns)
+        match: Dict[str, Dict[str, Any]] = {}
+        for kind, operator, value in self.criteria():
+            if isinstance(value, date) and not isinstance(value, datetime):
+                value = datetime.combine(value, time.min)
+            match.setdefault(columns[kind], {})[_MONGO_OPERATORS[operator]] = value
+        return match
+
+
+def build_match_query(text: str) -> Optional[str]:
+    """
+    نص المستخدم ← MATCH expression: كل كلمة (بعد التوحيد) prefix ولازم الكلمات كلها تتطابق
+    ("sky wa" ← "sky"* "wa"*) - والنص اللي شكله تليفون بيتدور عليه بشكله المحلي كمان
+    None لو مفيش كلمات
+    """
+    tokens = normalized_words(text)
+    if not tokens:
+        return None
+    match = " ".join(f'"{token}"*' for token in tokens)
+    if looks_like_phone(text):
+        phone = normalize_phone(text)
+        if [phone] != tokens:
+            match = f'"{phone}"* OR ({match})'
+    return match
+
+
+def text_matches_query(indexed_text: str, text: str) -> bool:
+    """
+    نفس منطق build_match_query على نص صف متفهرس (title + body) في Python
+    (SearchSession بيضيّق بيها نتايج بحث سابق من غير ما يرجع للفهرس)
+    """
+    tokens = normalized_words(text)
+    if not tokens:
+        return False
+    words = normalized_words(indexed_text)
+    if looks_like_phone(text):
+        phone = normalize_phone(text)
+        if any(word.startswith(phone) for word in words):
+            return True
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def split_rowid(rowid: int) -> Tuple[Optional[SearchSource], int]:
+    """rowid الفهرس ← (الجدول, id الصف)"""
+    return SOURCES_BY_CODE.get(rowid % ROWID_STRIDE), rowid // ROWID_STRIDE
+
+
+def _index_values(source: SearchSource, row: str) -> str:
+    """قيم (title, body) المتوحدة لصف ({r} = row)"""
+    return f"index_text({source.title.format(r=row)}), index_text({source.body.format(r=row)})"
+
+
+def _normalized_assignments(columns: Tuple[Tuple[str, str, str], ...]) -> str:
+    """SET للأعمدة المتوحدة من الأعمدة الأصلية في نفس الصف"""
+    return ", ".join(f"{column} = {function}({source})" for column, source, function in columns)
+
+
+def _enqueue_statement(table: str) -> str:
+    return f"INSERT OR IGNORE INTO {PENDING_TABLE}(table_name, row_id) VALUES ('{table}', new.id);"
+
+
+def _create_pending_table(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {PENDING_TABLE} ("
+        f"table_name TEXT NOT NULL, row_id INTEGER NOT NULL, PRIMARY KEY (table_name, row_id)) WITHOUT ROWID"
+    )
+
+
+def _trigger_statements(source: SearchSource) -> List[str]:
+    rowid_old = f"old.id * {ROWID_STRIDE} + {source.code}"
+    enqueue = _enqueue_statement(source.table)
+    prefix = f"trg_{source.table}_search"
+    return [
+        f"DROP TRIGGER IF EXISTS {prefix}_ai",
+        f"DROP TRIGGER IF EXISTS {prefix}_au",
+        f"DROP TRIGGER IF EXISTS {prefix}_ad",
+        f"CREATE TRIGGER {prefix}_ai AFTER INSERT ON {source.table} BEGIN {enqueue} END",
+        f"CREATE TRIGGER {prefix}_au AFTER UPDATE OF {', '.join(source.watched)} ON {source.table} BEGIN "
+        f"{enqueue} END",
+        f"CREATE TRIGGER {prefix}_ad AFTER DELETE ON {source.table} BEGIN "
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {rowid_old}; END",
+    ]
+
+
+def create_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    إنشاء جدول FTS5 والـ triggers (بيمسح أي نسخة قديمة) وملء الفهرس من الجداول الموجودة
+
+    الـ triggers (هنا وفي create_normalized_columns) SQL عادي: بتسجل الصف في search_pending بس،
+    فالكتابة من أي اتصال (sqlite3 CLI / cleanup_data.py) شغالة - والتوحيد (index_text /
+    normalize_text / normalize_phone) بيحصل في flush_search_pending على اتصالات SQLitePool
+
+    Raises:
+        sqlite3.OperationalError: لو نسخة SQLite مفيهاش FTS5
+    """
+    cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+    # prefix='2 3': indexes جاهزة لأول حرفين وتلاتة (البحث أثناء الكتابة)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        f"title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    _create_pending_table(cursor)
+    for source in SEARCH_SOURCES:
+        for sql in _trigger_statements(source):
+            cursor.execute(sql)
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) "
+            f"SELECT id * {ROWID_STRIDE} + {source.code}, {_index_values(source, source.table)} "
+            f"FROM {source.table}"
+        )
+        cursor.execute(f"DELETE FROM {PENDING_TABLE} WHERE table_name = ?", (source.table,))
+    cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def create_normalized_columns(cursor: sqlite3.Cursor) -> None:
+    """triggers بتسجل الصفوف اللي أعمدتها الأصلية اتغيرت (NORMALIZED_COLUMNS) + ملء الصفوف الموجودة"""
+    _create_pending_table(cursor)
+    for table, columns in NORMALIZED_COLUMNS.items():
+        enqueue = _enqueue_statement(table)
+        prefix = f"trg_{table}_normalize"
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_ai")
+        cursor.execute(f"DROP TRIGGER IF EXISTS {prefix}_au")
+        cursor.execute(f"CREATE TRIGGER {prefix}_ai AFTER INSERT ON {table} BEGIN {enqueue} END")
+        cursor.execute(
+            f"CREATE TRIGGER {prefix}_au AFTER UPDATE OF {', '.join(source for _c, source, _f in columns)} "
+            f"ON {table} BEGIN {enqueue} END"
+        )
+        cursor.execute(f"UPDATE {table} SET {_normalized_assignments(columns)}")
+
+
+def flush_search_pending(cursor: sqlite3.Cursor) -> int:
+    """
+    ⚡ تحديث الأعمدة المتوحدة وصفوف الفهرس للصفوف المسجلة في search_pending وتفريغه
+    (على اتصال متسجل عليه دوال core/text_normalize.py - Repository بينادي دي في آخر كل كتابة)
+
+    Returns:
+        عدد الصفوف اللي اتحدثت
+    """
+    cursor.execute(f"SELECT table_name, row_id FROM {PENDING_TABLE}")
+    pending: Dict[str, List[int]] = {}
+    for table, row_id in cursor.fetchall():
+        pending.setdefault(table, []).append(row_id)
+    if not pending:
+        return 0
+
+    has_index = search_index_exists(cursor)
+    sources = {source.table: source for source in SEARCH_SOURCES}
+    for table, ids in pending.items():
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            if table in NORMALIZED_COLUMNS:
+                cursor.execute(
+                    f"UPDATE {table} SET {_normalized_assignments(NORMALIZED_COLUMNS[table])} "
+                    f"WHERE id IN ({placeholders})",
+                    chunk,
+                )
+            source = sources.get(table)
+            if source is None or not has_index:
+                continue
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})",
+                [row_id * ROWID_STRIDE + source.code for row_id in chunk],
+            )
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, title, body) "
+                f"SELECT id * {ROWID_STRIDE} + {source.code}, {_index_values(source, table)} "
+                f"FROM {table} WHERE id IN ({placeholders})",
+                chunk,
+            )
+    cursor.execute(f"DELETE FROM {PENDING_TABLE}")
+    return sum(len(ids) for ids in pending.values())
+
+
+def search_index_exists(cursor: sqlite3.Cursor) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,))
+    return cursor.fetchone() is not None
+
+
+def _ranked_rows(
+    cursor: sqlite3.Cursor,
+    from_sql: str,
+    where: str,
+    params: List[Any],
+    limit: int,
+    extra_columns: Sequence[str] = (),
+    matches: Optional[int] = None,
+) -> List[Tuple]:
+    """
+    صفوف (rowid, rank, title, body, extra_columns...) مرتبة بـ bm25 - ولو التطابقات فوق
+    FULL_RANK_MAX_MATCHES أحدث limit تطابق بس (الترتيب بعدها على اللي رجع)
+    matches = عدد التطابقات لو اتحسب قبل كده (None = بيتحسب هنا)
+    """
+    if matches is None:
+        cursor.execute(f"SELECT COUNT(*) FROM {from_sql} WHERE {where}", params)
+        matches = cursor.fetchone()[0]
+    if not matches:
+        return []
+    order = "rank" if matches <= FULL_RANK_MAX_MATCHES else f"{SEARCH_TABLE}.rowid DESC"
+    columns = ", ".join((
+        f"{SEARCH_TABLE}.rowid",
+        f"bm25({SEARCH_TABLE}, {BM25_WEIGHTS[0]}, {BM25_WEIGHTS[1]}) AS rank",
+        f"{SEARCH_TABLE}.title",
+        f"{SEARCH_TABLE}.body",
+    ) + tuple(extra_columns))
+    cursor.execute(
+        f"SELECT {columns} FROM {from_sql} WHERE {where} ORDER BY {order} LIMIT ?",
+        params + [int(limit)],
+    )
+    return cursor.fetchall()
+
+
+def query_search_index(
+    cursor: sqlite3.Cursor,
+    text: str,
+    entities: Optional[Sequence[str]] = None,
+    limit: int = 100,
+    filters: Optional[SearchFilter] = None,
+) -> List[Dict]:
+    """
+    ⚡ البحث في الفهرس + جلب أعمدة العرض من الجداول (query واحد لكل نوع في النتايج)
+    مع filters: query لكل نوع (JOIN على جدوله بشروط الفلاتر) وأحسن limit من الكل بـ heap
+
+    Returns:
+        قائمة (الأعلى score الأول): entity, id, score (= -bm25 أكبر أحسن) + أعمدة source.columns
+        + match_text (النص المتفهرس - لـ text_matches_query)
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+
+    if entities:
+        sources = [SOURCES_BY_ENTITY[e] for e in entities if e in SOURCES_BY_ENTITY]
+        if not sources:
+            return []
+    else:
+        sources = list(SEARCH_SOURCES)
+
+    if filters is not None and not filters.is_empty:
+        return _query_filtered(cursor, match, sources, filters, limit)
+
+    where = f"{SEARCH_TABLE} MATCH ?"
+    params: List = [match]
+    if entities:
+        where += f" AND rowid % {ROWID_STRIDE} IN ({', '.join('?' * len(sources))})"
+        params.extend(source.code for source in sources)
+
+    # عدد التطابقات لكل نوع (query واحد) - لو الكل تحت الحد ترتيب bm25 واحد على الكل
+    cursor.execute(f"SELECT rowid % {ROWID_STRIDE}, COUNT(*) FROM {SEARCH_TABLE} WHERE {where} GROUP BY 1", params)
+    counts = dict(cursor.fetchall())
+    if sum(counts.values()) <= FULL_RANK_MAX_MATCHES:
+        ranked = _ranked_rows(cursor, SEARCH_TABLE, where, params, limit, matches=sum(counts.values()))
+    else:
+        # ⚡ كل نوع لوحده: النوع القليل مبيتظلمش بسبب أحدث صفوف نوع تاني كتير التطابقات
+        ranked = []
+        for code, count in counts.items():
+            ranked += _ranked_rows(
+                cursor, SEARCH_TABLE, f"{where} AND rowid % {ROWID_STRIDE} = {int(code)}", params, limit,
+                matches=count,
+            )
+    ranked = heapq.nsmallest(limit, ranked, key=lambda row: (row[1], row[0]))
+
+    # تجميع الـ ids حسب الجدول
+    by_source: Dict[str, List[int]] = {}
+    for rowid, _rank, _title, _body in ranked:
+        source, row_id = split_rowid(rowid)
+        if source is not None:
+            by_source.setdefault(source.entity, []).append(row_id)
+
+    rows: Dict[Tuple[str, int], Dict] = {}
+    for entity, ids in by_source.items():
+        source = SOURCES_BY_ENTITY[entity]
+        cursor.execute(
+            f"SELECT id, {', '.join(source.columns)} FROM {source.table} "
+            f"WHERE id IN ({', '.join('?' * len(ids))})",
+            ids,
+        )
+        for row in cursor.fetchall():
+            rows[(entity, row[0])] = dict(zip(("id",) + source.columns, row))
+
+    hits: List[Dict] = []
+    for rowid, rank, title, body in ranked:
+        source, row_id = split_rowid(rowid)
+        row = rows.get((source.entity, row_id)) if source is not None else None
+        if row is None:
+            continue
+        hit = {'entity': source.entity, 'score': -float(rank), 'match_text': f"{title} {body}"}
+        hit.update(row)
+        hits.append(hit)
+    return hits
+
+
+def _query_filtered(
+    cursor: sqlite3.Cursor,
+    match: str,
+    sources: Sequence[SearchSource],
+    filters: SearchFilter,
+    limit: int,
+) -> List[Dict]:
+    """البحث مع الفلاتر: الشروط على الجدول في نفس الـ query (SQLite بيختار الفهرس أو index الجدول)"""
+    candidates: List[Tuple[float, int, SearchSource, Tuple]] = []
+    for source in sources:
+        if not filters.applies_to(source):
+            continue
+        conditions, filter_params = filters.sql_conditions(source, alias="t")
+        where = " AND ".join(
+            [f"{SEARCH_TABLE} MATCH ?", f"{SEARCH_TABLE}.rowid % {ROWID_STRIDE} = {source.code}"] + conditions
+        )
+        rows = _ranked_rows(
+            cursor,
+            f"{SEARCH_TABLE} JOIN {source.table} t ON t.id = {SEARCH_TABLE}.rowid / {ROWID_STRIDE}",
+            where,
+            [match] + filter_params,
+            limit,
+            extra_columns=["t.id"] + [f"t.{column}" for column in source.columns],
+        )
+        candidates.extend((row[1], row[0], source, row) for row in rows)
+
+    hits: List[Dict] = []
+    for rank, _rowid, source, row in heapq.nsmallest(limit, candidates, key=lambda c: (c[0], c[1])):
+        hit = {'entity': source.entity, 'score': -float(rank), 'match_text': f"{row[2]} {row[3]}"}
+        hit.update(zip(("id",) + source.columns, row[4:]))
+        hits.append(hit)
+    return hits
@@ -164,6 +164,56 @@ class LazyLoader:
             self._loaded = False
 
 
+class LazyService:
+    """
+    ⚡ Proxy لخدمة تقيلة (طباعة / قوالب / تصدير بـ pandas) - الخدمة بتتعمل أول مرة تتستخدم بس
+    أي attribute بيتحول للخدمة الحقيقية، و bool(proxy) = True من غير ما يعملها.
+
+    الاستخدام:
+        export_service = LazyService("ExportService", lambda: ExportService())
+        export_service.export_clients_to_excel(clients)   # هنا بس بتتعمل
+    """
+
+    __slots__ = ('_name', '_factory', '_instance', '_lock')
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self) -> Any:
+        """الخدمة الحقيقية (بتتعمل لو لسه متعملتش)"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    start = time.perf_counter()
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+                    print(f"INFO: [LazyService] تم إنشاء {self._name} عند أول استخدام "
+                          f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
+    def __bool__(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._instance is not None else "not loaded"
+        return f"<LazyService {self._name} ({state})>"
+
+
 class BatchProcessor:
     """
     ⚡ معالج دفعات للعمليات الكثيرة
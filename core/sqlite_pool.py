@@ -0,0 +1,204 @@
+# الملف: core/sqlite_pool.py
+"""
+⚡ Pool اتصالات SQLite
+- اتصال كتابة واحد (writer) محمي بـ RLock - كل الكتابة والـ transactions بتعدي عليه
+- لحد max_readers اتصال قراءة (WAL + query_only) - كل thread بياخد اتصال خاص بيه
+  طول ما هو جوه reader() وبعدها بيرجع للـ pool
+- cursor منفصل لكل thread على اتصال الكتابة (بدل cursor واحد مشترك)
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .text_normalize import register_sql_functions
+
+
+class _WriterConnection(sqlite3.Connection):
+    """
+    اتصال الكتابة: commit() بيستنى lock الكتابة عشان ميثبتش SAVEPOINT
+    مفتوح في thread تاني (في وضع autocommit الـ commit بيقفل أي transaction مفتوح)
+    """
+
+    pool: Optional["SQLitePool"] = None
+
+    def commit(self):
+        pool = self.pool
+        if pool is None:
+            return super().commit()
+        with pool.write_lock:
+            if getattr(pool._local, 'tx_depth', 0):
+                return  # جوه writer() - الـ RELEASE هو اللي بيثبت
+            return super().commit()
+
+
+class SQLitePool:
+    """
+    Pool اتصالات SQLite: writer واحد + readers بـ WAL
+
+    الاستخدام:
+        with pool.writer() as cursor:   # SAVEPOINT - بيرجع كل حاجة لو حصل خطأ
+            cursor.execute("UPDATE ...")
+        with pool.reader() as cursor:   # اتصال قراءة خاص بالـ thread (بيشتغل بالتوازي)
+            rows = cursor.execute("SELECT ...").fetchall()
+    """
+
+    def __init__(self, path: str, max_readers: int = 4, timeout: float = 30.0,
+                 write_lock: Optional[threading.RLock] = None,
+                 writer_connection: Optional[sqlite3.Connection] = None):
+        """
+        Args:
+            path: مسار ملف قاعدة البيانات
+            max_readers: أقصى عدد اتصالات قراءة (0 = القراءة على اتصال الكتابة)
+            timeout: مهلة انتظار الـ lock في SQLite وانتظار اتصال قراءة فاضي
+            write_lock: lock الكتابة (لو الـ Repository عايز يشاركه)
+            writer_connection: اتصال موجود يتلف كـ writer (الـ readers بتتعطل)
+        """
+        self.path = path
+        self.timeout = timeout
+        self.write_lock = write_lock or threading.RLock()
+        self._local = threading.local()
+        if writer_connection is None:
+            writer_connection = self._connect(factory=_WriterConnection)
+            writer_connection.pool = self
+            self.owns_writer = True
+        else:
+            self.owns_writer = False
+            register_sql_functions(writer_connection)
+        self.writer_connection = writer_connection
+        # ⚡ قاعدة في الذاكرة أو اتصال جاهز مينفعش يتفتحله readers منفصلة
+        self.max_readers = 0 if not self.owns_writer or path == ":memory:" else max_readers
+
+        self._idle_readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._readers_created = 0
+        self._readers_lock = threading.Lock()
+        self._all_readers = []
+
+    @classmethod
+    def wrap(cls, connection: sqlite3.Connection) -> "SQLitePool":
+        """Pool حوالين اتصال موجود (من غير readers) - للـ benchmarks وقواعد الذاكرة"""
+        return cls(":memory:", max_readers=0, writer_connection=connection)
+
+    def _connect(self, read_only: bool = False, factory=sqlite3.Connection) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            timeout=self.timeout,
+            isolation_level=None,  # ⚡ Autocommit للسرعة
+            factory=factory
+        )
+        connection.row_factory = sqlite3.Row
+        if read_only:
+            connection.execute("PRAGMA query_only=ON")
+        else:
+            # ⚡ WAL (بيتحفظ في الملف) + synchronous=NORMAL للكتابة
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        # ⚡ إعدادات الأداء لكل اتصال
+        connection.execute("PRAGMA cache_size=10000")
+        connection.execute("PRAGMA mmap_size=268435456")  # 256MB
+        connection.execute("PRAGMA temp_store=MEMORY")
+        # دوال التوحيد اللي بيستخدمها تحديث فهرس البحث (flush_search_pending)
+        register_sql_functions(connection)
+        return connection
+
+    # --- الكتابة ---
+
+    def cursor(self) -> sqlite3.Cursor:
+        """cursor الـ thread الحالي على اتصال الكتابة (بيتعمل مرة لكل thread)"""
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self.writer_connection.cursor()
+            self._local.cursor = cursor
+        return cursor
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Cursor]:
+        """
+        transaction كتابة (SAVEPOINT) على اتصال الكتابة تحت الـ lock.
+        ينفع يتداخل، ولو حصل خطأ بيرجع كل التغييرات.
+        """
+        with self.write_lock:
+            cursor = self.cursor()
+            self._local.tx_depth = getattr(self._local, 'tx_depth', 0) + 1
+            cursor.execute("SAVEPOINT repo_tx")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK TO SAVEPOINT repo_tx")
+                cursor.execute("RELEASE SAVEPOINT repo_tx")
+                raise
+            else:
+                cursor.execute("RELEASE SAVEPOINT repo_tx")
+            finally:
+                self._local.tx_depth -= 1
+
+    # --- القراءة ---
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Cursor]:
+        """
+        cursor قراءة على اتصال خاص بالـ thread (WAL: القراءة مش بتستنى الكتابة).
+        جوه transaction كتابة على نفس الـ thread بيرجع cursor الكتابة عشان يشوف التعديلات.
+        """
+        if getattr(self._local, 'tx_depth', 0) or not self.max_readers:
+            with self.write_lock:
+                cursor = self.writer_connection.cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+            return
+
+        connection = getattr(self._local, 'reader', None)
+        owner = connection is None
+        if owner:
+            connection = self._acquire_reader()
+            self._local.reader = connection
+
+        cursor = connection.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            if owner:
+                self._local.reader = None
+                self._idle_readers.put(connection)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._readers_lock:
+            if self._readers_created < self.max_readers:
+                self._readers_created += 1
+                connection = self._connect(read_only=True)
+                self._all_readers.append(connection)
+                return connection
+
+        try:
+            return self._idle_readers.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"SQLitePool: لا يوجد اتصال قراءة متاح بعد {self.timeout} ثانية"
+            )
+
+    # --- الإغلاق ---
+
+    def close(self):
+        """إغلاق كل الاتصالات (القراءة ثم الكتابة)"""
+        with self._readers_lock:
+            for connection in self._all_readers:
+                try:
+                    connection.close()
+                except sqlite3.Error:
+                    pass
+            self._all_readers.clear()
+            self._idle_readers = queue.LifoQueue()
+            self._readers_created = 0
+        with self.write_lock:
+            self.writer_connection.close()
@@ -0,0 +1,1305 @@
+# الملف: core/sync_engine.py
+"""
+⚡ محرك المزامنة الموحّد (Sync Engine)
+بديل SyncManager و AutoSync و AdvancedSyncManager:
+- outbox واحد دائم: جدول sync_queue (عمليات صريحة) + أعلام sync_status في الجداول
+- scheduler واحد: thread واحد بيشغّل دورة مزامنة كل interval أو عند الطلب
+- اتصال كتابة واحد: كل الكتابة المحلية عن طريق _local_transaction، والقراءة من readers الـ pool
+- استراتيجيات push/pull قابلة للتركيب (SyncStrategy)
+- مقاييس: عمق الطابور، التأخير (lag)، ومعدل الإنتاجية (throughput)
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import requests
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from core.search_index import LOCAL_ONLY_COLUMNS
+from core.signals import app_signals
+
+
+# ⚡ الـ delta pull بيرجع لورا بالمدة دي من الـ watermark: كتابات MongoDB اللي لسه بتتنفذ وقت القراءة،
+# والتعديلات المباشرة من الـ Repository (last_modified بساعة الجهاز) لو ساعته متأخرة شوية
+# (الصفوف اللي بتترجع تاني بتتكتب upsert عادي - نفس النتيجة)
+PULL_OVERLAP = timedelta(minutes=10)
+
+# ⚡ last_modified في السحابة بساعة سيرفر MongoDB مع كل رفع (مش ساعة الجهاز)
+SERVER_TIMESTAMP = {'$currentDate': {'last_modified': True}}
+
+# ⚡ الجداول اللي بتتزامن مع MongoDB بالترتيب
+# columns: {العمود: القيمة الافتراضية} - json_fields بتتخزن JSON و bool_fields بتتخزن 0/1
+SYNC_TABLES = {
+    'accounts': {
+        'date_fields': ['created_at', 'last_modified'],
+        'columns': {'name': None, 'code': None, 'type': None, 'parent_id': None,
+                    'balance': 0.0, 'currency': 'EGP', 'description': None},
+    },
+    'clients': {
+        'date_fields': ['created_at', 'last_modified'],
+        'columns': {'name': None, 'company_name': None, 'email': None, 'phone': None,
+                    'address': None, 'country': None, 'vat_number': None, 'status': 'نشط',
+                    'client_type': None, 'work_field': None, 'logo_path': None,
+                    'client_notes': None},
+    },
+    'projects': {
+        'date_fields': ['created_at', 'last_modified', 'start_date', 'end_date'],
+        'json_fields': ['items'],
+        'bool_fields': ['status_manually_set'],
+        'columns': {'name': None, 'client_id': None, 'status': 'نشط', 'status_manually_set': False,
+                    'description': None, 'start_date': None, 'end_date': None, 'items': [],
+                    'subtotal': 0.0, 'discount_rate': 0.0, 'discount_amount': 0.0,
+                    'tax_rate': 0.0, 'tax_amount': 0.0, 'total_amount': 0.0,
+                    'currency': 'EGP', 'project_notes': None},
+    },
+    'payments': {
+        'date_fields': ['created_at', 'last_modified', 'date'],
+        'columns': {'project_id': None, 'client_id': None, 'date': None, 'amount': 0.0,
+                    'account_id': None, 'method': None},
+    },
+    'journal_entries': {
+        'date_fields': ['created_at', 'last_modified', 'date'],
+        'json_fields': ['lines'],
+        'columns': {'date': None, 'description': '', 'lines': [], 'related_document_id': None},
+    },
+    'invoices': {
+        'date_fields': ['created_at', 'last_modified', 'issue_date', 'due_date'],
+        'json_fields': ['items'],
+        'columns': {'invoice_number': None, 'client_id': None, 'project_id': None,
+                    'issue_date': None, 'due_date': None, 'items': [], 'subtotal': 0.0,
+                    'discount_rate': 0.0, 'discount_amount': 0.0, 'tax_rate': 0.0,
+                    'tax_amount': 0.0, 'total_amount': 0.0, 'currency': 'EGP',
+                    'status': 'مسودة', 'notes': None},
+    },
+    'services': {
+        'date_fields': ['created_at', 'last_modified'],
+        'columns': {'name': None, 'description': None, 'default_price': 0.0,
+                    'category': 'General', 'status': 'نشط'},
+    },
+    'expenses': {
+        'date_fields': ['created_at', 'last_modified', 'date'],
+        'columns': {'date': None, 'category': None, 'amount': 0.0, 'description': None,
+                    'account_id': None, 'payment_account_id': None, 'project_id': None},
+    },
+    'quotations': {
+        'date_fields': ['created_at', 'last_modified', 'issue_date', 'expiry_date'],
+        'json_fields': ['items'],
+        'columns': {'quote_number': None, 'client_id': None, 'project_id': None,
+                    'issue_date': None, 'expiry_date': None, 'items': [], 'subtotal': 0.0,
+                    'discount_rate': 0.0, 'discount_amount': 0.0, 'tax_rate': 0.0,
+                    'tax_amount': 0.0, 'total_amount': 0.0, 'status': 'مسودة',
+                    'currency': 'EGP', 'notes': None},
+    },
+    'currencies': {
+        'date_fields': ['created_at', 'last_modified'],
+        'bool_fields': ['is_base', 'active'],
+        'columns': {'code': None, 'name': None, 'symbol': '', 'rate': 1.0,
+                    'is_base': False, 'active': True},
+    },
+    'notifications': {
+        'date_fields': ['created_at', 'last_modified', 'expires_at'],
+        'bool_fields': ['is_read'],
+        'columns': {'title': None, 'message': None, 'type': 'info', 'priority': 'normal',
+                    'is_read': False, 'related_entity_type': None, 'related_entity_id': None,
+                    'action_url': None, 'expires_at': None},
+    },
+    'tasks': {
+        'date_fields': ['created_at', 'last_modified', 'due_date', 'completed_at'],
+        'json_fields': ['tags'],
+        'bool_fields': ['reminder'],
+        'columns': {'title': None, 'description': None, 'priority': 'MEDIUM', 'status': 'TODO',
+                    'category': 'GENERAL', 'due_date': None, 'due_time': None,
+                    'completed_at': None, 'related_project_id': None,
+                    'related_client_id': None, 'tags': [], 'reminder': False,
+                    'reminder_minutes': 30, 'assigned_to': None},
+    },
+}
+
+
+def prepare_row_for_cloud(table_name: str, row: dict) -> dict:
+    """تحويل صف SQLite لمستند MongoDB (تواريخ → datetime و JSON → list)"""
+    config = SYNC_TABLES.get(table_name, {})
+    document = {k: v for k, v in row.items()
+                if k not in ('id', '_mongo_id', 'sync_status') and k not in LOCAL_ONLY_COLUMNS}
+
+    for key in config.get('date_fields', ['created_at', 'last_modified']):
+        if key in document and isinstance(document[key], str):
+            try:
+                document[key] = datetime.fromisoformat(document[key])
+            except (ValueError, TypeError, AttributeError):
+                pass
+
+    for key in config.get('json_fields', []):
+        if key in document and isinstance(document[key], str):
+            try:
+                document[key] = json.loads(document[key])
+            except (json.JSONDecodeError, TypeError):
+                document[key] = []
+
+    return document
+
+
+class ConnectionChecker(QThread):
+    """فاحص الاتصال في الخلفية (الشبكة + حالة circuit breaker بتاع MongoDB)"""
+
+    connection_changed = pyqtSignal(bool)  # True = متصل, False = غير متصل
+
+    def __init__(self, parent=None, circuit_breaker=None):
+        super().__init__(parent)
+        self.is_running = True
+        self.check_interval = 10  # ثانية
+        self.last_status = None
+        self.circuit_breaker = circuit_breaker
+
+    @property
+    def circuit_state(self) -> Optional[str]:
+        """حالة الـ circuit الحالية (None لو مفيش breaker)"""
+        return self.circuit_breaker.state if self.circuit_breaker is not None else None
+
+    def run(self):
+        """تشغيل فاحص الاتصال"""
+        while self.is_running:
+            try:
+                # محاولة الاتصال بـ Google DNS
+                response = requests.get("https://8.8.8.8", timeout=5)
+                is_connected = response.status_code == 200
+            except (requests.RequestException, OSError):
+                try:
+                    # محاولة بديلة - ping MongoDB server
+                    response = requests.get("https://cloud.mongodb.com", timeout=5)
+                    is_connected = response.status_code == 200
+                except (requests.RequestException, OSError):
+                    is_connected = False
+
+            # إرسال إشارة فقط عند تغيير الحالة
+            if is_connected != self.last_status:
+                # ⚡ الشبكة رجعت والـ circuit مفتوح - نجرب MongoDB فوراً بدل ما نستنى الـ backoff
+                if is_connected and self.last_status is not None and self.circuit_breaker is not None:
+                    self.circuit_breaker.probe_now()
+                self.connection_changed.emit(is_connected)
+                self.last_status = is_connected
+                print(f"INFO: [ConnectionChecker] Connection status changed: {'Online' if is_connected else 'Offline'}")
+
+            # انتظار قبل الفحص التالي
+            self.msleep(self.check_interval * 1000)
+
+    def stop(self):
+        """إيقاف فاحص الاتصال"""
+        self.is_running = False
+        self.quit()
+        self.wait()
+
+
+# ==========================================
+# استراتيجيات المزامنة
+# ==========================================
+
+class SyncStrategy:
+    """
+    استراتيجية مزامنة قابلة للتركيب في SyncEngine
+    - direction: 'pull' أو 'push'
+    - run() بترجع عدد السجلات اللي اتعالجت، وبتسجل الفاشل في last_failed
+    """
+
+    name = "strategy"
+    direction = "push"
+
+    def __init__(self):
+        self.last_failed = 0
+
+    def run(self, engine: "SyncEngine") -> int:
+        raise NotImplementedError
+
+
+class DeltaPullStrategy(SyncStrategy):
+    """
+    ⚡ جلب التغييرات فقط من MongoDB إلى SQLite (delta pull)
+    - لكل collection في watermark (أكبر last_modified اتسحب) في جدول sync_state
+    - الـ query بيجيب بس {"last_modified": {"$gt": watermark - PULL_OVERLAP}}
+    - المحذوفات بتوصل من collection الـ tombstones
+    - الصفوف بتتكتب صف صف: السجل اللي بيفشل بيتسجل ويتخطى والـ watermark بيتقدم
+    """
+
+    name = "delta_pull"
+    direction = "pull"
+
+    def __init__(self, tables: Optional[Dict[str, dict]] = None):
+        super().__init__()
+        self.tables = tables or SYNC_TABLES
+        self._unique_keys_cache: Dict[str, List[tuple]] = {}
+        self._mongo_id_unique_cache: Dict[str, bool] = {}
+
+    @staticmethod
+    def _delta_query(watermark: Optional[datetime]) -> dict:
+        """{} أول مرة (سحب كامل) - وإلا اللي اتغير بعد الـ watermark ناقص PULL_OVERLAP"""
+        return {"last_modified": {"$gt": watermark - PULL_OVERLAP}} if watermark else {}
+
+    def run(self, engine: "SyncEngine") -> int:
+        self.last_failed = 0
+        repo = engine.repository
+        total_pulled = 0
+
+        for table_name, config in self.tables.items():
+            if engine.is_stopping:
+                break
+            try:
+                pulled = self._pull_collection_delta(repo, table_name, config)
+                total_pulled += pulled
+                if not pulled:
+                    continue
+                print(f"  ✅ تم جلب {pulled} سجل من {table_name}")
+            except Exception as e:
+                self.last_failed += 1
+                print(f"  ❌ فشل جلب {table_name}: {e}")
+
+        try:
+            total_pulled += self._pull_tombstones(repo)
+        except Exception as e:
+            self.last_failed += 1
+            print(f"  ❌ فشل جلب المحذوفات: {e}")
+
+        return total_pulled
+
+    @staticmethod
+    def _get_watermark(repo, collection_name: str) -> Optional[datetime]:
+        """آخر last_modified اتسحب للـ collection (None = أول مرة → سحب كامل)"""
+        with repo._reader() as cursor:
+            cursor.execute(
+                "SELECT last_pulled_at FROM sync_state WHERE collection = ?", (collection_name,)
+            )
+            row = cursor.fetchone()
+        if not row or not row[0]:
+            return None
+        try:
+            return datetime.fromisoformat(row[0])
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _set_watermark(cursor, collection_name: str, watermark: Optional[datetime]):
+        """
+        حفظ الـ watermark ووقت آخر مزامنة (لازم تتنادى جوه نفس الـ transaction بتاع الصفوف)
+        watermark = None → تحديث last_sync_at بس (الـ collection متزامن ومفيش جديد)
+        """
+        cursor.execute("""
+            INSERT INTO sync_state (collection, last_pulled_at, last_sync_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(collection) DO UPDATE SET
+                last_pulled_at = COALESCE(excluded.last_pulled_at, sync_state.last_pulled_at),
+                last_sync_at = excluded.last_sync_at
+        """, (collection_name, watermark.isoformat() if watermark else None, datetime.now().isoformat()))
+
+    def _pull_collection_delta(self, repo, table_name: str, config: dict) -> int:
+        """سحب السجلات اللي اتغيرت من آخر watermark وكتابتها محلياً (upsert بالـ _mongo_id)"""
+        watermark = self._get_watermark(repo, table_name)
+        query = self._delta_query(watermark)
+
+        # ⚡ أول مزامنة بتسحب الـ collection كله - من غير maxTimeMS ومش بتتحسب بطء على الـ breaker
+        with repo.mongo_breaker.bulk_reads():
+            documents = list(repo.mongo_db[table_name].find(query))
+        if not documents:
+            # ⚡ النسخة المحلية متزامنة لحد دلوقتي (بيقيس عليها الـ lag في local_first)
+            with repo._local_transaction() as cursor:
+                self._set_watermark(cursor, table_name, None)
+            return 0
+
+        columns = list(config['columns'].keys())
+        json_fields = config.get('json_fields', [])
+        bool_fields = config.get('bool_fields', [])
+        rows = []
+        new_watermark = watermark
+        for doc in documents:
+            d = dict(doc)
+            mongo_id = str(d.pop('_id'))
+
+            last_modified = d.get('last_modified')
+            if isinstance(last_modified, datetime) and (new_watermark is None or last_modified > new_watermark):
+                new_watermark = last_modified
+
+            # تحويل datetime
+            for key in config['date_fields']:
+                if key in d and hasattr(d[key], 'isoformat'):
+                    d[key] = d[key].isoformat()
+
+            values = []
+            for column in columns:
+                default = config['columns'][column]
+                value = d.get(column, default)
+                if column in json_fields:
+                    value = json.dumps(value if value is not None else default)
+                elif column in bool_fields:
+                    value = 1 if value else 0
+                values.append(value)
+            rows.append((mongo_id, *values, d.get('created_at'), d.get('last_modified')))
+
+        return self._upsert_pulled_rows(
+            repo, table_name, columns + ['created_at', 'last_modified'], rows, new_watermark, config
+        )
+
+    def _upsert_pulled_rows(self, repo, table_name: str, columns: list, rows: list,
+                            watermark: Optional[datetime], config: Optional[dict] = None) -> int:
+        """
+        كتابة الصفوف المسحوبة صف صف في transaction واحد:
+        - موجود ومتزامن ونفس المحتوى (صدى الـ push بتاعنا) → يتساب من غير كتابة
+        - موجود ومتزامن → UPDATE
+        - مش موجود → INSERT ... ON CONFLICT(_mongo_id) DO UPDATE
+        - موجود وفيه تعديل محلي لسه مترفعش → يتساب (الـ push هيرفعه)
+        - تعارض مع مفتاح طبيعي (UNIQUE زي projects.name) → _replace_natural_key_clash
+        - أي صف تاني بيفشل بيتسجل ويتخطى (last_failed) - الـ watermark بيتقدم عشان الجدول
+          ميفضلش يفشل بنفس الصف في كل مزامنة
+        - journal_entries: الأرصدة و journal_lines بتتعدل بفرق القيود اللي اتغيرت بس
+        """
+        config = config or self.tables.get(table_name, {})
+        is_journal = table_name == 'journal_entries'
+        movements: Dict[str, List[float]] = {}
+        skipped = 0
+        written = 0
+        with repo._local_transaction() as cursor:
+            existing = {}
+            mongo_ids = [row[0] for row in rows]
+            for i in range(0, len(mongo_ids), 500):
+                chunk = mongo_ids[i:i + 500]
+                cursor.execute(
+                    f"SELECT id, _mongo_id, sync_status, {', '.join(columns)} FROM {table_name} "
+                    f"WHERE _mongo_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for local_row in cursor.fetchall():
+                    # لو في نسخة متزامنة ونسخة معدلة، التعديل المحلي هو الأهم
+                    current = existing.get(local_row['_mongo_id'])
+                    if current is None or current['sync_status'] == 'synced':
+                        existing[local_row['_mongo_id']] = local_row
+
+            insert_sql = self._insert_sql(cursor, table_name, columns)
+            set_clause = ", ".join(f"{column} = ?" for column in columns)
+            update_sql = f"UPDATE {table_name} SET {set_clause}, sync_status = 'synced' WHERE _mongo_id = ?"
+
+            for row in rows:
+                local_row = existing.get(row[0])
+                if local_row is not None and local_row['sync_status'] != 'synced':
+                    continue
+                if local_row is not None and self._same_content(config, columns, local_row, row):
+                    continue
+                try:
+                    if local_row is None:
+                        cursor.execute(insert_sql, row)
+                    else:
+                        cursor.execute(update_sql, (*row[1:], row[0]))
+                except sqlite3.Error as e:
+                    if not (local_row is None and isinstance(e, sqlite3.IntegrityError)
+                            and self._replace_natural_key_clash(cursor, table_name, columns, insert_sql, row)):
+                        skipped += 1
+                        print(f"  ⚠️ تخطي سجل {row[0]} من {table_name}: {e}")
+                        continue
+                written += 1
+                if is_journal:
+                    self._apply_journal_delta(repo, cursor, movements, columns, local_row, row)
+
+            repo._write_balance_movements(cursor, movements)
+            self._set_watermark(cursor, table_name, watermark)
+
+        self.last_failed += skipped
+        return written
+
+    @staticmethod
+    def _comparable(config: dict, column: str, value: Any) -> Any:
+        """
+        قيمة عمود بشكل يتقارن بين SQLite و MongoDB:
+        التواريخ لحد الـ milliseconds (دقة MongoDB)، و JSON متفكك، و bool/أرقام موحدة
+        """
+        if value is None:
+            return None
+        if column in config.get('json_fields', []):
+            if isinstance(value, str):
+                try:
+                    return json.loads(value)
+                except ValueError:
+                    return value
+            return value
+        if column in config.get('bool_fields', []):
+            return bool(value)
+        if column in config.get('date_fields', []):
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    return value
+            if isinstance(value, datetime):
+                return value.replace(microsecond=value.microsecond // 1000 * 1000, tzinfo=None)
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return float(value)
+        return value
+
+    def _same_content(self, config: dict, columns: list, local_row, row: tuple) -> bool:
+        """الصف المسحوب هو نفس النسخة المحلية (غير last_modified اللي السيرفر بيختمه)؟"""
+        for column, value in zip(columns, row[1:]):
+            if column == 'last_modified':
+                continue
+            if self._comparable(config, column, local_row[column]) != self._comparable(config, column, value):
+                return False
+        return True
+
+    @staticmethod
+    def _apply_journal_delta(repo, cursor, movements: Dict[str, List[float]], columns: list,
+                             local_row, row: tuple):
+        """
+        فرق قيد مسحوب على الأرصدة (القديم -1 والجديد +1) واستبدال أسطره في journal_lines
+        بدل إعادة بناء الجدولين من كل القيود
+        """
+        values = dict(zip(columns, row[1:]))
+        new_lines = repo._decode_journal_lines(values.get('lines'))
+        if local_row is not None:
+            repo._accumulate_balance_movements(
+                movements, repo._decode_journal_lines(local_row['lines']), -1.0
+            )
+        repo._accumulate_balance_movements(movements, new_lines)
+        cursor.execute("SELECT id FROM journal_entries WHERE _mongo_id = ?", (row[0],))
+        for (entry_id,) in cursor.fetchall():
+            repo._write_journal_lines(cursor, entry_id, values.get('date'), new_lines)
+
+    def _insert_sql(self, cursor, table_name: str, columns: list) -> str:
+        """
+        INSERT لصف مسحوب - ON CONFLICT(_mongo_id) DO UPDATE لو الـ index unique
+        (الـ migration بيعمله عادي لو في _mongo_id مكرر من نسخ قديمة، ووقتها INSERT عادي)
+        """
+        sql = (f"INSERT INTO {table_name} (_mongo_id, {', '.join(columns)}, sync_status) "
+               f"VALUES ({', '.join('?' * (len(columns) + 1))}, 'synced')")
+        if table_name not in self._mongo_id_unique_cache:
+            cursor.execute(f"PRAGMA index_list({table_name})")
+            self._mongo_id_unique_cache[table_name] = any(
+                index[1] == f"idx_{table_name}_mongo_id" and index[2] for index in cursor.fetchall()
+            )
+        if not self._mongo_id_unique_cache[table_name]:
+            return sql
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns)
+        return (f"{sql} ON CONFLICT(_mongo_id) WHERE _mongo_id IS NOT NULL DO UPDATE SET {updates}, "
+                f"sync_status = 'synced' WHERE {table_name}.sync_status = 'synced'")
+
+    def _unique_keys(self, cursor, table_name: str) -> List[tuple]:
+        """أعمدة الـ UNIQUE constraints في الجدول (المفاتيح الطبيعية) - غير _mongo_id"""
+        if table_name not in self._unique_keys_cache:
+            cursor.execute(f"PRAGMA index_list({table_name})")
+            # (seq, name, unique, origin, partial)
+            indexes = [index[1] for index in cursor.fetchall() if index[2] and not index[4]]
+            keys = []
+            for index_name in indexes:
+                cursor.execute(f"PRAGMA index_info({index_name})")
+                key = tuple(info[2] for info in cursor.fetchall())
+                if key and None not in key and '_mongo_id' not in key:
+                    keys.append(key)
+            self._unique_keys_cache[table_name] = keys
+        return self._unique_keys_cache[table_name]
+
+    def _replace_natural_key_clash(self, cursor, table_name: str, columns: list,
+                                   insert_sql: str, row: tuple) -> bool:
+        """
+        INSERT اتعارض مع مفتاح طبيعي: لو الصفوف المتعارضة كلها متزامنة (نسخة قديمة من السحابة)
+        بتتشال والصف الجديد بيدخل (زي INSERT OR REPLACE القديم) - لو فيهم تعديل محلي لسه
+        مترفعش بيرجع False والصف بيتخطى عشان الشغل المحلي ميضيعش
+        """
+        values = dict(zip(['_mongo_id'] + columns, row))
+        clashes = []
+        for key in self._unique_keys(cursor, table_name):
+            if any(values.get(column) is None for column in key):
+                continue
+            cursor.execute(
+                f"SELECT id, sync_status FROM {table_name} WHERE "
+                + " AND ".join(f"{column} = ?" for column in key),
+                [values[column] for column in key]
+            )
+            clashes.extend(cursor.fetchall())
+        if not clashes or any(sync_status != 'synced' for _id, sync_status in clashes):
+            return False
+
+        cursor.execute("SAVEPOINT pull_replace")
+        try:
+            cursor.executemany(f"DELETE FROM {table_name} WHERE id = ?", [(row_id,) for row_id, _ in clashes])
+            cursor.execute(insert_sql, row)
+        except sqlite3.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT pull_replace")
+            cursor.execute("RELEASE SAVEPOINT pull_replace")
+            return False
+        cursor.execute("RELEASE SAVEPOINT pull_replace")
+        print(f"  ⚠️ {table_name}: السجل {row[0]} استبدل نسخة محلية متزامنة بنفس المفتاح")
+        return True
+
+    def _pull_tombstones(self, repo) -> int:
+        """
+        تطبيق المحذوفات من collection الـ tombstones على SQLite
+        (كل حذف من MongoDB بيسيب tombstone: collection + mongo_id + last_modified)
+        """
+        watermark = self._get_watermark(repo, 'tombstones')
+        query = self._delta_query(watermark)
+        with repo.mongo_breaker.bulk_reads():
+            tombstones = list(repo.mongo_db.tombstones.find(query))
+        if not tombstones:
+            return 0
+
+        by_table = {}
+        new_watermark = watermark
+        for tombstone in tombstones:
+            table_name = tombstone.get('collection')
+            if table_name in self.tables and tombstone.get('mongo_id'):
+                by_table.setdefault(table_name, []).append(str(tombstone['mongo_id']))
+            last_modified = tombstone.get('last_modified')
+            if isinstance(last_modified, datetime) and (new_watermark is None or last_modified > new_watermark):
+                new_watermark = last_modified
+
+        deleted = 0
+        with repo._local_transaction() as cursor:
+            for table_name, mongo_ids in by_table.items():
+                if table_name == 'journal_entries':
+                    self._remove_journal_entries(repo, cursor, mongo_ids)
+                cursor.executemany(
+                    f"DELETE FROM {table_name} WHERE _mongo_id = ?",
+                    [(mongo_id,) for mongo_id in mongo_ids]
+                )
+                deleted += len(mongo_ids)
+            if new_watermark:
+                self._set_watermark(cursor, 'tombstones', new_watermark)
+
+        if deleted:
+            print(f"  ✅ تم تطبيق {deleted} حذف من السحابة")
+        return deleted
+
+    @staticmethod
+    def _remove_journal_entries(repo, cursor, mongo_ids: List[str]):
+        """طرح حركات القيود المحذوفة من الأرصدة ومسح أسطرها من journal_lines (قبل حذف القيود)"""
+        movements: Dict[str, List[float]] = {}
+        for i in range(0, len(mongo_ids), 500):
+            chunk = mongo_ids[i:i + 500]
+            cursor.execute(
+                f"SELECT id, lines FROM journal_entries WHERE _mongo_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            )
+            for entry in cursor.fetchall():
+                repo._accumulate_balance_movements(
+                    movements, repo._decode_journal_lines(entry['lines']), -1.0
+                )
+                cursor.execute("DELETE FROM journal_lines WHERE entry_id = ?", (entry['id'],))
+        repo._write_balance_movements(cursor, movements)
+
+
+class OutboxPushStrategy(SyncStrategy):
+    """
+    تفريغ الـ outbox الدائم (جدول sync_queue) بالأولوية:
+    - create/update بـ bulk_write واحد لكل collection، و delete بـ delete_from_mongo (tombstone)
+    - النجاح → completed، والفشل → retry_count + 1 ولما يوصل max_retries → failed
+    """
+
+    name = "outbox_push"
+    direction = "push"
+
+    def __init__(self, batch_size: int = 200):
+        super().__init__()
+        self.batch_size = batch_size
+
+    def run(self, engine: "SyncEngine") -> int:
+        self.last_failed = 0
+        repo = engine.repository
+        total_synced = 0
+
+        while not engine.is_stopping:
+            with repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT id, COALESCE(action, operation) AS action, entity_type, entity_id, data
+                    FROM sync_queue
+                    WHERE status = 'pending' AND retry_count < max_retries
+                    ORDER BY CASE priority WHEN 'high' THEN 0 WHEN 'medium' THEN 1 ELSE 2 END, created_at
+                    LIMIT ?
+                """, (self.batch_size,))
+                items = [dict(row) for row in cursor.fetchall()]
+            if not items:
+                break
+
+            succeeded, failed = self._push_items(repo, items)
+            now = datetime.now().isoformat()
+            with repo._local_transaction() as cursor:
+                cursor.executemany(
+                    "UPDATE sync_queue SET status = 'completed', last_attempt = ?, error_message = NULL WHERE id = ?",
+                    [(now, item_id) for item_id in succeeded]
+                )
+                cursor.executemany(
+                    """
+                    UPDATE sync_queue SET
+                        retry_count = retry_count + 1,
+                        status = CASE WHEN retry_count + 1 >= max_retries THEN 'failed' ELSE 'pending' END,
+                        error_message = ?,
+                        last_attempt = ?
+                    WHERE id = ?
+                    """,
+                    [(error, now, item_id) for item_id, error in failed]
+                )
+
+            total_synced += len(succeeded)
+            self.last_failed += len(failed)
+            if len(items) < self.batch_size:
+                break
+
+        if total_synced:
+            print(f"  ✅ تم تنفيذ {total_synced} عملية من طابور المزامنة")
+        return total_synced
+
+    def _load_payload(self, repo, item: dict) -> Optional[dict]:
+        """البيانات من الـ outbox نفسه، ولو مش موجودة (أو مش JSON) من الصف المحلي"""
+        if item.get('data'):
+            try:
+                payload = json.loads(item['data'])
+                if isinstance(payload, dict):
+                    return payload
+            except (json.JSONDecodeError, TypeError):
+                pass
+        with repo._reader() as cursor:
+            cursor.execute(
+                f"SELECT * FROM {item['entity_type']} WHERE id = ?", (item['entity_id'],)
+            )
+            row = cursor.fetchone()
+        return dict(row) if row else None
+
+    def _resolve_query(self, repo, item: dict) -> Optional[dict]:
+        """entity_id ممكن يكون ObjectId في السحابة أو id محلي ليه _mongo_id"""
+        from bson import ObjectId
+
+        entity_id = str(item.get('entity_id') or '')
+        if ObjectId.is_valid(entity_id):
+            return {'_id': ObjectId(entity_id)}
+        try:
+            with repo._reader() as cursor:
+                cursor.execute(
+                    f"SELECT _mongo_id FROM {item['entity_type']} WHERE id = ?", (entity_id,)
+                )
+                row = cursor.fetchone()
+        except Exception:
+            row = None
+        if row and row[0]:
+            return {'_id': repo._to_objectid(row[0])}
+        return None
+
+    def _delete_query(self, repo, item: dict) -> Optional[dict]:
+        """استعلام الحذف: المحفوظ في الـ outbox (حذف مؤجل من unit_of_work) أو من entity_id"""
+        if item.get('data'):
+            from bson import json_util
+            try:
+                payload = json_util.loads(item['data'])
+            except (ValueError, TypeError):
+                payload = None
+            if isinstance(payload, dict) and isinstance(payload.get('query'), dict):
+                return payload['query']
+        return self._resolve_query(repo, item)
+
+    def _push_items(self, repo, items: List[dict]):
+        """تنفيذ دفعة من الـ outbox - بيرجع (ids ناجحة, [(id, رسالة الخطأ)] فاشلة)"""
+        import pymongo
+        from bson import ObjectId
+
+        succeeded: List[int] = []
+        failed: List[tuple] = []
+        operations: Dict[str, list] = {}  # collection -> [(item_id, operation, local_link)]
+
+        for item in items:
+            action = (item.get('action') or '').lower()
+            table_name = item['entity_type']
+            try:
+                if action == 'delete':
+                    query = self._delete_query(repo, item)
+                    if query is not None:
+                        repo.delete_from_mongo(table_name, query)
+                    # مش موجود في السحابة أصلاً → الحذف ناجح
+                    succeeded.append(item['id'])
+                    continue
+
+                payload = self._load_payload(repo, item)
+                if payload is None:
+                    failed.append((item['id'], "لم يتم العثور على البيانات"))
+                    continue
+                local_id = payload.get('id')
+                mongo_id = payload.get('_mongo_id')
+                document = prepare_row_for_cloud(table_name, payload)
+                document.pop('last_modified', None)
+
+                if action == 'create' and not mongo_id:
+                    # الـ _id بيتولد هنا - upsert عشان last_modified ياخد ساعة السيرفر
+                    new_id = ObjectId()
+                    link = (str(new_id), local_id) if local_id is not None else None
+                    operations.setdefault(table_name, []).append((
+                        item['id'],
+                        pymongo.UpdateOne({'_id': new_id}, {'$set': document, **SERVER_TIMESTAMP}, upsert=True),
+                        link,
+                    ))
+                elif action in ('create', 'update'):
+                    query = {'_id': repo._to_objectid(mongo_id)} if mongo_id else self._resolve_query(repo, item)
+                    if query is None:
+                        failed.append((item['id'], "لا يوجد _mongo_id للكيان"))
+                        continue
+                    operations.setdefault(table_name, []).append(
+                        (item['id'], pymongo.UpdateOne(query, {'$set': document, **SERVER_TIMESTAMP}), None)
+                    )
+                else:
+                    failed.append((item['id'], f"عملية غير معروفة: {action}"))
+            except Exception as e:
+                failed.append((item['id'], str(e)))
+
+        for table_name, entries in operations.items():
+            failed_indexes = {}
+            try:
+                repo.mongo_db[table_name].bulk_write([op for _, op, _ in entries], ordered=False)
+            except pymongo.errors.BulkWriteError as e:
+                for error in e.details.get('writeErrors', []):
+                    failed_indexes[error.get('index')] = error.get('errmsg')
+            except Exception as e:
+                failed_indexes = {index: str(e) for index in range(len(entries))}
+
+            links = []
+            for index, (item_id, _, link) in enumerate(entries):
+                if index in failed_indexes:
+                    failed.append((item_id, failed_indexes[index]))
+                    continue
+                succeeded.append(item_id)
+                if link:
+                    links.append(link)
+
+            if links:
+                with repo._local_transaction() as cursor:
+                    cursor.executemany(
+                        f"UPDATE {table_name} SET _mongo_id = ?, sync_status = 'synced' WHERE id = ?",
+                        links
+                    )
+
+        return succeeded, failed
+
+
+class DirtyRowsPushStrategy(SyncStrategy):
+    """
+    ⚡ رفع السجلات المعدلة محلياً (sync_status = new_offline/modified_offline)
+    على دفعات: bulk_write واحد (ordered=False) + executemany واحد لكل دفعة
+    """
+
+    name = "dirty_rows_push"
+    direction = "push"
+
+    def __init__(self, batch_size: int = 500, tables: Optional[Dict[str, dict]] = None):
+        super().__init__()
+        self.batch_size = batch_size
+        self.tables = tables or SYNC_TABLES
+
+    def run(self, engine: "SyncEngine") -> int:
+        self.last_failed = 0
+        repo = engine.repository
+        total_pushed = 0
+
+        for table_name in self.tables:
+            if engine.is_stopping:
+                break
+            try:
+                # جلب السجلات غير المتزامنة
+                with repo._reader() as cursor:
+                    cursor.execute(f"""
+                        SELECT * FROM {table_name}
+                        WHERE sync_status IN ('new_offline', 'modified_offline')
+                    """)
+                    unsynced_rows = cursor.fetchall()
+                if not unsynced_rows:
+                    continue
+
+                table_pushed = 0
+                for i in range(0, len(unsynced_rows), self.batch_size):
+                    chunk = unsynced_rows[i:i + self.batch_size]
+                    table_pushed += self._push_chunk(repo, table_name, chunk)
+
+                total_pushed += table_pushed
+                if table_pushed > 0:
+                    print(f"  ✅ تم رفع {table_pushed} سجل من {table_name}")
+
+            except Exception as e:
+                self.last_failed += 1
+                print(f"  ❌ فشل رفع جدول {table_name}: {e}")
+
+        return total_pushed
+
+    def _push_chunk(self, repo, table_name: str, rows: list) -> int:
+        """
+        رفع دفعة سجلات من جدول واحد بـ bulk_write (ordered=False)
+        ثم تحديث _mongo_id و sync_status محلياً بـ executemany واحد
+
+        Returns:
+            عدد السجلات اللي اترفعت بنجاح
+        """
+        import pymongo
+        from bson import ObjectId
+
+        operations = []
+        bookkeeping = []  # (mongo_id, local last_modified, local_id) لكل operation
+        for row in rows:
+            row_dict = dict(row)
+            local_id = row_dict.get('id')
+            mongo_id = row_dict.get('_mongo_id')
+            local_last_modified = row_dict.get('last_modified')
+            document = prepare_row_for_cloud(table_name, row_dict)
+
+            # ⚡ وقت الرفع (بساعة سيرفر MongoDB) هو last_modified في السحابة
+            # (عشان الأجهزة التانية تشوف التعديل في الـ delta pull بتاعها حتى لو ساعة الجهاز متأخرة)
+            document.pop('last_modified', None)
+
+            if mongo_id:
+                # تحديث سجل موجود
+                operations.append(pymongo.UpdateOne(
+                    {'_id': repo._to_objectid(mongo_id)},
+                    {'$set': document, **SERVER_TIMESTAMP}
+                ))
+            else:
+                # إدراج سجل جديد (الـ _id بيتولد هنا عشان نعرفه من غير ما نستنى النتيجة)
+                # upsert بدل InsertOne عشان last_modified ياخد ساعة السيرفر
+                new_id = ObjectId()
+                mongo_id = str(new_id)
+                operations.append(pymongo.UpdateOne(
+                    {'_id': new_id}, {'$set': document, **SERVER_TIMESTAMP}, upsert=True
+                ))
+            bookkeeping.append((mongo_id, local_last_modified, local_id))
+
+        failed_indexes = set()
+        try:
+            repo.mongo_db[table_name].bulk_write(operations, ordered=False)
+        except pymongo.errors.BulkWriteError as e:
+            # ordered=False: الباقي اترفع، والـ writeErrors فيها index كل عملية فشلت
+            for error in e.details.get('writeErrors', []):
+                failed_indexes.add(error.get('index'))
+                print(f"  ⚠️ فشل رفع سجل من {table_name} (ID: {bookkeeping[error.get('index')][2]}): {error.get('errmsg')}")
+
+        succeeded = [item for index, item in enumerate(bookkeeping) if index not in failed_indexes]
+        self.last_failed += len(failed_indexes)
+        if not succeeded:
+            return 0
+
+        # ⚡ تحديث محلي واحد للدفعة كلها
+        # (لو السجل اتعدل محلياً أثناء الرفع، يفضل modified عشان يترفع تاني)
+        with repo._local_transaction() as cursor:
+            cursor.executemany(
+                f"""
+                UPDATE {table_name} SET
+                    _mongo_id = ?,
+                    sync_status = CASE WHEN last_modified IS ? THEN 'synced' ELSE sync_status END
+                WHERE id = ?
+                """,
+                succeeded
+            )
+        return len(succeeded)
+
+
+# ==========================================
+# المحرك
+# ==========================================
+
+class SyncEngine(QObject):
+    """
+    ⚡ محرك المزامنة الموحّد
+    - thread واحد (scheduler) بيشغّل دورة كل interval_seconds أو فوراً مع request_sync()
+    - دورة واحدة بس في نفس الوقت (مفيش مزامنات متوازية على نفس الـ cursor)
+    - الاستراتيجيات بتتنفذ بالترتيب: pull الأول ثم push
+    """
+
+    # إشارات (نفس أسماء AdvancedSyncManager عشان شريط الحالة)
+    connection_status_changed = pyqtSignal(bool)
+    sync_status_changed = pyqtSignal(str)  # "syncing", "synced", "offline", "error"
+    sync_progress = pyqtSignal(int, int)  # current, total
+    notification_ready = pyqtSignal(str, str)  # title, message
+    sync_completed = pyqtSignal(dict)  # نتائج الدورة
+    circuit_state_changed = pyqtSignal(str)  # حالة circuit breaker بتاع MongoDB
+
+    def __init__(self, repository, strategies: Optional[List[SyncStrategy]] = None,
+                 interval_seconds: int = 600, batch_size: int = 500, parent=None):
+        """
+        Args:
+            repository: كائن Repository (الاتصال المحلي الوحيد)
+            strategies: استراتيجيات المزامنة بالترتيب (الافتراضي: delta pull ثم outbox ثم dirty rows)
+            interval_seconds: الفترة بين الدورات التلقائية
+            batch_size: حجم الدفعة في الرفع
+        """
+        super().__init__(parent)
+        self.repository = repository
+        self.strategies: List[SyncStrategy] = strategies if strategies is not None else [
+            DeltaPullStrategy(),
+            OutboxPushStrategy(),
+            DirtyRowsPushStrategy(batch_size=batch_size),
+        ]
+        self.interval_seconds = interval_seconds
+        self.is_online = bool(getattr(repository, 'online', False))
+        self.is_syncing = False
+        self.sync_status = "synced" if self.is_online else "offline"
+        self.last_sync_time: Optional[datetime] = None
+
+        self._cycle_lock = threading.Lock()
+        self._last_refresh_request = 0.0
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._scheduler_thread: Optional[threading.Thread] = None
+        self.connection_checker: Optional[ConnectionChecker] = None
+
+        # مقاييس
+        self._totals = {'pulled': 0, 'pushed': 0, 'failed': 0, 'cycles': 0}
+        self._last_cycle = {'seconds': 0.0, 'pulled': 0, 'pushed': 0, 'pull_seconds': 0.0, 'push_seconds': 0.0}
+        self._strategy_stats: Dict[str, Dict[str, Any]] = {}
+
+        # ⚡ القراءة local_first في الـ Repository بتطلب التحديث من هنا لما النسخة المحلية تقدم
+        if hasattr(repository, 'set_refresh_requester'):
+            repository.set_refresh_requester(self.request_refresh)
+
+        # ⚡ بعد commit الـ unit_of_work السجلات المتعدلة بتترفع دفعة واحدة من هنا
+        if hasattr(repository, 'set_push_handler'):
+            repository.set_push_handler(self.push_pending_writes)
+
+        # ⚡ الاتصال بـ MongoDB بيخلص في الخلفية - أول ما يجهز نبلّغ الواجهة ونبدأ مزامنة
+        if hasattr(repository, 'add_connection_listener'):
+            repository.add_connection_listener(self._on_repository_connection)
+
+        # ⚡ فتح/قفل الـ circuit breaker بيظهر في شريط الحالة فوراً
+        self.circuit_breaker = getattr(repository, 'mongo_breaker', None)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.add_listener(self.circuit_state_changed.emit)
+
+        print("INFO: [SyncEngine] تم تهيئة محرك المزامنة الموحّد")
+
+    @property
+    def is_stopping(self) -> bool:
+        return self._stop_event.is_set()
+
+    # --- الجدولة ---
+
+    def start(self, delay_seconds: float = 3, check_connection: bool = True):
+        """بدء الـ scheduler (وفاحص الاتصال) - أول دورة بعد delay_seconds"""
+        if self._scheduler_thread and self._scheduler_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        if check_connection and self.connection_checker is None:
+            self.connection_checker = ConnectionChecker(circuit_breaker=self.circuit_breaker)
+            self.connection_checker.connection_changed.connect(self._on_connection_changed)
+            self.connection_checker.start()
+
+        self._scheduler_thread = threading.Thread(
+            target=self._scheduler_loop,
+            args=(delay_seconds,),
+            daemon=True,
+            name="SyncEngineThread"
+        )
+        self._scheduler_thread.start()
+        print(f"INFO: [SyncEngine] ⚡ جدولة المزامنة (بعد {delay_seconds} ثانية، ثم كل {self.interval_seconds} ثانية)")
+
+    def _scheduler_loop(self, delay_seconds: float):
+        if self._stop_event.wait(delay_seconds):
+            return
+        while not self._stop_event.is_set():
+            self._wake_event.clear()
+            self.run_cycle()
+            self._wake_event.wait(self.interval_seconds)
+
+    def request_sync(self):
+        """طلب دورة مزامنة فوراً (من غير ما يستنى الـ interval)"""
+        self._wake_event.set()
+
+    def request_refresh(self, collection_name: str):
+        """
+        طلب تحديث نسخة محلية قديمة (من قراءات local_first)
+        كذا قراءة ورا بعض بيطلبوا دورة واحدة بس (delta pull بيجيب كل الـ collections)
+        """
+        now = time.monotonic()
+        if self.is_syncing or now - self._last_refresh_request < 5:
+            return
+        self._last_refresh_request = now
+        print(f"INFO: [SyncEngine] النسخة المحلية من {collection_name} قديمة - جاري التحديث في الخلفية")
+        self.request_sync()
+
+    def push_pending_writes(self) -> int:
+        """
+        ⚡ رفع السجلات المحلية المتعدلة فوراً (بعد commit الـ unit_of_work) - bulk_write لكل جدول.
+        لو في دورة شغالة بيطلب دورة تانية بدل ما يرفع نفس السجلات مرتين.
+
+        Returns:
+            عدد السجلات اللي اترفعت
+        """
+        if not self.repository.online:
+            return 0
+        if not self._cycle_lock.acquire(blocking=False):
+            self.request_sync()
+            return 0
+        try:
+            strategy = next(
+                (s for s in self.strategies if isinstance(s, DirtyRowsPushStrategy)), None
+            ) or DirtyRowsPushStrategy()
+            pushed = strategy.run(self)
+            self._totals['pushed'] += pushed
+            self._totals['failed'] += strategy.last_failed
+            return pushed
+        finally:
+            self._cycle_lock.release()
+
+    def stop(self, timeout: float = 5.0):
+        """إيقاف الـ scheduler وفاحص الاتصال (بيتنادى أكتر من مرة عند الإغلاق)"""
+        if self._stop_event.is_set():
+            return
+        print("INFO: [SyncEngine] جاري إيقاف محرك المزامنة...")
+        self._stop_event.set()
+        self._wake_event.set()
+
+        if self._scheduler_thread and self._scheduler_thread.is_alive():
+            try:
+                self._scheduler_thread.join(timeout=timeout)
+            except Exception as e:
+                print(f"WARNING: [SyncEngine] فشل انتظار انتهاء thread: {e}")
+
+        if self.connection_checker is not None:
+            try:
+                self.connection_checker.stop()
+            except Exception as e:
+                print(f"WARNING: [SyncEngine] فشل إيقاف فاحص الاتصال: {e}")
+            self.connection_checker = None
+
+        self.cleanup_completed_items()
+        print("INFO: [SyncEngine] ✅ تم إيقاف محرك المزامنة")
+
+    def _on_repository_connection(self, is_online: bool):
+        """نتيجة محاولة اتصال الـ Repository بـ MongoDB (من thread الخلفية)"""
+        if is_online:
+            self.is_online = True
+            self.connection_status_changed.emit(True)
+            print("INFO: [SyncEngine] ✅ MongoDB جاهز - جاري المزامنة")
+            self.request_sync()
+        elif self.is_online:
+            self.is_online = False
+            self.connection_status_changed.emit(False)
+            self._set_status("offline")
+
+    def _on_connection_changed(self, is_online: bool):
+        """معالج تغيير حالة الاتصال"""
+        self.is_online = is_online
+        self.connection_status_changed.emit(is_online)
+
+        if is_online and not self.repository.online:
+            # ⚡ الشبكة رجعت بس الـ Repository لسه أوفلاين (فشل وقت التشغيل) - محاولة اتصال في الخلفية
+            # والمزامنة هتبدأ من _on_repository_connection لما الاتصال ينجح
+            if hasattr(self.repository, 'connect_in_background'):
+                self.repository.connect_in_background()
+        if is_online:
+            self.notification_ready.emit("🟢 متصل", "تم استعادة الاتصال - جاري المزامنة...")
+            self.request_sync()
+        else:
+            self.notification_ready.emit("🔴 غير متصل", "فقدان الاتصال - سيتم حفظ البيانات محلياً")
+            self._set_status("offline")
+
+    def _set_status(self, status: str):
+        self.sync_status = status
+        self.sync_status_changed.emit(status)
+
+    # --- الدورة ---
+
+    def run_cycle(self) -> Optional[Dict[str, Any]]:
+        """
+        تنفيذ دورة مزامنة واحدة (كل الاستراتيجيات بالترتيب)
+
+        Returns:
+            نتائج الدورة، أو None لو في دورة شغالة أو مفيش اتصال
+        """
+        if not self._cycle_lock.acquire(blocking=False):
+            print("WARNING: [SyncEngine] المزامنة جارية بالفعل")
+            return None
+
+        self.is_syncing = True
+        try:
+            if not self.repository.online:
+                print("WARNING: [SyncEngine] لا يوجد اتصال بـ MongoDB - تم تخطي المزامنة")
+                self._set_status("offline")
+                return None
+
+            self._set_status("syncing")
+            cycle_started = time.perf_counter()
+            results = {'pulled': 0, 'pushed': 0, 'failed': 0, 'pull_seconds': 0.0, 'push_seconds': 0.0}
+            had_errors = False
+
+            for index, strategy in enumerate(self.strategies):
+                if self.is_stopping:
+                    break
+                self.sync_progress.emit(index + 1, len(self.strategies))
+
+                started = time.perf_counter()
+                try:
+                    rows = strategy.run(self)
+                except Exception as e:
+                    print(f"ERROR: [SyncEngine] فشلت الاستراتيجية {strategy.name}: {e}")
+                    rows = 0
+                    strategy.last_failed += 1
+                    had_errors = True
+                elapsed = time.perf_counter() - started
+
+                stats = self._strategy_stats.setdefault(
+                    strategy.name, {'direction': strategy.direction, 'rows': 0, 'failed': 0, 'runs': 0}
+                )
+                stats['runs'] += 1
+                stats['rows'] += rows
+                stats['failed'] += strategy.last_failed
+                stats['last_rows'] = rows
+                stats['last_seconds'] = elapsed
+
+                results['pulled' if strategy.direction == 'pull' else 'pushed'] += rows
+                results[f'{strategy.direction}_seconds'] += elapsed
+                results['failed'] += strategy.last_failed
+
+            results['seconds'] = time.perf_counter() - cycle_started
+            self._record_cycle(results)
+
+            if not self.is_stopping:
+                self._set_status("error" if had_errors else "synced")
+            self.sync_completed.emit(results)
+
+            if results['pulled'] or results['pushed']:
+                print(
+                    f"INFO: [SyncEngine] ✅ اكتملت المزامنة - جلب {results['pulled']}، "
+                    f"رفع {results['pushed']}، فشل {results['failed']} ({results['seconds']:.2f} ثانية)"
+                )
+                app_signals.sync_completed.emit(results)
+            if results['pushed']:
+                self.notification_ready.emit(
+                    "🚀 تمت المزامنة",
+                    f"تم رفع {results['pushed']} عملية بنجاح"
+                    + (f" ({results['failed']} فشلت)" if results['failed'] else "")
+                )
+            return results
+
+        except Exception as e:
+            print(f"ERROR: [SyncEngine] فشلت المزامنة: {e}")
+            self._totals['failed'] += 1
+            self._set_status("error")
+            app_signals.sync_failed.emit(str(e))
+            return None
+
+        finally:
+            self.is_syncing = False
+            self._cycle_lock.release()
+
+    def _record_cycle(self, results: Dict[str, Any]):
+        self._totals['cycles'] += 1
+        self._totals['pulled'] += results['pulled']
+        self._totals['pushed'] += results['pushed']
+        self._totals['failed'] += results['failed']
+        self._last_cycle = {k: results[k] for k in ('seconds', 'pulled', 'pushed', 'pull_seconds', 'push_seconds')}
+        self.last_sync_time = datetime.now()
+
+    # --- الـ outbox ---
+
+    def enqueue(self, action: str, table_name: str, entity_id: str,
+                data: Optional[Dict[str, Any]] = None, priority: str = "medium",
+                max_retries: int = 3):
+        """
+        إضافة عملية للـ outbox الدائم (sync_queue)
+
+        Args:
+            action: create / update / delete
+            table_name: اسم الجدول/الـ collection
+            entity_id: id محلي أو ObjectId في السحابة
+            data: البيانات (لو None بتتقري من الصف المحلي وقت الرفع)
+            priority: high / medium / low
+        """
+        now = datetime.now().isoformat()
+        try:
+            with self.repository._local_transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO sync_queue
+                    (operation, action, entity_type, entity_id, data, priority,
+                     status, retry_count, max_retries, created_at, last_modified)
+                    VALUES (?, ?, ?, ?, ?, ?, 'pending', 0, ?, ?, ?)
+                """, (
+                    action, action, table_name, str(entity_id),
+                    json.dumps(data, default=str) if data is not None else None,
+                    priority, max_retries, now, now
+                ))
+        except Exception as e:
+            print(f"ERROR: [SyncEngine] فشل إضافة عملية لطابور المزامنة: {e}")
+            return
+
+        if self.is_online:
+            self.request_sync()
+
+    def get_pending_count(self) -> int:
+        """عدد عمليات الـ outbox المعلقة"""
+        return self.get_metrics()['outbox_depth']
+
+    def cleanup_completed_items(self, days_old: int = 7):
+        """تنظيف عمليات الـ outbox المكتملة القديمة"""
+        cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
+        try:
+            with self.repository._local_transaction() as cursor:
+                cursor.execute(
+                    "DELETE FROM sync_queue WHERE status = 'completed' AND created_at < ?",
+                    (cutoff_date,)
+                )
+                deleted_count = cursor.rowcount
+            if deleted_count > 0:
+                print(f"INFO: [SyncEngine] تم تنظيف {deleted_count} عملية مزامنة قديمة")
+        except Exception as e:
+            print(f"ERROR: [SyncEngine] فشل تنظيف طابور المزامنة: {e}")
+
+    # --- المقاييس ---
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        ⚡ مقاييس المزامنة:
+        - queue_depth: عمليات الـ outbox المعلقة + السجلات المعدلة محلياً
+        - lag_seconds: من آخر دورة ناجحة، و oldest_pending_seconds: عمر أقدم تغيير لسه مترفعش
+        - throughput: سجل/ثانية في آخر دورة (pull و push)
+        """
+        repo = self.repository
+        outbox_depth, dirty_rows = 0, 0
+        oldest_pending: List[str] = []
+        try:
+            dirty_sql = " UNION ALL ".join(
+                f"SELECT COUNT(*), MIN(last_modified) FROM {table} "
+                f"WHERE sync_status IN ('new_offline', 'modified_offline')"
+                for table in SYNC_TABLES
+            )
+            with repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT COUNT(*), MIN(created_at) FROM sync_queue
+                    WHERE status = 'pending' AND retry_count < max_retries
+                """)
+                outbox_depth, oldest_outbox = cursor.fetchone()
+                if oldest_outbox:
+                    oldest_pending.append(oldest_outbox)
+                cursor.execute(dirty_sql)
+                for count, oldest in cursor.fetchall():
+                    dirty_rows += count
+                    if oldest:
+                        oldest_pending.append(oldest)
+        except Exception as e:
+            print(f"WARNING: [SyncEngine] فشل حساب مقاييس الطابور: {e}")
+
+        now = datetime.now()
+        oldest_pending_seconds = None
+        if oldest_pending:
+            try:
+                oldest_pending_seconds = max(0.0, (now - datetime.fromisoformat(min(oldest_pending))).total_seconds())
+            except (ValueError, TypeError):
+                pass
+
+        last = self._last_cycle
+        return {
+            'queue_depth': (outbox_depth or 0) + dirty_rows,
+            'outbox_depth': outbox_depth or 0,
+            'dirty_rows': dirty_rows,
+            'lag_seconds': (now - self.last_sync_time).total_seconds() if self.last_sync_time else None,
+            'oldest_pending_seconds': oldest_pending_seconds,
+            'last_sync_time': self.last_sync_time,
+            'last_cycle_seconds': last['seconds'],
+            'throughput': {
+                'pulled_rows_per_sec': (last['pulled'] / last['pull_seconds']) if last['pull_seconds'] > 0 else 0.0,
+                'pushed_rows_per_sec': (last['pushed'] / last['push_seconds']) if last['push_seconds'] > 0 else 0.0,
+            },
+            'totals': dict(self._totals),
+            'strategies': {name: dict(stats) for name, stats in self._strategy_stats.items()},
+            'is_syncing': self.is_syncing,
+            'is_online': self.is_online,
+            'sync_status': self.sync_status,
+            'circuit': self.circuit_breaker.get_state() if self.circuit_breaker is not None else None,
+        }
@@ -0,0 +1,105 @@
+# الملف: core/text_normalize.py
+"""
+⚡ توحيد النص العربي وأرقام التليفونات للبحث
+- الهمزات (أ إ آ ٱ ← ا) والتاء المربوطة (ة ← ه) والألف المقصورة (ى ← ي) و (ؤ ← و) و (ئ ← ي)
+- حذف التشكيل والتطويل (ـ) - وتحويل الأرقام العربية (٠١٢ / ۰۱۲) لأرقام إنجليزي
+- التليفون: أرقام بس من غير فواصل ولا كود الدولة (+20 / 0020 ← 0)
+- الفهرسة (index_text): الكلمة اللي أولها "ال" / "وال" / "بال" / "لل" ... بتتفهرس من غيرها كمان
+  (البحث بـ "ايمان" يلاقي "الإيمان")
+
+نفس الدوال متسجلة على اتصالات SQLitePool (register_sql_functions) عشان Repository يحسب الأعمدة
+المتوحدة وفهرس البحث وقت الكتابة (core/search_index.py: flush_search_pending) - والبحث بيوحد نص
+المستخدم بس (مش كل صف في كل بحث).
+
+الاستخدام:
+    normalize_text("مؤسسة الأمَل")     # "موسسه الامل"
+    normalize_phone("+20 101-234-5678")  # "01012345678"
+"""
+
+import re
+from typing import Dict, List
+
+# الحرف ← البديل ("" = يتشال)
+ARABIC_CHAR_MAP: Dict[str, str] = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ة": "ه",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+    "ـ": "",  # تطويل
+    # التشكيل (فتحتين ... سكون) والألف الخنجرية
+    **{chr(code): "" for code in range(0x064B, 0x0653)},
+    chr(0x0670): "",
+    # الأرقام العربية والفارسية
+    **{chr(0x0660 + digit): str(digit) for digit in range(10)},
+    **{chr(0x06F0 + digit): str(digit) for digit in range(10)},
+}
+
+# أدوات التعريف الملزوقة في أول الكلمة (الأطول الأول)
+ARABIC_ARTICLE_PREFIXES = ("وال", "بال", "كال", "فال", "لل", "ال")
+
+# الفواصل اللي بتتشال من التليفون
+PHONE_SEPARATORS = " -+()./\t"
+
+# كود الدولة المحلي: +20 1012345678 ← 01012345678
+LOCAL_COUNTRY_CODE = "20"
+LOCAL_NUMBER_LENGTH = 11
+
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+_TEXT_TABLE = str.maketrans(ARABIC_CHAR_MAP)
+_PHONE_TABLE = str.maketrans({**ARABIC_CHAR_MAP, **{char: "" for char in PHONE_SEPARATORS}})
+
+
+def normalize_text(text) -> str:
+    """نص متوحد للبحث (حروف صغيرة + توحيد الحروف العربية)"""
+    if not text:
+        return ""
+    return str(text).translate(_TEXT_TABLE).lower()
+
+
+def normalized_words(text) -> List[str]:
+    """كلمات النص بعد التوحيد (نفس تقسيم tokenizer الـ unicode61: الـ _ والرموز فواصل)"""
+    return _WORD_RE.findall(normalize_text(text))
+
+
+def index_text(text) -> str:
+    """نص الفهرسة: النص المتوحد + الكلمات من غير أداة التعريف (لو فاضل منها حرفين على الأقل)"""
+    normalized = normalize_text(text)
+    stripped = []
+    for word in _WORD_RE.findall(normalized):
+        for prefix in ARABIC_ARTICLE_PREFIXES:
+            if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                stripped.append(word[len(prefix):])
+                break
+    if stripped:
+        return normalized + " " + " ".join(stripped)
+    return normalized
+
+
+def normalize_phone(phone) -> str:
+    """رقم تليفون بالشكل المحلي (أرقام بس)"""
+    if not phone:
+        return ""
+    digits = str(phone).translate(_PHONE_TABLE)
+    international = "00" + LOCAL_COUNTRY_CODE
+    if digits.startswith(international) and len(digits) == LOCAL_NUMBER_LENGTH - 1 + len(international):
+        return "0" + digits[len(international):]
+    if digits.startswith(LOCAL_COUNTRY_CODE) and len(digits) == LOCAL_NUMBER_LENGTH - 1 + len(LOCAL_COUNTRY_CODE):
+        return "0" + digits[len(LOCAL_COUNTRY_CODE):]
+    return digits
+
+
+def looks_like_phone(text) -> bool:
+    """النص أرقام وفواصل بس (6 أرقام على الأقل) - يتدور عليه كتليفون"""
+    digits = str(text or "").translate(_PHONE_TABLE)
+    return len(digits) >= 6 and digits.isdigit()
+
+
+def register_sql_functions(connection) -> None:
+    """
+    normalize_text(x) / normalize_phone(x) / index_text(x) كـ دوال SQL على الاتصال
+    (flush_search_pending بيستخدمها - الـ triggers نفسها SQL عادي ومش محتاجاها)
+    """
+    connection.create_function("normalize_text", 1, normalize_text, deterministic=True)
+    connection.create_function("normalize_phone", 1, normalize_phone, deterministic=True)
+    connection.create_function("index_text", 1, index_text, deterministic=True)
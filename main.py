@@ -8,6 +8,10 @@ import sys
 import os
 import time
 
+# ⚡ تتبع زمن التشغيل (startup trace) - أول حاجة عشان يقيس كل اللي بعدها
+from core.performance import startup_trace
+_imports_step = startup_trace.start("imports")
+
 # ⚡ تحسين الأداء على Windows
 if os.name == 'nt':
     os.environ['QT_QPA_PLATFORM'] = 'windows:darkmode=2'
@@ -39,7 +43,7 @@ logger.info(f"⚡ {APP_NAME} v{CURRENT_VERSION}")
 # --- 1. استيراد "القلب" ---
 from core.repository import Repository
 from core.event_bus import EventBus
-from core.sync_manager import SyncManager
+from core.sync_engine import SyncEngine
 
 # --- 2. استيراد "الأقسام" (العقل) ---
 from services.accounting_service import AccountingService
@@ -51,19 +55,18 @@ from services.quotation_service import QuotationService
 from services.project_service import ProjectService
 from services.settings_service import SettingsService
 from services.notification_service import NotificationService
-from services.printing_service import PrintingService
-from services.export_service import ExportService
+# ⚡ الطباعة والقوالب (Jinja / reportlab) والتصدير (pandas) بيتعملوا import أول استخدام بس
+from core.speed_optimizer import LazyService
 
 # Authentication
 from core.auth_models import AuthService, PermissionManager
 from ui.login_window import LoginWindow
 
-# Advanced Sync
-from core.advanced_sync_manager import AdvancedSyncManager
-
 # --- 3. استيراد "الواجهة" ---
 from ui.main_window import MainWindow 
 
+startup_trace.stop(_imports_step)
+
 
 class SkyWaveERPApp:
     """
@@ -76,93 +79,104 @@ class SkyWaveERPApp:
         logger.info("[MainApp] بدء تشغيل تطبيق Sky Wave ERP...")
         
         # --- 1. تجهيز "القلب" ---
-        self.repository = Repository()
+        with startup_trace.step("SettingsService"):
+            self.settings_service = SettingsService()
+        with startup_trace.step("Repository"):
+            self.repository = Repository(
+                read_policy=self.settings_service.get_setting("read_policy"),
+                max_read_lag_seconds=self.settings_service.get_setting("max_read_lag_seconds")
+            )
         self.event_bus = EventBus()
-        self.settings_service = SettingsService()
         
-        # تهيئة مدير المزامنة
-        self.sync_manager = SyncManager(self.repository)
-        self.sync_manager.load_pending_items()  # تحميل العمليات المعلقة
-        
-        # ⚡ المزامنة التلقائية (Auto Sync) - معطلة عند البدء لتجنب التجميد
-        from core.auto_sync import AutoSync
-        self.auto_sync = AutoSync(self.repository)
-        # سيتم تشغيلها يدوياً بعد فتح النافذة الرئيسية
+        # ⚡ محرك المزامنة الموحّد (outbox واحد + scheduler واحد)
+        # سيتم تشغيله بعد فتح النافذة الرئيسية لتجنب التجميد
+        with startup_trace.step("SyncEngine"):
+            self.sync_engine = SyncEngine(self.repository)
         
         logger.info("[MainApp] تم تجهيز المخزن (Repo) والإذاعة (Bus) والإعدادات.")
-        logger.info("تم تهيئة مدير المزامنة")
+        logger.info("تم تهيئة محرك المزامنة")
         logger.info("⚡ المزامنة التلقائية ستبدأ بعد فتح النافذة الرئيسية")
 
         # --- 2. تجهيز "الأقسام" (حقن الاعتمادية) ---
-        self.accounting_service = AccountingService(
-            repository=self.repository,
-            event_bus=self.event_bus
-        )
+        with startup_trace.step("services"):
+            self.accounting_service = AccountingService(
+                repository=self.repository,
+                event_bus=self.event_bus
+            )
 
-        self.client_service = ClientService(repository=self.repository)
-        self.service_service = ServiceService(
-            repository=self.repository,
-            event_bus=self.event_bus,
-            settings_service=self.settings_service
-        )
-        self.expense_service = ExpenseService(
-            repository=self.repository,
-            event_bus=self.event_bus
-        )
+            self.client_service = ClientService(repository=self.repository)
+            self.service_service = ServiceService(
+                repository=self.repository,
+                event_bus=self.event_bus,
+                settings_service=self.settings_service
+            )
+            self.expense_service = ExpenseService(
+                repository=self.repository,
+                event_bus=self.event_bus
+            )
 
-        self.invoice_service = InvoiceService(
-            repository=self.repository,
-            event_bus=self.event_bus
-        )
+            self.invoice_service = InvoiceService(
+                repository=self.repository,
+                event_bus=self.event_bus
+            )
 
-        self.project_service = ProjectService(
-            repository=self.repository,
-            event_bus=self.event_bus,
-            accounting_service=self.accounting_service,
-            settings_service=self.settings_service
-        )
+            self.project_service = ProjectService(
+                repository=self.repository,
+                event_bus=self.event_bus,
+                accounting_service=self.accounting_service,
+                settings_service=self.settings_service
+            )
 
-        self.quotation_service = QuotationService(
-            repository=self.repository,
-            event_bus=self.event_bus,
-            project_service=self.project_service
-        )
+            self.quotation_service = QuotationService(
+                repository=self.repository,
+                event_bus=self.event_bus,
+                project_service=self.project_service
+            )
 
-        self.notification_service = NotificationService(
-            repository=self.repository, event_bus=self.event_bus
-        )
+            self.notification_service = NotificationService(
+                repository=self.repository, event_bus=self.event_bus
+            )
 
-        # Template Service (for invoice templates)
+        # ⚡ الخدمات التقيلة بتتعمل أول ما تتستخدم (مش قبل الـ login)
+        self.template_service = LazyService("TemplateService", self._create_template_service)
+        self.printing_service = LazyService("PrintingService", self._create_printing_service)
+        self.export_service = LazyService("ExportService", self._create_export_service)
+
+        # Authentication Service (نافذة الدخول محتاجاه على طول)
+        with startup_trace.step("AuthService"):
+            self.auth_service = AuthService(repository=self.repository)
+        
+        # ⚡ التحقق من التحديثات عند بدء البرنامج
+        with startup_trace.step("update check"):
+            try:
+                from auto_updater import check_for_updates
+                has_update, latest_version, download_url, changelog = check_for_updates()
+                if has_update:
+                    logger.info(f"🆕 تحديث جديد متوفر: v{latest_version}")
+            except Exception as e:
+                logger.warning(f"فشل التحقق من التحديثات: {e}")
+
+        logger.info("[MainApp] تم تجهيز كل الأقسام (Services).")
+        logger.info("تم تهيئة خدمة الإشعارات والمصادقة (الطباعة والقوالب والتصدير عند أول استخدام)")
+
+    def _create_template_service(self):
+        """Template Service (for invoice templates) - Jinja2 + جدول القوالب"""
         from services.template_service import TemplateService
-        self.template_service = TemplateService(
+        return TemplateService(
             repository=self.repository,
             settings_service=self.settings_service
         )
-        
-        self.printing_service = PrintingService(
+
+    def _create_printing_service(self):
+        from services.printing_service import PrintingService
+        return PrintingService(
             settings_service=self.settings_service,
             template_service=self.template_service  # ✅ تمرير template_service
         )
 
-        self.export_service = ExportService()
-
-        # Authentication Service
-        self.auth_service = AuthService(repository=self.repository)
-        
-        # Advanced Sync Manager
-        self.advanced_sync_manager = AdvancedSyncManager(repository=self.repository)
-        
-        # ⚡ التحقق من التحديثات عند بدء البرنامج
-        try:
-            from auto_updater import check_for_updates
-            has_update, latest_version, download_url, changelog = check_for_updates()
-            if has_update:
-                logger.info(f"🆕 تحديث جديد متوفر: v{latest_version}")
-        except Exception as e:
-            logger.warning(f"فشل التحقق من التحديثات: {e}")
-
-        logger.info("[MainApp] تم تجهيز كل الأقسام (Services).")
-        logger.info("تم تهيئة خدمة الإشعارات والطباعة والمصادقة")
+    def _create_export_service(self):
+        from services.export_service import ExportService
+        return ExportService()
 
     def run(self):
         """
@@ -173,7 +187,8 @@ class SkyWaveERPApp:
         if os.name == 'nt':  # Windows
             os.environ['QT_QPA_PLATFORM'] = 'windows:darkmode=2'
         
-        app = QApplication(sys.argv)
+        with startup_trace.step("QApplication"):
+            app = QApplication(sys.argv)
         
         # === إخفاء كل النوافذ حتى نعرض الـ splash ===
         app.setQuitOnLastWindowClosed(False)
@@ -281,7 +296,8 @@ class SkyWaveERPApp:
         splash.show_message("🔐 جاري تحميل نافذة تسجيل الدخول...")
         app.processEvents()
         
-        login_window = LoginWindow(self.auth_service)
+        with startup_trace.step("LoginWindow"):
+            login_window = LoginWindow(self.auth_service)
         login_window.setWindowFlags(login_window.windowFlags() | Qt.WindowType.WindowStaysOnTopHint)
         
         # إخفاء الشاشة السوداء
@@ -290,6 +306,7 @@ class SkyWaveERPApp:
         splash.finish(login_window)  # إغلاق الشاشة عند ظهور تسجيل الدخول
         login_window.raise_()
         login_window.activateWindow()
+        startup_trace.mark("login shown")
         
         if login_window.exec() != QDialog.DialogCode.Accepted:
             logger.info("[MainApp] تم إلغاء تسجيل الدخول. إغلاق التطبيق.")
@@ -333,22 +350,24 @@ class SkyWaveERPApp:
         splash.show_message("🏗️ جاري بناء الواجهة الرئيسية...")
         app.processEvents()
         
-        main_window = MainWindow(
-            current_user=current_user,
-            settings_service=self.settings_service,
-            accounting_service=self.accounting_service,
-            client_service=self.client_service,
-            service_service=self.service_service,
-            expense_service=self.expense_service,
-            invoice_service=self.invoice_service,
-            quotation_service=self.quotation_service,
-            project_service=self.project_service,
-            sync_manager=self.sync_manager,
-            notification_service=self.notification_service,
-            printing_service=self.printing_service,
-            export_service=self.export_service,
-            advanced_sync_manager=self.advanced_sync_manager
-        )
+        startup_trace.mark("login accepted")
+        with startup_trace.step("MainWindow"):
+            main_window = MainWindow(
+                current_user=current_user,
+                settings_service=self.settings_service,
+                accounting_service=self.accounting_service,
+                client_service=self.client_service,
+                service_service=self.service_service,
+                expense_service=self.expense_service,
+                invoice_service=self.invoice_service,
+                quotation_service=self.quotation_service,
+                project_service=self.project_service,
+                sync_engine=self.sync_engine,
+                notification_service=self.notification_service,
+                printing_service=self.printing_service,
+                export_service=self.export_service,
+                template_service=self.template_service
+            )
         
         # === عرض النافذة الرئيسية ===
         splash.show_message("✅ جاري فتح البرنامج...")
@@ -369,13 +388,14 @@ class SkyWaveERPApp:
         
         # إغلاق splash بعد ظهور النافذة
         splash.finish(main_window)
+        startup_trace.mark("main window shown")
         
         # تطبيق التوسيط على كل الجداول
         from ui.styles import apply_center_alignment_to_all_tables
         apply_center_alignment_to_all_tables(main_window)
         
         # ⚡ تفعيل المزامنة التلقائية لجلب البيانات من السيرفر
-        QTimer.singleShot(2000, lambda: self.auto_sync.start_auto_sync(delay_seconds=1))
+        QTimer.singleShot(2000, lambda: self.sync_engine.start(delay_seconds=1))
         logger.info("[MainApp] تم تفعيل المزامنة التلقائية")
         
         # ⚡ تفعيل التحديث التلقائي في الخلفية
@@ -389,6 +409,7 @@ class SkyWaveERPApp:
         app.setQuitOnLastWindowClosed(True)
         
         logger.info("[MainApp] البرنامج يعمل الآن.")
+        startup_trace.report()
         
         # تشغيل التطبيق
         exit_code = app.exec()
@@ -424,13 +445,13 @@ class SkyWaveERPApp:
         logger.info("[MainApp] جاري تنظيف الموارد قبل الإغلاق...")
         
         try:
-            # إيقاف المزامنة التلقائية
-            if hasattr(self, 'auto_sync') and self.auto_sync:
+            # إيقاف محرك المزامنة
+            if hasattr(self, 'sync_engine') and self.sync_engine:
                 try:
-                    self.auto_sync.stop_auto_sync()
-                    logger.info("[MainApp] تم إيقاف المزامنة التلقائية")
+                    self.sync_engine.stop()
+                    logger.info("[MainApp] تم إيقاف محرك المزامنة")
                 except Exception as e:
-                    logger.warning(f"[MainApp] فشل إيقاف المزامنة التلقائية: {e}")
+                    logger.warning(f"[MainApp] فشل إيقاف محرك المزامنة: {e}")
             
             # إيقاف خدمة التحديث التلقائي
             if hasattr(self, 'auto_update_service') and self.auto_update_service:
@@ -440,6 +461,13 @@ class SkyWaveERPApp:
                 except Exception as e:
                     logger.warning(f"[MainApp] فشل إيقاف خدمة التحديث: {e}")
             
+            # ⚡ إلغاء تحميلات الشاشات الشغالة في الخلفية قبل قفل قاعدة البيانات
+            try:
+                from core.data_loader import data_loader
+                data_loader.shutdown()
+            except Exception as e:
+                logger.warning(f"[MainApp] فشل إيقاف تحميل البيانات في الخلفية: {e}")
+            
             # إغلاق اتصال قاعدة البيانات
             if hasattr(self, 'repository') and self.repository:
                 try:
@@ -451,15 +479,6 @@ class SkyWaveERPApp:
                 except Exception as e:
                     logger.warning(f"[MainApp] فشل إغلاق قاعدة البيانات: {e}")
             
-            # إيقاف مدير المزامنة المتقدم
-            if hasattr(self, 'advanced_sync_manager') and self.advanced_sync_manager:
-                try:
-                    if hasattr(self.advanced_sync_manager, 'stop'):
-                        self.advanced_sync_manager.stop()
-                    logger.info("[MainApp] تم إيقاف مدير المزامنة المتقدم")
-                except Exception as e:
-                    logger.warning(f"[MainApp] فشل إيقاف مدير المزامنة المتقدم: {e}")
-            
             logger.info("[MainApp] ✅ تم تنظيف جميع الموارد بنجاح")
             
         except Exception as e:
@@ -4,6 +4,7 @@ from core.repository import Repository
 from core.event_bus import EventBus
 from core import schemas
 from core.signals import app_signals
+from core.data_loader import CancellationToken, LoadCancelled
 from core.logger import get_logger
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
@@ -57,28 +58,50 @@ class AccountingService:
         self.bus.subscribe('PROJECT_EDITED', self.handle_edited_project)  # ✅ تعديل المشروع
         logger.info("[AccountingService] تم الاشتراك في جميع الأحداث المالية")
 
+    def _fail_in_unit_of_work(self, message: str):
+        """
+        ⚡ جوه repo.unit_of_work فشل القيد أو الرصيد بيطلع exception عشان الـ transaction كله
+        يرجع (مفيش مشروع/دفعة/مصروف بيتثبت من غير قيده). برا الـ unit_of_work بيتسجل بس زي الأول
+        """
+        if self.repo.in_unit_of_work:
+            raise RuntimeError(message)
+
     def get_all_journal_entries(self) -> List[schemas.JournalEntry]:
         """
         جلب كل قيود اليومية
         
         Returns:
-            قائمة بجميع قيود اليومية
+            قائمة بجميع قيود اليومية (الأحدث أولاً)
         """
         try:
-            return self.repo.get_all_journal_entries()
+            # ⚡ نفس الـ stream المفلتر اللي بيستخدمه الأستاذ والتقارير (مرتب تصاعدياً)
+            entries = list(self.repo.get_journal_entries())
+            entries.reverse()
+            return entries
         except Exception as e:
             logger.error(f"[AccountingService] فشل جلب قيود اليومية: {e}", exc_info=True)
             return []
 
-    def get_hierarchy_with_balances(self) -> Dict[str, dict]:
+    @staticmethod
+    def _signed_balance(account_type, debit: float, credit: float) -> float:
+        """رصيد الحساب من حركاته: الأصول والمصروفات مدين - دائن، والباقي دائن - مدين"""
+        if account_type in (schemas.AccountType.ASSET, schemas.AccountType.CASH, schemas.AccountType.EXPENSE):
+            return debit - credit
+        return credit - debit
+
+    def get_hierarchy_with_balances(self, cancel_token: Optional[CancellationToken] = None) -> Dict[str, dict]:
         """
         جلب شجرة الحسابات مع حساب الأرصدة التراكمية للمجموعات
         
         هذه الدالة تحسب أرصدة الحسابات من القيود المحاسبية (الطريقة الصحيحة)
         ثم تجمع أرصدة الحسابات الفرعية للمجموعات بشكل تكراري
         
+        Args:
+            cancel_token: ⚡ لو شغالة في الخلفية (data_loader) - بتقف بين المراحل لو الطلب اتلغى
+        
         Returns:
-            Dict[code, {obj: Account, total: float, children: []}]
+            Dict[code, {obj: Account, debit, credit, balance (حركات الحساب نفسه من account_balances),
+                        total: float (تراكمي للمجموعات), children: []}]
         """
         print("INFO: [AccountingService] جاري حساب الأرصدة التراكمية للشجرة...")
         
@@ -89,75 +112,50 @@ class AccountingService:
                 print("WARNING: [AccountingService] لا توجد حسابات")
                 return {}
             
-            # ⚡ منع التجميد - معالجة الأحداث كل 50 حساب
-            try:
-                from PyQt6.QtWidgets import QApplication
-                process_events = lambda: QApplication.processEvents()
-            except Exception:
-                process_events = lambda: None
-            
-            # 1. حساب الأرصدة من القيود المحاسبية
-            account_movements = {}  # {code: {'debit': 0, 'credit': 0}}
+            # ⚡ الإلغاء بيتفحص بين المراحل (بدل processEvents - الدالة بتشتغل في الخلفية)
+            def check_cancelled():
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
             
-            # إنشاء قاموس لربط account_id بـ account_code
+            # 1. ⚡ حركات الحسابات من account_balances (صف لكل حساب بدل المرور على كل أسطر القيود)
+            # المفتاح في الجدول ممكن يكون account_code أو account_id (_mongo_id / id)
             account_id_to_code = {}
             for acc in accounts:
                 if acc.code:
-                    # ربط بالـ _mongo_id
-                    if hasattr(acc, '_mongo_id') and acc._mongo_id:
+                    if acc._mongo_id:
                         account_id_to_code[str(acc._mongo_id)] = acc.code
-                    # ربط بالـ id
-                    if hasattr(acc, 'id') and acc.id:
+                    if acc.id:
                         account_id_to_code[str(acc.id)] = acc.code
-                    # ربط بالكود نفسه
                     account_id_to_code[acc.code] = acc.code
+
+            account_movements: Dict[str, Dict[str, float]] = {}  # {code: {'debit', 'credit'}}
+            for key, totals in self.repo.get_account_balances().items():
+                code = account_id_to_code.get(str(key))
+                if not code:
+                    continue
+                movement = account_movements.setdefault(code, {'debit': 0.0, 'credit': 0.0})
+                movement['debit'] += totals['debit']
+                movement['credit'] += totals['credit']
+
+            check_cancelled()
             
-            try:
-                # جلب القيود بالطريقة العادية (أكثر موثوقية)
-                journal_entries = self.repo.get_all_journal_entries()
-                print(f"DEBUG: [AccountingService] تم جلب {len(journal_entries)} قيد محاسبي")
-                
-                for entry in journal_entries:
-                    for line in entry.lines:
-                        # محاولة الحصول على الكود من account_code أو account_id
-                        code = getattr(line, 'account_code', None)
-                        if not code:
-                            # محاولة الحصول على الكود من account_id
-                            acc_id = getattr(line, 'account_id', None)
-                            if acc_id:
-                                code = account_id_to_code.get(str(acc_id))
-                        
-                        if not code:
-                            continue
-                            
-                        if code not in account_movements:
-                            account_movements[code] = {'debit': 0.0, 'credit': 0.0}
-                        account_movements[code]['debit'] += getattr(line, 'debit', 0) or 0.0
-                        account_movements[code]['credit'] += getattr(line, 'credit', 0) or 0.0
-                
-                print(f"DEBUG: [AccountingService] تم حساب حركات {len(account_movements)} حساب")
-                for code, mov in list(account_movements.items())[:5]:
-                    print(f"  - {code}: مدين={mov['debit']}, دائن={mov['credit']}")
-                    
-            except Exception as e:
-                print(f"ERROR: [AccountingService] فشل جلب القيود: {e}")
-                import traceback
-                traceback.print_exc()
-            
-            process_events()
-            
-            # 2. إنشاء قاموس للوصول السريع O(1)
+            # 2. إنشاء قاموس للوصول السريع O(1) - مدين/دائن/رصيد كل حساب من حركاته
             tree_map: Dict[str, dict] = {}
             for acc in accounts:
                 if acc.code:
+                    movement = account_movements.get(acc.code, {'debit': 0.0, 'credit': 0.0})
+                    balance = self._signed_balance(acc.type, movement['debit'], movement['credit'])
                     tree_map[acc.code] = {
                         'obj': acc,
-                        'total': 0.0,
+                        'debit': movement['debit'],
+                        'credit': movement['credit'],
+                        'balance': balance,
+                        'total': balance,
                         'children': [],
                         'is_group': getattr(acc, 'is_group', False)
                     }
             
-            # 3. بناء هيكل الشجرة وحساب الأرصدة من القيود
+            # 3. بناء هيكل الشجرة
             def get_parent_code_from_code(code: str) -> str:
                 """استنتاج كود الأب من كود الحساب تلقائياً"""
                 if not code or len(code) < 4:
@@ -170,17 +168,6 @@ class AccountingService:
                     # حساب فرعي مثل 1101 -> 1100
                     return code[:2] + '00'
             
-            for acc in accounts:
-                if not acc.code:
-                    continue
-                    
-                node = tree_map[acc.code]
-                
-                # استخدام الرصيد المخزن في الحساب مباشرة (بدون حساب من القيود)
-                # لأن القيود تُنشأ عند تسجيل الدفعات وتُحدث الرصيد تلقائياً
-                opening_balance = getattr(acc, 'balance', 0.0) or 0.0
-                node['total'] = opening_balance
-            
             # ربط الحسابات بالآباء تلقائياً بناءً على الكود
             for acc in accounts:
                 if not acc.code or acc.code.endswith('000'):
@@ -192,15 +179,8 @@ class AccountingService:
                 # التحقق من وجود الأب في الشجرة
                 if parent_code and parent_code in tree_map and parent_code != acc.code:
                     tree_map[parent_code]['children'].append(tree_map[acc.code])
-                    print(f"DEBUG: ربط {acc.code} -> {parent_code}")
             
-            # طباعة الأبناء لكل حساب رئيسي
-            for code in ['1000', '1100', '2000', '3000', '4000', '5000']:
-                if code in tree_map:
-                    children = [c['obj'].code for c in tree_map[code]['children']]
-                    print(f"DEBUG: {code} أبناؤه: {children}")
-            
-            process_events()
+            check_cancelled()
             
             # 4. حساب الأرصدة التراكمية للمجموعات (من الأوراق للجذور)
             def calculate_total(node: dict) -> float:
@@ -219,7 +199,7 @@ class AccountingService:
                 if code in tree_map:
                     calculate_total(tree_map[code])
             
-            process_events()
+            check_cancelled()
             
             # طباعة ملخص للتأكد
             print(f"INFO: [AccountingService] تم حساب أرصدة {len(tree_map)} حساب")
@@ -229,6 +209,8 @@ class AccountingService:
             
             return tree_map
             
+        except LoadCancelled:
+            raise
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل حساب الأرصدة التراكمية: {e}")
             import traceback
@@ -347,11 +329,14 @@ class AccountingService:
                 print(f"SUCCESS: [AccountingService] تم إنشاء قيد اليومية للمشروع {project.name}")
             else:
                 print(f"ERROR: [AccountingService] فشل إنشاء قيد اليومية للمشروع {project.name}")
+                self._fail_in_unit_of_work(f"فشل إنشاء قيد اليومية للمشروع {project.name}")
 
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل معالجة المشروع {project.name}: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_edited_project(self, data: dict):
         """
@@ -470,11 +455,14 @@ class AccountingService:
                 print(f"SUCCESS: [AccountingService] تم إنشاء قيد اليومية للمصروف {expense.category}")
             else:
                 print(f"ERROR: [AccountingService] فشل إنشاء قيد اليومية للمصروف {expense.category}")
+                self._fail_in_unit_of_work(f"فشل إنشاء قيد اليومية للمصروف {expense.category}")
 
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل معالجة المصروف: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_updated_expense(self, data):
         """
@@ -509,6 +497,7 @@ class AccountingService:
             
             if not expense_account or not payment_account:
                 print(f"ERROR: [AccountingService] لم يتم العثور على الحسابات المطلوبة")
+                self._fail_in_unit_of_work("لم يتم العثور على الحسابات المطلوبة")
                 return
             
             new_lines = [
@@ -540,11 +529,14 @@ class AccountingService:
                 print(f"SUCCESS: [AccountingService] تم تحديث القيد المحاسبي للمصروف")
             else:
                 print(f"WARNING: [AccountingService] فشل تحديث القيد للمصروف")
+                self._fail_in_unit_of_work("فشل تحديث القيد للمصروف")
                 
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل تعديل قيد المصروف: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_deleted_expense(self, data: dict):
         """
@@ -593,6 +585,8 @@ class AccountingService:
             print(f"ERROR: [AccountingService] فشل إنشاء القيد العكسي للمصروف: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_new_payment(self, data: dict):
         """
@@ -641,11 +635,14 @@ class AccountingService:
                 print(f"SUCCESS: [AccountingService] تم إنشاء قيد اليومية للدفعة {payment.amount} جنيه")
             else:
                 print(f"ERROR: [AccountingService] فشل إنشاء قيد اليومية للدفعة")
+                self._fail_in_unit_of_work("فشل إنشاء قيد اليومية للدفعة")
 
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل معالجة الدفعة: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_updated_payment(self, data: dict):
         """
@@ -674,6 +671,7 @@ class AccountingService:
             
             if not receiving_account or not client_account:
                 print(f"ERROR: [AccountingService] لم يتم العثور على الحسابات المطلوبة")
+                self._fail_in_unit_of_work("لم يتم العثور على الحسابات المطلوبة")
                 return
             
             new_lines = [
@@ -705,11 +703,14 @@ class AccountingService:
                 print(f"SUCCESS: [AccountingService] تم تحديث القيد المحاسبي للدفعة")
             else:
                 print(f"WARNING: [AccountingService] فشل تحديث القيد للدفعة")
+                self._fail_in_unit_of_work("فشل تحديث القيد للدفعة")
                 
         except Exception as e:
             print(f"ERROR: [AccountingService] فشل تعديل قيد الدفعة: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def handle_deleted_payment(self, data: dict):
         """
@@ -760,6 +761,8 @@ class AccountingService:
             print(f"ERROR: [AccountingService] فشل إنشاء القيد العكسي للدفعة: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
 
     def _update_account_balance(self, account, amount: float, is_debit: bool):
         """تحديث رصيد الحساب"""
@@ -774,10 +777,13 @@ class AccountingService:
                 new_balance = account.balance - amount if is_debit else account.balance + amount
             
             account_id = account._mongo_id or str(account.id)
-            self.repo.update_account(account_id, account.model_copy(update={"balance": new_balance}))
+            if self.repo.update_account(account_id, account.model_copy(update={"balance": new_balance})) is None:
+                self._fail_in_unit_of_work(f"فشل تحديث رصيد الحساب {account.code}")
             print(f"INFO: [AccountingService] تم تحديث رصيد {account.name}: {new_balance}")
         except Exception as e:
             print(f"WARNING: [AccountingService] فشل تحديث رصيد الحساب: {e}")
+            if self.repo.in_unit_of_work:
+                raise
 
     def get_profit_and_loss(self, start_date: datetime, end_date: datetime) -> Dict:
         """حساب تقرير الأرباح والخسائر لفترة محددة مع التفاصيل"""
@@ -797,36 +803,29 @@ class AccountingService:
             for acc in all_accounts:
                 account_info[acc.code] = {"type": acc.type, "name": acc.name, "code": acc.code}
 
-            all_entries = self.repo.get_all_journal_entries()
+            # ⚡ فلترة الفترة على السيرفر/SQLite بدل جلب كل القيود
+            for entry in self.repo.get_journal_entries(start_date, end_date):
+                for line in entry.lines:
+                    acc_id = str(line.account_id)
+                    acc_data = account_info.get(acc_id)
+                    
+                    if not acc_data:
+                        continue
+
+                    acc_type = acc_data["type"]
+                    acc_name = acc_data["name"]
 
-            for entry in all_entries:
-                entry_date = entry.date
-                if hasattr(entry_date, 'replace'):
-                    # تأكد من أن التاريخ بدون timezone
-                    pass
-                
-                if start_date <= entry_date <= end_date:
-                    for line in entry.lines:
-                        acc_id = str(line.account_id)
-                        acc_data = account_info.get(acc_id)
+                    if acc_type == schemas.AccountType.REVENUE:
+                        total_revenue += line.credit
+                        if acc_name not in revenue_breakdown:
+                            revenue_breakdown[acc_name] = 0.0
+                        revenue_breakdown[acc_name] += line.credit
                         
-                        if not acc_data:
-                            continue
-
-                        acc_type = acc_data["type"]
-                        acc_name = acc_data["name"]
-
-                        if acc_type == schemas.AccountType.REVENUE:
-                            total_revenue += line.credit
-                            if acc_name not in revenue_breakdown:
-                                revenue_breakdown[acc_name] = 0.0
-                            revenue_breakdown[acc_name] += line.credit
-                            
-                        elif acc_type == schemas.AccountType.EXPENSE:
-                            total_expenses += line.debit
-                            if acc_name not in expense_breakdown:
-                                expense_breakdown[acc_name] = 0.0
-                            expense_breakdown[acc_name] += line.debit
+                    elif acc_type == schemas.AccountType.EXPENSE:
+                        total_expenses += line.debit
+                        if acc_name not in expense_breakdown:
+                            expense_breakdown[acc_name] = 0.0
+                        expense_breakdown[acc_name] += line.debit
 
             net_profit = total_revenue - total_expenses
 
@@ -1212,10 +1211,12 @@ class AccountingService:
             
             if not debit_account:
                 print(f"ERROR: [AccountingService] الحساب المدين {debit_account_code} غير موجود!")
+                self._fail_in_unit_of_work(f"الحساب المدين {debit_account_code} غير موجود")
                 return False
             
             if not credit_account:
                 print(f"ERROR: [AccountingService] الحساب الدائن {credit_account_code} غير موجود!")
+                self._fail_in_unit_of_work(f"الحساب الدائن {credit_account_code} غير موجود")
                 return False
             
             print(f"INFO: [AccountingService] الحسابات موجودة: {debit_account.name} | {credit_account.name}")
@@ -1260,6 +1261,8 @@ class AccountingService:
             print(f"ERROR: [AccountingService] فشل إنشاء القيد: {e}")
             import traceback
             traceback.print_exc()
+            if self.repo.in_unit_of_work:
+                raise
             return False
     
     def create_transaction(
@@ -1361,35 +1364,11 @@ class AccountingService:
                 print(f"ERROR: الحساب {account_id} غير موجود")
                 return []
             
-            # جلب جميع قيود اليومية في الفترة المحددة
-            all_entries = self.repo.get_all_journal_entries()
-            
-            ledger_transactions = []
-            
-            for entry in all_entries:
-                # التحقق من التاريخ
-                entry_date = entry.date
-                if not (start_date <= entry_date <= end_date):
-                    continue
-                
-                # البحث عن الأسطر المتعلقة بهذا الحساب
-                for line in entry.lines:
-                    # مقارنة بالـ ID أو الكود
-                    line_account_id = str(line.account_id)
-                    account_match = (
-                        line_account_id == str(account._mongo_id) or
-                        line_account_id == str(account.id) or
-                        line_account_id == account.code
-                    )
-                    
-                    if account_match:
-                        ledger_transactions.append({
-                            'date': entry_date,
-                            'description': line.description or entry.description,
-                            'reference': entry.related_document_id or '-',
-                            'debit': line.debit,
-                            'credit': line.credit,
-                        })
+            # ⚡ query واحد على journal_lines بالكود/الـ IDs والفترة (بدل فك كل القيود)
+            account_keys = {account.code, str(account.id) if account.id else None, account._mongo_id}
+            ledger_transactions = self.repo.get_account_ledger_lines(
+                [key for key in account_keys if key], start_date, end_date
+            )
             
             # ترتيب حسب التاريخ
             ledger_transactions.sort(key=lambda x: x['date'])
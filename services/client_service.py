@@ -221,21 +221,10 @@ class ClientService:
             return []
         
         search_fields = fields or ["name", "company_name", "phone", "email"]
-        query_lower = query.lower()
         
         try:
-            all_clients = self.repo.get_all_clients()
-            results = []
-            
-            for client in all_clients:
-                for field in search_fields:
-                    value = getattr(client, field, None)
-                    if value and query_lower in str(value).lower():
-                        results.append(client)
-                        break
-                
-                if len(results) >= limit:
-                    break
+            # ⚡ من الأعمدة المتوحدة في SQLite (همزات / تاء مربوطة / تشكيل / أرقام عربي / +20)
+            results = self.repo.search_clients(query, search_fields, limit)
             
             logger.debug(f"[ClientService] تم العثور على {len(results)} عميل للبحث: {query}")
             return results
@@ -48,15 +48,18 @@ class ExpenseService:
         self.bus = event_bus
         logger.info("قسم المصروفات (ExpenseService) جاهز")
 
-    def get_all_expenses(self) -> List[schemas.Expense]:
+    def get_all_expenses(self, as_views: bool = False) -> List[schemas.Expense]:
         """
         جلب كل المصروفات
         
+        Args:
+            as_views: ⚡ row views خفيفة للقراءة بس (لشاشة القوائم)
+
         Returns:
             قائمة بجميع المصروفات
         """
         try:
-            return self.repo.get_all_expenses()
+            return self.repo.get_all_expenses(as_views=as_views)
         except Exception as e:
             logger.error(f"[ExpenseService] فشل جلب المصروفات: {e}", exc_info=True)
             return []
@@ -90,11 +93,13 @@ class ExpenseService:
             raise ValueError("يجب تحديد حساب الدفع (payment_account_id)")
         
         try:
-            # حفظ المصروف
-            created_expense = self.repo.create_expense(expense_data)
-            
-            # نشر الحدث للمحاسبة (سيتم التعامل معه في accounting_service)
-            self.bus.publish('EXPENSE_CREATED', {'expense': created_expense})
+            # ⚡ المصروف + قيده المحاسبي في transaction واحد
+            with self.repo.unit_of_work():
+                # حفظ المصروف
+                created_expense = self.repo.create_expense(expense_data)
+                
+                # نشر الحدث للمحاسبة (سيتم التعامل معه في accounting_service)
+                self.bus.publish('EXPENSE_CREATED', {'expense': created_expense}, raise_errors=True)
             
             # إرسال إشارة التحديث العامة
             app_signals.emit_data_changed('expenses')
@@ -122,9 +127,11 @@ class ExpenseService:
         """
         logger.info(f"[ExpenseService] استلام طلب تعديل مصروف: {expense_data.category}")
         try:
-            result = self.repo.update_expense(expense_id, expense_data)
+            with self.repo.unit_of_work():
+                result = self.repo.update_expense(expense_id, expense_data)
+                if result:
+                    self.bus.publish('EXPENSE_UPDATED', expense_data, raise_errors=True)
             if result:
-                self.bus.publish('EXPENSE_UPDATED', expense_data)
                 # ⚡ إرسال إشارة التحديث
                 app_signals.emit_data_changed('expenses')
                 logger.info("[ExpenseService] تم تعديل المصروف بنجاح")
@@ -148,9 +155,11 @@ class ExpenseService:
         """
         logger.info(f"[ExpenseService] استلام طلب حذف مصروف: {expense_id}")
         try:
-            result = self.repo.delete_expense(expense_id)
+            with self.repo.unit_of_work():
+                result = self.repo.delete_expense(expense_id)
+                if result:
+                    self.bus.publish('EXPENSE_DELETED', {'id': expense_id}, raise_errors=True)
             if result:
-                self.bus.publish('EXPENSE_DELETED', {'id': expense_id})
                 # ⚡ إرسال إشارة التحديث
                 app_signals.emit_data_changed('expenses')
                 logger.info("[ExpenseService] تم حذف المصروف بنجاح")
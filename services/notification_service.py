@@ -125,29 +125,27 @@ class NotificationService:
         try:
             now = datetime.now().isoformat()
             
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                INSERT INTO notifications (
-                    sync_status, created_at, last_modified,
-                    title, message, type, priority, is_read,
-                    related_entity_type, related_entity_id,
-                    action_url, expires_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                'new_offline', now, now,
-                notification.title,
-                notification.message,
-                notification.type.value,
-                notification.priority.value,
-                0,  # is_read = False
-                notification.related_entity_type,
-                notification.related_entity_id,
-                notification.action_url,
-                notification.expires_at.isoformat() if notification.expires_at else None
-            ))
-            
-            self.repo.sqlite_conn.commit()
-            notification.id = cursor.lastrowid
+            with self.repo._local_transaction() as cursor:
+                cursor.execute("""
+                    INSERT INTO notifications (
+                        sync_status, created_at, last_modified,
+                        title, message, type, priority, is_read,
+                        related_entity_type, related_entity_id,
+                        action_url, expires_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    'new_offline', now, now,
+                    notification.title,
+                    notification.message,
+                    notification.type.value,
+                    notification.priority.value,
+                    0,  # is_read = False
+                    notification.related_entity_type,
+                    notification.related_entity_id,
+                    notification.action_url,
+                    notification.expires_at.isoformat() if notification.expires_at else None
+                ))
+                notification.id = cursor.lastrowid
             
             # محاولة الحفظ في MongoDB
             if self.repo.online:
@@ -157,11 +155,11 @@ class NotificationService:
                     
                     # تحديث _mongo_id
                     mongo_id = str(result.inserted_id)
-                    cursor.execute(
-                        "UPDATE notifications SET _mongo_id = ?, sync_status = 'synced' WHERE id = ?",
-                        (mongo_id, notification.id)
-                    )
-                    self.repo.sqlite_conn.commit()
+                    with self.repo._local_transaction() as cursor:
+                        cursor.execute(
+                            "UPDATE notifications SET _mongo_id = ?, sync_status = 'synced' WHERE id = ?",
+                            (mongo_id, notification.id)
+                        )
                 except Exception as e:
                     logger.warning(f"فشل حفظ الإشعار في MongoDB: {e}")
             
@@ -182,16 +180,15 @@ class NotificationService:
             قائمة الإشعارات غير المقروءة
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                SELECT * FROM notifications 
-                WHERE is_read = 0 
-                AND (expires_at IS NULL OR expires_at > ?)
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (datetime.now().isoformat(), limit))
-            
-            rows = cursor.fetchall()
+            with self.repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT * FROM notifications 
+                    WHERE is_read = 0 
+                    AND (expires_at IS NULL OR expires_at > ?)
+                    ORDER BY created_at DESC 
+                    LIMIT ?
+                """, (datetime.now().isoformat(), limit))
+                rows = cursor.fetchall()
             notifications = []
             
             for row in rows:
@@ -216,15 +213,14 @@ class NotificationService:
             قائمة جميع الإشعارات
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                SELECT * FROM notifications 
-                WHERE (expires_at IS NULL OR expires_at > ?)
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (datetime.now().isoformat(), limit))
-            
-            rows = cursor.fetchall()
+            with self.repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT * FROM notifications 
+                    WHERE (expires_at IS NULL OR expires_at > ?)
+                    ORDER BY created_at DESC 
+                    LIMIT ?
+                """, (datetime.now().isoformat(), limit))
+                rows = cursor.fetchall()
             notifications = []
             
             for row in rows:
@@ -249,14 +245,13 @@ class NotificationService:
             قائمة آخر الأنشطة
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                SELECT * FROM notifications 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            rows = cursor.fetchall()
+            with self.repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT * FROM notifications 
+                    ORDER BY created_at DESC 
+                    LIMIT ?
+                """, (limit,))
+                rows = cursor.fetchall()
             activities = []
             
             for row in rows:
@@ -282,26 +277,24 @@ class NotificationService:
             True إذا نجحت العملية
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                UPDATE notifications 
-                SET is_read = 1, last_modified = ?
-                WHERE id = ?
-            """, (datetime.now().isoformat(), notification_id))
-            
-            self.repo.sqlite_conn.commit()
+            now = datetime.now()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute("""
+                    UPDATE notifications 
+                    SET is_read = 1, last_modified = ?
+                    WHERE id = ?
+                """, (now.isoformat(), notification_id))
+                cursor.execute("SELECT _mongo_id FROM notifications WHERE id = ?", (notification_id,))
+                row = cursor.fetchone()
             
             # محاولة التحديث في MongoDB
             if self.repo.online:
                 try:
-                    cursor.execute("SELECT _mongo_id FROM notifications WHERE id = ?", (notification_id,))
-                    row = cursor.fetchone()
-                    
                     if row and row['_mongo_id']:
                         from bson import ObjectId
                         self.repo.mongo_db.notifications.update_one(
                             {'_id': ObjectId(row['_mongo_id'])},
-                            {'$set': {'is_read': True}}
+                            {'$set': {'is_read': True, 'last_modified': now}}
                         )
                 except Exception as e:
                     logger.warning(f"فشل تحديث الإشعار في MongoDB: {e}")
@@ -321,21 +314,20 @@ class NotificationService:
             True إذا نجحت العملية
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                UPDATE notifications 
-                SET is_read = 1, last_modified = ?
-                WHERE is_read = 0
-            """, (datetime.now().isoformat(),))
-            
-            self.repo.sqlite_conn.commit()
+            now = datetime.now()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute("""
+                    UPDATE notifications 
+                    SET is_read = 1, last_modified = ?
+                    WHERE is_read = 0
+                """, (now.isoformat(),))
             
             # محاولة التحديث في MongoDB
             if self.repo.online:
                 try:
                     self.repo.mongo_db.notifications.update_many(
                         {'is_read': False},
-                        {'$set': {'is_read': True}}
+                        {'$set': {'is_read': True, 'last_modified': now}}
                     )
                 except Exception as e:
                     logger.warning(f"فشل تحديث الإشعارات في MongoDB: {e}")
@@ -358,22 +350,19 @@ class NotificationService:
             True إذا نجحت العملية
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            
-            # الحصول على _mongo_id قبل الحذف
-            cursor.execute("SELECT _mongo_id FROM notifications WHERE id = ?", (notification_id,))
-            row = cursor.fetchone()
-            
-            # حذف من SQLite
-            cursor.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                # الحصول على _mongo_id قبل الحذف
+                cursor.execute("SELECT _mongo_id FROM notifications WHERE id = ?", (notification_id,))
+                row = cursor.fetchone()
+                
+                # حذف من SQLite
+                cursor.execute("DELETE FROM notifications WHERE id = ?", (notification_id,))
             
             # محاولة الحذف من MongoDB
-            if self.repo.online and row and row['_mongo_id']:
+            if self.repo.mongo_deletes_enabled and row and row['_mongo_id']:
                 try:
-                    from bson import ObjectId
-                    self.repo.mongo_db.notifications.delete_one(
-                        {'_id': ObjectId(row['_mongo_id'])}
+                    self.repo.delete_from_mongo(
+                        'notifications', {'_id': self.repo._to_objectid(row['_mongo_id'])}
                     )
                 except Exception as e:
                     logger.warning(f"فشل حذف الإشعار من MongoDB: {e}")
@@ -398,19 +387,17 @@ class NotificationService:
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
             
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                DELETE FROM notifications 
-                WHERE created_at < ? AND is_read = 1
-            """, (cutoff_date,))
-            
-            deleted_count = cursor.rowcount
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute("""
+                    DELETE FROM notifications 
+                    WHERE created_at < ? AND is_read = 1
+                """, (cutoff_date,))
+                deleted_count = cursor.rowcount
             
             # محاولة الحذف من MongoDB
-            if self.repo.online:
+            if self.repo.mongo_deletes_enabled:
                 try:
-                    self.repo.mongo_db.notifications.delete_many({
+                    self.repo.delete_from_mongo('notifications', {
                         'created_at': {'$lt': cutoff_date},
                         'is_read': True
                     })
@@ -432,14 +419,13 @@ class NotificationService:
             عدد الإشعارات غير المقروءة
         """
         try:
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                SELECT COUNT(*) FROM notifications 
-                WHERE is_read = 0 
-                AND (expires_at IS NULL OR expires_at > ?)
-            """, (datetime.now().isoformat(),))
-            
-            result = cursor.fetchone()
+            with self.repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT COUNT(*) FROM notifications 
+                    WHERE is_read = 0 
+                    AND (expires_at IS NULL OR expires_at > ?)
+                """, (datetime.now().isoformat(),))
+                result = cursor.fetchone()
             return result[0] if result else 0
         
         except Exception as e:
@@ -593,14 +579,13 @@ class NotificationService:
         """
         try:
             # الحصول على المشاريع النشطة
-            cursor = self.repo.sqlite_cursor
-            cursor.execute("""
-                SELECT id, name, end_date 
-                FROM projects 
-                WHERE status = 'نشط' AND end_date IS NOT NULL
-            """)
-            
-            rows = cursor.fetchall()
+            with self.repo._reader() as cursor:
+                cursor.execute("""
+                    SELECT id, name, end_date 
+                    FROM projects 
+                    WHERE status = 'نشط' AND end_date IS NOT NULL
+                """)
+                rows = cursor.fetchall()
             now = datetime.now()
             
             for row in rows:
@@ -610,19 +595,21 @@ class NotificationService:
                 # إشعار قبل 7 أيام من الموعد
                 if 0 <= days_until_due <= 7:
                     # التحقق من عدم وجود إشعار مسبق
-                    cursor.execute("""
-                        SELECT COUNT(*) FROM notifications 
-                        WHERE related_entity_type = 'projects' 
-                        AND related_entity_id = ?
-                        AND type = ?
-                        AND created_at > ?
-                    """, (
-                        str(row['id']),
-                        NotificationType.PROJECT_DUE.value,
-                        (now - timedelta(days=1)).isoformat()
-                    ))
+                    with self.repo._reader() as cursor:
+                        cursor.execute("""
+                            SELECT COUNT(*) FROM notifications 
+                            WHERE related_entity_type = 'projects' 
+                            AND related_entity_id = ?
+                            AND type = ?
+                            AND created_at > ?
+                        """, (
+                            str(row['id']),
+                            NotificationType.PROJECT_DUE.value,
+                            (now - timedelta(days=1)).isoformat()
+                        ))
+                        already_notified = cursor.fetchone()[0] > 0
                     
-                    if cursor.fetchone()[0] == 0:
+                    if not already_notified:
                         self.create_notification(
                             title="موعد استحقاق مشروع قريب",
                             message=f"المشروع '{row['name']}' سينتهي خلال {days_until_due} يوم",
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 import time
 import sqlite3
+import threading
 
 from services.accounting_service import AccountingService
 
@@ -44,6 +45,10 @@ class ProjectService:
         self._cached_projects = None
         self._cache_ttl = 30  # 30 ثانية
 
+        # ⚡ آخر (إجمالي، مدفوع) لكل مشروع - لتجاهل المشاريع اللي متغيرتش
+        self._status_snapshot: Dict[str, tuple] = {}
+        self._status_update_lock = threading.Lock()
+
         # خدمة الطباعة
         if PRINTING_AVAILABLE:
             self.printing_service = ProjectPrintingService(settings_service)
@@ -78,30 +83,40 @@ class ProjectService:
         self._cached_projects = None
         self._cache_time = 0
 
-    def update_all_projects_status(self):
-        """⚡ تحديث حالات كل المشاريع أوتوماتيك (مع احترام التعديل اليدوي)"""
+    def update_all_projects_status(self) -> int:
+        """
+        ⚡ تحديث حالات كل المشاريع أوتوماتيك (مع احترام التعديل اليدوي)
+        - query واحد لإجمالي المدفوع لكل مشروع
+        - بيتجاهل المشاريع اللي إجماليها ومدفوعها متغيروش من آخر تشغيل
+        - تحديث واحد مجمّع للمشاريع اللي حالتها اتغيرت
+
+        Returns:
+            عدد المشاريع اللي حالتها اتغيرت
+        """
         print("INFO: [ProjectService] ===== بدء تحديث حالات المشاريع =====")
         try:
             projects = self.repo.get_all_projects()
+            paid_totals = self.repo.get_paid_totals_by_project()
             print(f"INFO: [ProjectService] عدد المشاريع: {len(projects)}")
-            
+
+            snapshot: Dict[str, tuple] = {}
+            new_statuses: Dict[str, schemas.ProjectStatus] = {}
             for project in projects:
                 # تجاهل المشاريع المؤرشفة
                 if project.status == schemas.ProjectStatus.ARCHIVED:
                     continue
-                
+
                 # ⚡ تجاهل المشاريع اللي حالتها معينة يدوياً
-                status_manually_set = getattr(project, 'status_manually_set', False)
-                if status_manually_set:
-                    print(f"DEBUG: {project.name}: حالة يدوية - تم تجاهلها")
+                if getattr(project, 'status_manually_set', False):
                     continue
-                    
-                # جلب الدفعات
-                payments = self.repo.get_payments_for_project(project.name)
-                total_paid = sum(p.amount for p in payments) if payments else 0.0
-                
-                print(f"DEBUG: {project.name}: total={project.total_amount}, paid={total_paid}, status={project.status.value}")
-                
+
+                total_paid = paid_totals.get(project.name, 0.0)
+                snapshot[project.name] = (project.total_amount, total_paid)
+
+                # ⚡ الإجمالي والمدفوع زي آخر مرة - الحالة اتحسبت قبل كده
+                if self._status_snapshot.get(project.name) == snapshot[project.name]:
+                    continue
+
                 # تحديد الحالة الجديدة
                 if project.total_amount > 0 and total_paid >= project.total_amount:
                     new_status = schemas.ProjectStatus.COMPLETED
@@ -109,20 +124,42 @@ class ProjectService:
                     new_status = schemas.ProjectStatus.ACTIVE
                 else:
                     new_status = schemas.ProjectStatus.PLANNING
-                
-                # تحديث إذا تغيرت
+
                 if project.status != new_status:
                     print(f"INFO: [ProjectService] تحديث {project.name}: {project.status.value} -> {new_status.value}")
-                    project.status = new_status
-                    project.status_manually_set = False  # الحالة أصبحت أوتوماتيك
-                    self.repo.update_project(project.name, project)
-            
-            self.invalidate_cache()
-            print("INFO: [ProjectService] ===== انتهى تحديث حالات المشاريع =====")
+                    new_statuses[project.name] = new_status
+
+            # ⚡ bulk_update_projects_status بيرمي لو الكتابة فشلت - الـ snapshot مبيتحفظش
+            # والحالات بتتحسب تاني في المرة الجاية
+            updated = self.repo.bulk_update_projects_status(new_statuses)
+            self._status_snapshot = snapshot
+
+            if updated:
+                self.invalidate_cache()
+            print(f"INFO: [ProjectService] ===== انتهى تحديث حالات المشاريع ({updated} تغيير) =====")
+            return updated
         except Exception as e:
             print(f"ERROR: [ProjectService] فشل تحديث حالات المشاريع: {e}")
             import traceback
             traceback.print_exc()
+            return 0
+
+    def update_all_projects_status_async(self) -> None:
+        """
+        ⚡ تشغيل update_all_projects_status في الخلفية (بعيد عن الـ UI thread)
+        لو في حالات اتغيرت بيبعت إشارة projects_changed عشان الجداول تتحدث
+        """
+        if not self._status_update_lock.acquire(blocking=False):
+            return  # في تحديث شغال بالفعل
+
+        def worker():
+            try:
+                if self.update_all_projects_status():
+                    app_signals.emit_data_changed('projects')
+            finally:
+                self._status_update_lock.release()
+
+        threading.Thread(target=worker, daemon=True).start()
 
     def get_archived_projects(self) -> List[schemas.Project]:
         """ جلب كل المشاريع المؤرشفة """
@@ -181,21 +218,23 @@ class ProjectService:
 
             new_project_schema = schemas.Project(**project_data)
 
-            # --- 2. حفظ المشروع في الداتا بيز ---
-            created_project = self.repo.create_project(new_project_schema)
-
-            # --- 3. (الأهم) إبلاغ الروبوت المحاسبي (قيد المشروع) ---
-            self.bus.publish('PROJECT_CREATED', {"project": created_project})
-
-            # --- 4. (الجديد) تسجيل الدفعة المقدمة (لو موجودة) ---
-            if payment_data and payment_data.get("amount", 0) > 0:
-                print(f"INFO: [ProjectService] تسجيل دفعة مقدمة بمبلغ {payment_data['amount']}...")
-                self.create_payment_for_project(
-                    project=created_project,  # (بنبعت المشروع)
-                    amount=payment_data["amount"],
-                    date=payment_data["date"],
-                    account_id=payment_data["account_id"]
-                )
+            # ⚡ المشروع + قيده + الدفعة المقدمة وقيدها في transaction واحد (والرفع للسحابة بعده)
+            with self.repo.unit_of_work():
+                # --- 2. حفظ المشروع في الداتا بيز ---
+                created_project = self.repo.create_project(new_project_schema)
+
+                # --- 3. (الأهم) إبلاغ الروبوت المحاسبي (قيد المشروع) ---
+                self.bus.publish('PROJECT_CREATED', {"project": created_project}, raise_errors=True)
+
+                # --- 4. (الجديد) تسجيل الدفعة المقدمة (لو موجودة) ---
+                if payment_data and payment_data.get("amount", 0) > 0:
+                    print(f"INFO: [ProjectService] تسجيل دفعة مقدمة بمبلغ {payment_data['amount']}...")
+                    self.create_payment_for_project(
+                        project=created_project,  # (بنبعت المشروع)
+                        amount=payment_data["amount"],
+                        date=payment_data["date"],
+                        account_id=payment_data["account_id"]
+                    )
 
             # ⚡ إبطال الـ cache وإرسال إشارة التحديث
             self.invalidate_cache()
@@ -294,16 +333,18 @@ class ProjectService:
                 amount=amount,
                 account_id=account_id,
             )
-            created_payment = self.repo.create_payment(payment_data)
+            # ⚡ الدفعة + قيدها + حالة المشروع في transaction واحد
+            with self.repo.unit_of_work():
+                created_payment = self.repo.create_payment(payment_data)
 
-            # (نبلغ الروبوت المحاسبي)
-            self.bus.publish('PAYMENT_RECEIVED', {
-                "payment": created_payment,
-                "project": project
-            })
+                # (نبلغ الروبوت المحاسبي)
+                self.bus.publish('PAYMENT_RECEIVED', {
+                    "payment": created_payment,
+                    "project": project
+                }, raise_errors=True)
 
-            # ⚡ تحديث حالة المشروع أوتوماتيك بعد الدفعة
-            self._auto_update_project_status(project.name, force_update=True)
+                # ⚡ تحديث حالة المشروع أوتوماتيك بعد الدفعة
+                self._auto_update_project_status(project.name, force_update=True)
             
             # ⚡ إرسال إشارات التحديث للـ UI
             app_signals.emit_data_changed('projects')
@@ -321,17 +362,20 @@ class ProjectService:
         try:
             project_name = payment_data.project_id
             project = self.repo.get_project_by_number(project_name)
-            result = self.repo.update_payment(payment_id, payment_data)
+            with self.repo.unit_of_work():
+                result = self.repo.update_payment(payment_id, payment_data)
+                
+                if result:
+                    # ✅ إبلاغ الروبوت المحاسبي بتعديل الدفعة
+                    self.bus.publish('PAYMENT_UPDATED', {
+                        "payment": payment_data,
+                        "project": project
+                    }, raise_errors=True)
+                    
+                    # ⚡ تحديث حالة المشروع أوتوماتيك
+                    self._auto_update_project_status(project_name, force_update=True)
             
             if result:
-                # ✅ إبلاغ الروبوت المحاسبي بتعديل الدفعة
-                self.bus.publish('PAYMENT_UPDATED', {
-                    "payment": payment_data,
-                    "project": project
-                })
-                
-                # ⚡ تحديث حالة المشروع أوتوماتيك
-                self._auto_update_project_status(project_name, force_update=True)
                 self.invalidate_cache()
                 app_signals.emit_data_changed('projects')
                 app_signals.emit_data_changed('payments')
@@ -348,18 +392,21 @@ class ProjectService:
             # جلب بيانات الدفعة قبل الحذف
             payment = self.repo.get_payment_by_id(payment_id)
             
-            result = self.repo.delete_payment(payment_id)
+            with self.repo.unit_of_work():
+                result = self.repo.delete_payment(payment_id)
+                
+                if result:
+                    # ✅ إبلاغ الروبوت المحاسبي بحذف الدفعة
+                    self.bus.publish('PAYMENT_DELETED', {
+                        "payment_id": payment_id,
+                        "payment": payment,
+                        "project_name": project_name
+                    }, raise_errors=True)
+                    
+                    # ⚡ تحديث حالة المشروع أوتوماتيك
+                    self._auto_update_project_status(project_name, force_update=True)
             
             if result:
-                # ✅ إبلاغ الروبوت المحاسبي بحذف الدفعة
-                self.bus.publish('PAYMENT_DELETED', {
-                    "payment_id": payment_id,
-                    "payment": payment,
-                    "project_name": project_name
-                })
-                
-                # ⚡ تحديث حالة المشروع أوتوماتيك
-                self._auto_update_project_status(project_name, force_update=True)
                 self.invalidate_cache()
                 app_signals.emit_data_changed('projects')
                 app_signals.emit_data_changed('payments')
@@ -412,11 +459,12 @@ class ProjectService:
                 print(f"WARNING: [ProjectService] فشل جلب الدفعات: {e}")
                 # محاولة من SQLite مباشرة
                 try:
-                    self.repo.sqlite_cursor.execute(
-                        "SELECT SUM(amount) FROM payments WHERE project_id = ?",
-                        (project_name,)
-                    )
-                    result = self.repo.sqlite_cursor.fetchone()
+                    with self.repo._reader() as cursor:
+                        cursor.execute(
+                            "SELECT SUM(amount) FROM payments WHERE project_id = ?",
+                            (project_name,)
+                        )
+                        result = cursor.fetchone()
                     total_paid = result[0] if result and result[0] else 0.0
                 except:
                     pass
@@ -507,21 +555,23 @@ class ProjectService:
             # ⚡ Fallback إلى SQLite إذا لم نحصل على بيانات
             if total_expenses == 0 and total_paid == 0:
                 try:
-                    self.repo.sqlite_cursor.execute(
-                        "SELECT SUM(amount) FROM expenses WHERE project_id = ?",
-                        (project_name,)
-                    )
-                    result = self.repo.sqlite_cursor.fetchone()
+                    with self.repo._reader() as cursor:
+                        cursor.execute(
+                            "SELECT SUM(amount) FROM expenses WHERE project_id = ?",
+                            (project_name,)
+                        )
+                        result = cursor.fetchone()
                     total_expenses = result[0] if result and result[0] else 0
                 except Exception:
                     pass
 
                 try:
-                    self.repo.sqlite_cursor.execute(
-                        "SELECT SUM(amount) FROM payments WHERE project_id = ?",
-                        (project_name,)
-                    )
-                    result = self.repo.sqlite_cursor.fetchone()
+                    with self.repo._reader() as cursor:
+                        cursor.execute(
+                            "SELECT SUM(amount) FROM payments WHERE project_id = ?",
+                            (project_name,)
+                        )
+                        result = cursor.fetchone()
                     total_paid = result[0] if result and result[0] else 0
                 except Exception:
                     pass
@@ -4,11 +4,16 @@
 خدمة البحث الذكي - Smart Search Service
 """
 
+import heapq
 from enum import Enum
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
 
+from core.search_index import SearchFilter, text_matches_query
+from core.speed_optimizer import LRUCache
+from core.text_normalize import normalize_phone, normalize_text
+
 
 class SearchScope(Enum):
     """نطاق البحث"""
@@ -18,6 +23,7 @@ class SearchScope(Enum):
     INVOICES = "الفواتير"
     EXPENSES = "المصروفات"
     ACCOUNTS = "الحسابات"
+    QUOTATIONS = "عروض الأسعار"
 
 
 class SearchType(Enum):
@@ -28,14 +34,6 @@ class SearchType(Enum):
     AMOUNT = "مبلغ"
 
 
-@dataclass
-class SearchFilter:
-    """فلتر البحث"""
-    field: str
-    operator: str
-    value: Any
-
-
 @dataclass
 class SearchResult:
     """نتيجة البحث"""
@@ -45,21 +43,57 @@ class SearchResult:
     subtitle: str
     data: Dict[str, Any]
     score: float = 1.0
+    # النص اللي اتدور فيه (متوحد) - SearchSession بيضيّق منه من غير ما يرجع للداتابيز
+    match_text: str = ""
+
+
+def _active_filters(filters: Optional[SearchFilter]) -> Optional[SearchFilter]:
+    """None لو مفيش ولا فلتر متحدد"""
+    if filters is None or filters.is_empty:
+        return None
+    return filters
+
+
+# نطاق البحث ← أنواع فهرس البحث (core/search_index.py) - None = الكل
+SCOPE_ENTITIES = {
+    SearchScope.ALL: None,
+    SearchScope.PROJECTS: ["project"],
+    SearchScope.CLIENTS: ["client"],
+    SearchScope.INVOICES: ["invoice"],
+    SearchScope.EXPENSES: ["expense"],
+    SearchScope.ACCOUNTS: ["account"],
+    SearchScope.QUOTATIONS: ["quotation"],
+}
+
+
+def _match_text(*parts) -> str:
+    """نص التطابق لنتيجة من مسح الصفوف: الحقول المتوحدة (كل حقل في سطر)"""
+    return "\n".join(normalize_text(part) for part in parts if part)
 
 
 class SmartSearchService:
     """
     خدمة البحث الذكي - تبحث في جميع أنواع البيانات
+    ⚡ من فهرس FTS5 المحلي (repo.search_index) - ولو الفهرس مش متاح بترجع لمسح الصفوف
     """
     
     def __init__(self, repository):
         self.repo = repository
+        self._result_builders = {
+            "project": self._project_result,
+            "client": self._client_result,
+            "expense": self._expense_result,
+            "account": self._account_result,
+            "invoice": self._invoice_result,
+            "quotation": self._quotation_result,
+        }
     
     def search(
         self,
         query: str,
         scope: SearchScope = SearchScope.ALL,
-        filters: List[SearchFilter] = None
+        filters: Optional[SearchFilter] = None,
+        limit: int = 100
     ) -> List[SearchResult]:
         """
         البحث الذكي في النظام
@@ -67,38 +101,208 @@ class SmartSearchService:
         Args:
             query: نص البحث
             scope: نطاق البحث
-            filters: فلاتر إضافية
+            filters: فلاتر التاريخ / المبلغ / الحالة / العميل / المشروع (بتتنفذ في الـ query نفسه)
+            limit: أقصى عدد نتائج (أحسن limit بـ heap من غير ترتيب الكل)
         
         Returns:
-            قائمة نتائج البحث
+            قائمة نتائج البحث (الأهم الأول)
+        """
+        return self._search_all(query, scope, filters, limit)[0]
+
+    def _search_all(
+        self,
+        query: str,
+        scope: SearchScope,
+        filters: Optional[SearchFilter],
+        limit: int,
+        cancel_token=None
+    ) -> Tuple[List[SearchResult], bool]:
+        """
+        (النتايج, indexed) - indexed = النتايج من فهرس FTS5 (تطابق prefix على الكلمات)
+        مش من مسح الصفوف (تطابق جزء من النص) - SearchSession بيضيّق بنفس طريقة التطابق
+        cancel_token (core.data_loader.CancellationToken): بيوقف مسح الصفوف بين كل جدول والتاني
         """
+        filters = _active_filters(filters)
+        results = self._search_index(query, scope, filters, limit)
+        if results is not None:
+            return results, True
+
         results = []
+        scans = (
+            (SearchScope.PROJECTS, self._search_projects),
+            (SearchScope.CLIENTS, self._search_clients),
+            (SearchScope.EXPENSES, self._search_expenses),
+            (SearchScope.ACCOUNTS, self._search_accounts),
+        )
+        for scan_scope, scan in scans:
+            if scope == SearchScope.ALL or scope == scan_scope:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                results.extend(scan(query, filters))
         
-        if scope == SearchScope.ALL or scope == SearchScope.PROJECTS:
-            results.extend(self._search_projects(query, filters))
-        
-        if scope == SearchScope.ALL or scope == SearchScope.CLIENTS:
-            results.extend(self._search_clients(query, filters))
-        
-        if scope == SearchScope.ALL or scope == SearchScope.EXPENSES:
-            results.extend(self._search_expenses(query, filters))
-        
-        if scope == SearchScope.ALL or scope == SearchScope.ACCOUNTS:
-            results.extend(self._search_accounts(query, filters))
-        
-        # ترتيب النتائج حسب الأهمية
-        results.sort(key=lambda x: x.score, reverse=True)
-        
+        # ⚡ أحسن limit نتيجة (heap) بدل ترتيب كل النتائج
+        return heapq.nlargest(limit, results, key=lambda x: x.score), False
+
+    def result_matcher(self, query: str, indexed: bool) -> Callable[[SearchResult], bool]:
+        """
+        دالة بتقول النتيجة (من بحث سابق) بتطابق query ولا لأ - بنفس طريقة التطابق
+        اللي جابت النتيجة (الفهرس أو مسح الصفوف)
+        """
+        if indexed:
+            return lambda result: text_matches_query(result.match_text, query)
+
+        query_lower = normalize_text(query)
+        query_phone = normalize_phone(query)
+
+        def matches(result: SearchResult) -> bool:
+            if query_lower in result.match_text:
+                return True
+            phone = result.data.get("phone") if result.type == "client" else None
+            return bool(phone) and query_phone in normalize_phone(phone)
+
+        return matches
+
+    def _search_index(
+        self, query: str, scope: SearchScope, filters: Optional[SearchFilter], limit: int
+    ) -> Optional[List[SearchResult]]:
+        """⚡ البحث من فهرس FTS5 (score = -bm25) - None لو الفهرس مش متاح"""
+        search_index = getattr(self.repo, 'search_index', None)
+        if search_index is None:
+            return None
+        hits = search_index(query, entities=SCOPE_ENTITIES.get(scope), limit=limit, filters=filters)
+        if hits is None:
+            return None
+
+        results = []
+        for hit in hits:
+            try:
+                results.append(self._result_builders[hit['entity']](hit))
+            except Exception as e:
+                print(f"WARNING: [SearchService] تخطي نتيجة {hit.get('entity')} #{hit.get('id')}: {e}")
         return results
+
+    # --- بناء النتايج من صفوف الفهرس ---
+
+    @staticmethod
+    def _project_result(hit: Dict[str, Any]) -> SearchResult:
+        project_id = hit.get('_mongo_id') or str(hit['id'])
+        invoice_number = f"SW-{str(project_id)[-4:].zfill(4)}"
+        amount = hit.get('total_amount') or 0.0
+        return SearchResult(
+            type="project",
+            id=hit['name'],
+            title=f"{invoice_number} - {hit['name']}",
+            subtitle=f"العميل: {hit['client_id']} | {amount:,.2f} جنيه | {hit['status']}",
+            data={
+                "name": hit['name'],
+                "client": hit['client_id'],
+                "amount": amount,
+                "status": hit['status'],
+                "invoice_number": invoice_number
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    @staticmethod
+    def _client_result(hit: Dict[str, Any]) -> SearchResult:
+        return SearchResult(
+            type="client",
+            id=str(hit['id']),
+            title=hit['name'],
+            subtitle=f"الهاتف: {hit.get('phone') or 'N/A'} | البريد: {hit.get('email') or 'N/A'}",
+            data={
+                "name": hit['name'],
+                "phone": hit.get('phone'),
+                "email": hit.get('email')
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    @staticmethod
+    def _expense_result(hit: Dict[str, Any]) -> SearchResult:
+        date = hit.get('date')
+        date_value = datetime.fromisoformat(date) if date else None
+        amount = hit.get('amount') or 0.0
+        return SearchResult(
+            type="expense",
+            id=str(hit['id']),
+            title=hit['category'],
+            subtitle=f"{amount:,.2f} جنيه | {date_value.strftime('%Y-%m-%d') if date_value else 'N/A'}",
+            data={
+                "category": hit['category'],
+                "amount": amount,
+                "date": date_value
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    @staticmethod
+    def _account_result(hit: Dict[str, Any]) -> SearchResult:
+        balance = hit.get('balance') or 0.0
+        return SearchResult(
+            type="account",
+            id=hit['code'],
+            title=hit['name'],
+            subtitle=f"الكود: {hit['code']} | الرصيد: {balance:,.2f} جنيه",
+            data={
+                "name": hit['name'],
+                "code": hit['code'],
+                "balance": balance
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    @staticmethod
+    def _invoice_result(hit: Dict[str, Any]) -> SearchResult:
+        amount = hit.get('total_amount') or 0.0
+        return SearchResult(
+            type="invoice",
+            id=hit['invoice_number'],
+            title=hit['invoice_number'],
+            subtitle=f"العميل: {hit['client_id']} | {amount:,.2f} جنيه | {hit['status']}",
+            data={
+                "invoice_number": hit['invoice_number'],
+                "client": hit['client_id'],
+                "project": hit.get('project_id'),
+                "amount": amount,
+                "status": hit['status']
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    @staticmethod
+    def _quotation_result(hit: Dict[str, Any]) -> SearchResult:
+        amount = hit.get('total_amount') or 0.0
+        return SearchResult(
+            type="quotation",
+            id=hit['quote_number'],
+            title=hit['quote_number'],
+            subtitle=f"العميل: {hit['client_id']} | {amount:,.2f} جنيه | {hit['status']}",
+            data={
+                "quote_number": hit['quote_number'],
+                "client": hit['client_id'],
+                "project": hit.get('project_id'),
+                "amount": amount,
+                "status": hit['status']
+            },
+            score=hit['score'],
+            match_text=hit.get('match_text', '')
+        )
+
+    # --- الطريقة القديمة (مسح الصفوف + توحيد كل صف) لو فهرس البحث مش متاح ---
     
-    def _search_projects(self, query: str, filters: List[SearchFilter] = None) -> List[SearchResult]:
+    def _search_projects(self, query: str, filters: Optional[SearchFilter] = None) -> List[SearchResult]:
         """البحث في المشاريع - يشمل البحث برقم الفاتورة"""
         results = []
         
         try:
-            projects = self.repo.get_all_projects()
-            query_lower = query.lower()
-            query_upper = query.upper()
+            projects = self.repo.get_search_rows("project", filters)
+            query_lower = normalize_text(query)
             
             for idx, project in enumerate(projects):
                 score = 0.0
@@ -108,23 +312,23 @@ class SmartSearchService:
                 invoice_number = f"SW-{str(project_id)[-4:].zfill(4)}" if project_id else f"SW-{str(idx + 1).zfill(4)}"
                 
                 # البحث برقم الفاتورة (أعلى أولوية)
-                if query_upper in invoice_number.upper() or query in invoice_number:
+                if query_lower in normalize_text(invoice_number):
                     score += 1.5
                 
                 # البحث في الاسم
-                if query_lower in project.name.lower():
+                if query_lower in normalize_text(project.name):
                     score += 1.0
                 
                 # البحث في اسم العميل
-                if query_lower in project.client_id.lower():
+                if query_lower in normalize_text(project.client_id):
                     score += 0.8
                 
                 # البحث في الوصف
-                if project.project_notes and query_lower in project.project_notes.lower():
+                if project.project_notes and query_lower in normalize_text(project.project_notes):
                     score += 0.5
                 
                 # البحث في الحالة
-                if project.status and query_lower in project.status.value.lower():
+                if project.status and query_lower in normalize_text(project.status.value):
                     score += 0.4
                 
                 if score > 0:
@@ -140,7 +344,11 @@ class SmartSearchService:
                             "status": project.status.value,
                             "invoice_number": invoice_number
                         },
-                        score=score
+                        score=score,
+                        match_text=_match_text(
+                            invoice_number, project.name, project.client_id,
+                            project.project_notes, project.status.value if project.status else None
+                        )
                     ))
         
         except Exception as e:
@@ -148,27 +356,27 @@ class SmartSearchService:
         
         return results
     
-    def _search_clients(self, query: str, filters: List[SearchFilter] = None) -> List[SearchResult]:
+    def _search_clients(self, query: str, filters: Optional[SearchFilter] = None) -> List[SearchResult]:
         """البحث في العملاء"""
         results = []
         
         try:
-            clients = self.repo.get_all_clients()
-            query_lower = query.lower()
+            clients = self.repo.get_search_rows("client", filters)
+            query_lower = normalize_text(query)
             
             for client in clients:
                 score = 0.0
                 
                 # البحث في الاسم
-                if query_lower in client.name.lower():
+                if query_lower in normalize_text(client.name):
                     score += 1.0
                 
                 # البحث في الهاتف
-                if client.phone and query in client.phone:
+                if client.phone and normalize_phone(query) in normalize_phone(client.phone):
                     score += 0.9
                 
                 # البحث في البريد
-                if client.email and query_lower in client.email.lower():
+                if client.email and query_lower in normalize_text(client.email):
                     score += 0.8
                 
                 if score > 0:
@@ -182,7 +390,8 @@ class SmartSearchService:
                             "phone": client.phone,
                             "email": client.email
                         },
-                        score=score
+                        score=score,
+                        match_text=_match_text(client.name, client.email)
                     ))
         
         except Exception as e:
@@ -190,27 +399,27 @@ class SmartSearchService:
         
         return results
     
-    def _search_expenses(self, query: str, filters: List[SearchFilter] = None) -> List[SearchResult]:
+    def _search_expenses(self, query: str, filters: Optional[SearchFilter] = None) -> List[SearchResult]:
         """البحث في المصروفات"""
         results = []
         
         try:
-            expenses = self.repo.get_all_expenses()
-            query_lower = query.lower()
+            expenses = self.repo.get_search_rows("expense", filters)
+            query_lower = normalize_text(query)
             
             for expense in expenses:
                 score = 0.0
                 
                 # البحث في الفئة
-                if query_lower in expense.category.lower():
+                if query_lower in normalize_text(expense.category):
                     score += 1.0
                 
                 # البحث في الوصف
-                if expense.description and query_lower in expense.description.lower():
+                if expense.description and query_lower in normalize_text(expense.description):
                     score += 0.8
                 
                 # البحث في المبلغ
-                if query in str(expense.amount):
+                if query_lower in str(expense.amount):
                     score += 0.6
                 
                 if score > 0:
@@ -224,7 +433,8 @@ class SmartSearchService:
                             "amount": expense.amount,
                             "date": expense.date
                         },
-                        score=score
+                        score=score,
+                        match_text=_match_text(expense.category, expense.description, str(expense.amount))
                     ))
         
         except Exception as e:
@@ -232,23 +442,23 @@ class SmartSearchService:
         
         return results
     
-    def _search_accounts(self, query: str, filters: List[SearchFilter] = None) -> List[SearchResult]:
+    def _search_accounts(self, query: str, filters: Optional[SearchFilter] = None) -> List[SearchResult]:
         """البحث في الحسابات"""
         results = []
         
         try:
-            accounts = self.repo.get_all_accounts()
-            query_lower = query.lower()
+            accounts = self.repo.get_search_rows("account", filters)
+            query_lower = normalize_text(query)
             
             for account in accounts:
                 score = 0.0
                 
                 # البحث في الاسم
-                if query_lower in account.name.lower():
+                if query_lower in normalize_text(account.name):
                     score += 1.0
                 
                 # البحث في الكود
-                if account.code and query in account.code:
+                if account.code and query_lower in normalize_text(account.code):
                     score += 0.9
                 
                 if score > 0:
@@ -262,10 +472,93 @@ class SmartSearchService:
                             "code": account.code,
                             "balance": account.balance
                         },
-                        score=score
+                        score=score,
+                        match_text=_match_text(account.name, account.code)
                     ))
         
         except Exception as e:
             print(f"ERROR: [SearchService] فشل البحث في الحسابات: {e}")
         
         return results
+
+
+@dataclass
+class _SessionEntry:
+    """نتايج بحث متخزنة في SearchSession"""
+    results: List[SearchResult]
+    complete: bool  # كل التطابقات (أقل من candidate_limit) - ينفع نضيّق منها
+    indexed: bool
+
+
+class SearchSession:
+    """
+    ⚡ جلسة بحث أثناء الكتابة (AdvancedSearchWidget)
+    - آخر max_queries بحث في LRU بمفتاح (النطاق, الفلاتر, النص المتوحد)
+    - لو النص الجديد تكملة لنص اتبحث قبل كده ("sky" ← "skyw") النتايج بتتفلتر من نتايج
+      القديم من غير ما نرجع للداتابيز - بشرط إن القديم كان جايب كل التطابقات
+      (أقل من candidate_limit) - والترتيب بيفضل ترتيب البحث القديم
+    - cancel_token: البحث اللي جه بعده بحث أحدث بيقف (LoadCancelled) ومش بيتخزن
+
+    الاستخدام:
+        session = SearchSession(SmartSearchService(repo))
+        session.search("sky")    # من الفهرس
+        session.search("skyw")   # من نتايج "sky"
+    """
+
+    def __init__(self, service: SmartSearchService, max_queries: int = 32,
+                 candidate_limit: int = 500, ttl_seconds: int = 30):
+        self.service = service
+        self.candidate_limit = candidate_limit
+        self._cache = LRUCache(maxsize=max_queries, ttl_seconds=ttl_seconds)
+        self.fetched = 0
+        self.narrowed = 0
+
+    def search(
+        self,
+        query: str,
+        scope: SearchScope = SearchScope.ALL,
+        filters: Optional[SearchFilter] = None,
+        limit: int = 100,
+        cancel_token=None
+    ) -> List[SearchResult]:
+        """نفس SmartSearchService.search - من الـ cache أو من نتايج بحث أقصر لو ينفع"""
+        text = normalize_text(query.strip())
+        if not text:
+            return []
+        filters = _active_filters(filters)
+        base_key = (scope, repr(filters))
+
+        entry = self._cache.get(base_key + (text,))
+        if entry is None:
+            entry = self._narrow(base_key, query, text)
+        if entry is None:
+            results, indexed = self.service._search_all(
+                query, scope, filters, self.candidate_limit, cancel_token
+            )
+            entry = _SessionEntry(results, len(results) < self.candidate_limit, indexed)
+            self.fetched += 1
+
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        self._cache.set(base_key + (text,), entry)
+        return entry.results[:limit]
+
+    def _narrow(self, base_key: Tuple, query: str, text: str) -> Optional[_SessionEntry]:
+        """نتايج أطول بحث متخزن النص الجديد تكملة ليه (None لو مفيش)"""
+        phone = normalize_phone(text)
+        for end in range(len(text) - 1, 0, -1):
+            prefix = text[:end]
+            parent = self._cache.get(base_key + (prefix,))
+            if parent is None or not parent.complete:
+                continue
+            # التليفون (+20 ← 0) مش دايماً تكملة لو النص تكملة
+            if not phone.startswith(normalize_phone(prefix)):
+                continue
+            matches = self.service.result_matcher(query, parent.indexed)
+            self.narrowed += 1
+            return _SessionEntry([r for r in parent.results if matches(r)], True, parent.indexed)
+        return None
+
+    def invalidate(self) -> None:
+        """مسح النتايج المتخزنة (بعد تعديل البيانات)"""
+        self._cache.invalidate()
@@ -20,6 +20,8 @@ class SettingsService:
         "default_tax_rate": 0.0,
         "default_notes": "شكراً لثقتكم في Sky Wave. نسعد بخدمتكم دائماً.",
         "company_logo_path": "",
+        "read_policy": "local_first",  # local_first / remote_first / remote_only
+        "max_read_lag_seconds": 300,
     }
 
     def __init__(self):
@@ -61,8 +61,8 @@ class TemplateService(BaseService):
         """
         
         try:
-            self.repo.sqlite_cursor.execute(create_table_sql)
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute(create_table_sql)
             
             # إضافة القالب الافتراضي إذا لم يكن موجوداً
             self._add_default_template()
@@ -85,8 +85,9 @@ class TemplateService(BaseService):
         try:
             # التحقق من وجود أي قالب افتراضي
             check_sql = "SELECT COUNT(*) FROM invoice_templates WHERE is_default = 1"
-            self.repo.sqlite_cursor.execute(check_sql)
-            count = self.repo.sqlite_cursor.fetchone()[0]
+            with self.repo._reader() as cursor:
+                cursor.execute(check_sql)
+                count = cursor.fetchone()[0]
             
             if count == 0:
                 # التحقق من وجود القالب في المجلد
@@ -105,13 +106,13 @@ class TemplateService(BaseService):
                 INSERT INTO invoice_templates (name, description, template_file, is_default)
                 VALUES (?, ?, ?, ?)
                 """
-                self.repo.sqlite_cursor.execute(insert_sql, (
-                    "Sky Wave Professional",
-                    "القالب الاحترافي لفواتير Sky Wave",
-                    template_file,
-                    1
-                ))
-                self.repo.sqlite_conn.commit()
+                with self.repo._local_transaction() as cursor:
+                    cursor.execute(insert_sql, (
+                        "Sky Wave Professional",
+                        "القالب الاحترافي لفواتير Sky Wave",
+                        template_file,
+                        1
+                    ))
                 print(f"INFO: تم إضافة القالب الافتراضي: {template_file}")
         
         except Exception as e:
@@ -126,8 +127,9 @@ class TemplateService(BaseService):
             ORDER BY is_default DESC, name ASC
             """
             
-            self.repo.sqlite_cursor.execute(select_sql)
-            rows = self.repo.sqlite_cursor.fetchall()
+            with self.repo._reader() as cursor:
+                cursor.execute(select_sql)
+                rows = cursor.fetchall()
             
             templates = []
             for row in rows:
@@ -155,8 +157,9 @@ class TemplateService(BaseService):
             WHERE id = ?
             """
             
-            self.repo.sqlite_cursor.execute(select_sql, (template_id,))
-            row = self.repo.sqlite_cursor.fetchone()
+            with self.repo._reader() as cursor:
+                cursor.execute(select_sql, (template_id,))
+                row = cursor.fetchone()
             
             if row:
                 return {
@@ -184,8 +187,9 @@ class TemplateService(BaseService):
             LIMIT 1
             """
             
-            self.repo.sqlite_cursor.execute(select_sql)
-            row = self.repo.sqlite_cursor.fetchone()
+            with self.repo._reader() as cursor:
+                cursor.execute(select_sql)
+                row = cursor.fetchone()
             
             if row:
                 template_file = row[3]
@@ -201,8 +205,8 @@ class TemplateService(BaseService):
                             template_file = alt_template
                             # تحديث قاعدة البيانات
                             update_sql = "UPDATE invoice_templates SET template_file = ? WHERE id = ?"
-                            self.repo.sqlite_cursor.execute(update_sql, (template_file, row[0]))
-                            self.repo.sqlite_conn.commit()
+                            with self.repo._local_transaction() as cursor:
+                                cursor.execute(update_sql, (template_file, row[0]))
                             break
                 
                 return {
@@ -582,8 +586,8 @@ class TemplateService(BaseService):
             VALUES (?, ?, ?)
             """
             
-            self.repo.sqlite_cursor.execute(insert_sql, (name, description, template_filename))
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute(insert_sql, (name, description, template_filename))
             
             print(f"INFO: تم إضافة قالب جديد: {name}")
             return True
@@ -623,8 +627,8 @@ class TemplateService(BaseService):
             WHERE id = ?
             """
             
-            self.repo.sqlite_cursor.execute(update_sql, (name, description, new_filename, template_id))
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute(update_sql, (name, description, new_filename, template_id))
             
             print(f"INFO: تم تحديث القالب: {name}")
             return True
@@ -638,13 +642,12 @@ class TemplateService(BaseService):
         try:
             # إزالة الافتراضي من جميع القوالب
             update_sql = "UPDATE invoice_templates SET is_default = 0"
-            self.repo.sqlite_cursor.execute(update_sql)
+            with self.repo._local_transaction() as cursor:
+                cursor.execute(update_sql)
             
-            # تعيين القالب الجديد كافتراضي
-            update_sql = "UPDATE invoice_templates SET is_default = 1 WHERE id = ?"
-            self.repo.sqlite_cursor.execute(update_sql, (template_id,))
-            
-            self.repo.sqlite_conn.commit()
+                # تعيين القالب الجديد كافتراضي
+                update_sql = "UPDATE invoice_templates SET is_default = 1 WHERE id = ?"
+                cursor.execute(update_sql, (template_id,))
             
             print(f"INFO: تم تعيين القالب {template_id} كافتراضي")
             return True
@@ -674,8 +677,8 @@ class TemplateService(BaseService):
             
             # حذف من قاعدة البيانات
             delete_sql = "DELETE FROM invoice_templates WHERE id = ?"
-            self.repo.sqlite_cursor.execute(delete_sql, (template_id,))
-            self.repo.sqlite_conn.commit()
+            with self.repo._local_transaction() as cursor:
+                cursor.execute(delete_sql, (template_id,))
             
             # إذا كان القالب المحذوف افتراضياً، تعيين آخر كافتراضي
             if template_info['is_default']:
@@ -0,0 +1,37 @@
+"""
+⚡ الـ queries المهمة (المزامنة / الإجماليات / صفحات keyset) لازم تستخدم الـ indexes بتاعتها
+على قاعدة متبنية بـ run_migrations (core/performance.py: query_plan_checks)
+"""
+
+import sqlite3
+
+import pytest
+
+from core.migrations import SCHEMA_VERSION, get_schema_version
+from core.performance import explain_query_plan, make_repository, query_plan_checks
+
+CHECKS = query_plan_checks()
+
+
+@pytest.fixture(scope="module")
+def migrated_pool(tmp_path_factory):
+    conn = sqlite3.connect(
+        str(tmp_path_factory.mktemp("db") / "skywave_test.db"), check_same_thread=False, isolation_level=None
+    )
+    conn.row_factory = sqlite3.Row
+    pool = make_repository(conn)._pool
+    yield pool
+    conn.close()
+
+
+def test_migrations_reach_latest_version(migrated_pool):
+    with migrated_pool.reader() as cursor:
+        assert get_schema_version(cursor) == SCHEMA_VERSION
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("sql, param_count, expected", CHECKS, ids=[check[2] for check in CHECKS])
+def test_query_uses_index(migrated_pool, sql, param_count, expected):
+    plan = explain_query_plan(migrated_pool.writer_connection, sql, param_count)
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+    assert expected in plan, plan
@@ -18,8 +18,10 @@ from core import schemas
 from typing import List, Optional, Dict
 
 from ui.account_editor_dialog import AccountEditorDialog
+from ui.loading_overlay import LoadingOverlay
 from ui.styles import BUTTON_STYLES, TREE_STYLE_DARK, COLORS, CHART_OF_ACCOUNTS_TREE_STYLE
 from core.signals import app_signals
+from core.data_loader import data_loader
 
 # ✨ Import Global Events for Real-time Updates
 try:
@@ -239,6 +241,9 @@ class AccountingManagerTab(QWidget):
 
         layout.addLayout(main_h_layout)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو حساب الأرصدة طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
     def _setup_tree_columns(self):
         """ضبط أعمدة الشجرة - يتم استدعاؤها عند تغيير حجم النافذة"""
         # الأعمدة تم ضبطها في setup_accounts_tab
@@ -252,17 +257,28 @@ class AccountingManagerTab(QWidget):
         عن طريق جمع أرصدة الحسابات الفرعية بشكل تكراري
         """
         print("INFO: [AccManager] جاري تحميل شجرة الحسابات مع الأرصدة التراكمية...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
+        self.loading_overlay.show_loading("جاري حساب الأرصدة...")
+        data_loader.load(
+            key="AccManager.tree",
+            fetch=self._fetch_accounts_tree,
+            on_result=self._apply_accounts_tree,
+            on_error=lambda e: print(f"ERROR: [AccManager] فشل تحميل الحسابات: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+        )
+
+    def _fetch_accounts_tree(self, token):
+        """(في الخلفية) الشجرة بالأرصدة المحسوبة + قائمة الحسابات"""
+        # ✨ استخدام الدالة الجديدة للحصول على الأرصدة المحسوبة
+        tree_map = self.accounting_service.get_hierarchy_with_balances(cancel_token=token)
+        token.raise_if_cancelled()
+        # تحديث قائمة الحسابات للاستخدام في أماكن أخرى
+        return tree_map, self.accounting_service.repo.get_all_accounts()
+
+    def _apply_accounts_tree(self, result):
+        """عرض الشجرة (في الـ UI thread)"""
+        tree_map, all_accounts = result
         try:
-            # ✨ استخدام الدالة الجديدة للحصول على الأرصدة المحسوبة
-            tree_map = self.accounting_service.get_hierarchy_with_balances()
-            
-            # تحديث قائمة الحسابات للاستخدام في أماكن أخرى
-            self.all_accounts_list = self.accounting_service.repo.get_all_accounts()
+            self.all_accounts_list = all_accounts
             
             self.accounts_model.clear()
             self.accounts_model.setHorizontalHeaderLabels([
@@ -17,8 +17,12 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal, QDate, QSize
 from PyQt6.QtGui import QIcon, QFont, QPixmap, QPalette, QColor, QAction
 
-from services.search_service import SmartSearchService, SearchScope, SearchType, SearchFilter, SearchResult
+from services.search_service import (
+    SmartSearchService, SearchSession, SearchScope, SearchType, SearchFilter, SearchResult
+)
+from core.data_loader import CancellationToken, LoadCancelled
 from core.repository import Repository
+from core.signals import app_signals
 
 
 class SearchResultWidget(QFrame):
@@ -68,8 +72,9 @@ class SearchResultWidget(QFrame):
             layout.addWidget(subtitle_label)
         
         # الوصف
-        if self.result.description:
-            desc_label = QLabel(self.result.description)
+        description = self.result.data.get("description")
+        if description:
+            desc_label = QLabel(description)
             desc_label.setStyleSheet("color: #8B9DC3; font-size: 9px; background: transparent;")
             desc_label.setWordWrap(True)
             layout.addWidget(desc_label)
@@ -78,65 +83,72 @@ class SearchResultWidget(QFrame):
         info_layout = QHBoxLayout()
         
         # درجة الصلة
-        relevance_label = QLabel(f"الصلة: {self.result.relevance_score:.0f}%")
+        relevance_label = QLabel(f"الصلة: {self.result.score:.1f}")
         relevance_label.setStyleSheet("color: #4a90e2; font-size: 8px; font-weight: bold;")
         info_layout.addWidget(relevance_label)
         
         info_layout.addStretch()
         
         # التاريخ
-        if self.result.created_date:
-            date_str = self.result.created_date.strftime("%Y-%m-%d")
+        date_value = self.result.data.get("date")
+        if hasattr(date_value, "strftime"):
+            date_str = date_value.strftime("%Y-%m-%d")
             date_label = QLabel(f"📅 {date_str}")
             date_label.setStyleSheet("color: #999; font-size: 8px;")
             info_layout.addWidget(date_label)
         
         # المبلغ
-        if self.result.amount:
-            amount_label = QLabel(f"💰 {self.result.amount:,.0f}")
+        amount = self.result.data.get("amount")
+        if amount:
+            amount_label = QLabel(f"💰 {amount:,.0f}")
             amount_label.setStyleSheet("color: #0A6CF1; font-size: 8px; font-weight: bold;")
             info_layout.addWidget(amount_label)
         
         layout.addLayout(info_layout)
-        
-        # الحقول المطابقة
-        if self.result.matched_fields:
-            matched_text = "المطابقة في: " + ", ".join(self.result.matched_fields)
-            matched_label = QLabel(matched_text)
-            matched_label.setStyleSheet("color: #ff9800; font-size: 8px; font-style: italic;")
-            layout.addWidget(matched_label)
     
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            self.clicked.emit(self.result.item_type, self.result.item_id)
+            self.clicked.emit(self.result.type, self.result.id)
         super().mousePressEvent(event)
 
 
 class SearchThread(QThread):
-    """خيط البحث المنفصل لتجنب تجميد الواجهة"""
+    """
+    خيط البحث المنفصل لتجنب تجميد الواجهة
+    ⚡ بيدور من SearchSession (نتايج البحث الأقصر بتتفلتر بدل ما نرجع للداتابيز)
+    و cancel() لما بحث أحدث يبدأ: البحث بيقف ومش بيبعت نتايج
+    """
     
     results_ready = pyqtSignal(list)
     progress_update = pyqtSignal(int)
     error_occurred = pyqtSignal(str)
     
-    def __init__(self, search_service: SmartSearchService, query: str, scope: SearchScope, 
-                 search_type: SearchType, filters: Optional[SearchFilter], limit: int):
-        super().__init__()
-        self.search_service = search_service
+    def __init__(self, search_session: SearchSession, query: str, scope: SearchScope,
+                 filters: Optional[SearchFilter], limit: int, parent=None):
+        super().__init__(parent)
+        self.search_session = search_session
         self.query = query
         self.scope = scope
-        self.search_type = search_type
         self.filters = filters
         self.limit = limit
+        self.token = CancellationToken()
+    
+    def cancel(self):
+        """إلغاء البحث (فيه بحث أحدث)"""
+        self.token.cancel()
     
     def run(self):
         try:
             self.progress_update.emit(10)
-            results = self.search_service.search(
-                self.query, self.scope, self.search_type, self.filters, self.limit
+            results = self.search_session.search(
+                self.query, self.scope, self.filters, self.limit, cancel_token=self.token
             )
+            if self.token.cancelled:
+                return
             self.progress_update.emit(100)
             self.results_ready.emit(results)
+        except LoadCancelled:
+            pass
         except Exception as e:
             self.error_occurred.emit(str(e))
 
@@ -149,10 +161,14 @@ class AdvancedSearchWidget(QWidget):
     
     result_selected = pyqtSignal(str, str)  # item_type, item_id
     
-    def __init__(self, repository: Repository, parent=None):
+    def __init__(self, repository: Repository, parent=None, result_limit: int = 100):
         super().__init__(parent)
         self.repository = repository
+        self.result_limit = result_limit  # أقصى عدد نتايج (أحسن result_limit بس بتتجاب)
         self.search_service = SmartSearchService(repository)
+        self.search_session = SearchSession(self.search_service)
+        # ⚡ أي تعديل في البيانات بيمسح النتايج المتخزنة (عميل جديد/اتعدل يظهر في البحث فوراً)
+        app_signals.data_changed.connect(self.on_data_changed)
         self.search_thread = None
         self.current_results = []
         
@@ -358,8 +374,6 @@ class AdvancedSearchWidget(QWidget):
             "🧾 الفواتير فقط",
             "📋 عروض الأسعار فقط",
             "💸 المصروفات فقط",
-            "💳 المدفوعات فقط",
-            "🛠️ الخدمات فقط",
             "📊 المحاسبة فقط"
         ])
         self.scope_combo.setStyleSheet("""
@@ -755,6 +769,10 @@ class AdvancedSearchWidget(QWidget):
         # تبديل عرض الفلاتر المتقدمة
         self.advanced_button.toggled.connect(self.toggle_advanced_filters)
     
+    def on_data_changed(self, data_type: str):
+        """البيانات اتعدلت: النتايج المتخزنة في الـ session مبقتش صحيحة"""
+        self.search_session.invalidate()
+
     def on_search_text_changed(self):
         """معالج تغيير نص البحث"""
         # إعادة تشغيل المؤقت للبحث التلقائي
@@ -779,9 +797,7 @@ class AdvancedSearchWidget(QWidget):
             3: SearchScope.INVOICES,
             4: SearchScope.QUOTATIONS,
             5: SearchScope.EXPENSES,
-            6: SearchScope.PAYMENTS,
-            7: SearchScope.SERVICES,
-            8: SearchScope.ACCOUNTING
+            6: SearchScope.ACCOUNTS
         }
         return scope_map.get(self.scope_combo.currentIndex(), SearchScope.ALL)
     
@@ -795,13 +811,13 @@ class AdvancedSearchWidget(QWidget):
             return SearchType.PARTIAL
     
     def get_search_filters(self) -> Optional[SearchFilter]:
-        """الحصول على فلاتر البحث"""
+        """الحصول على فلاتر البحث (None لو مفيش فلتر) - بتتنفذ في الـ query نفسه"""
         filters = SearchFilter()
         
         # فلتر التاريخ
         if self.date_filter_enabled.isChecked():
-            filters.date_from = self.date_from.date().toPython()
-            filters.date_to = self.date_to.date().toPython()
+            filters.date_from = self.date_from.date().toPyDate()
+            filters.date_to = self.date_to.date().toPyDate()
         
         # فلتر المبلغ
         if self.amount_filter_enabled.isChecked():
@@ -820,7 +836,7 @@ class AdvancedSearchWidget(QWidget):
         if self.project_combo.currentIndex() > 0:
             filters.project_id = self.project_combo.currentData()
         
-        return filters
+        return None if filters.is_empty else filters
     
     def perform_search(self):
         """تنفيذ البحث"""
@@ -844,23 +860,34 @@ class AdvancedSearchWidget(QWidget):
         self.search_button.setEnabled(False)
         self.search_button.setText("جاري البحث...")
         
-        # إنشاء خيط البحث
+        # ⚡ البحث السابق (لو لسه شغال) مبقاش مطلوب
+        if self.search_thread is not None:
+            self.search_thread.cancel()
+        
+        # إنشاء خيط البحث (الـ widget هو الـ parent: الخيط الملغي بيكمل لحد ما يخلص ويتمسح)
         scope = self.get_search_scope()
-        search_type = self.get_search_type()
         filters = self.get_search_filters()
         
-        self.search_thread = SearchThread(
-            self.search_service, query, scope, search_type, filters, 100
-        )
+        thread = SearchThread(self.search_session, query, scope, filters, self.result_limit, parent=self)
+        self.search_thread = thread
         
-        # ربط الإشارات
-        self.search_thread.results_ready.connect(self.display_results)
-        self.search_thread.progress_update.connect(self.progress_bar.setValue)
-        self.search_thread.error_occurred.connect(self.handle_search_error)
-        self.search_thread.finished.connect(self.search_finished)
+        # ربط الإشارات (نتايج الخيط الملغي بتتجاهل)
+        thread.results_ready.connect(
+            lambda results, t=thread: self.display_results(results) if t is self.search_thread else None
+        )
+        thread.progress_update.connect(
+            lambda value, t=thread: self.progress_bar.setValue(value) if t is self.search_thread else None
+        )
+        thread.error_occurred.connect(
+            lambda message, t=thread: self.handle_search_error(message) if t is self.search_thread else None
+        )
+        thread.finished.connect(
+            lambda t=thread: self.search_finished() if t is self.search_thread else None
+        )
+        thread.finished.connect(thread.deleteLater)
         
         # بدء البحث
-        self.search_thread.start()
+        thread.start()
     
     def display_results(self, results: List[SearchResult]):
         """عرض نتائج البحث"""
@@ -941,7 +968,8 @@ class AdvancedSearchWidget(QWidget):
         try:
             clients = self.repository.get_all_clients()
             for client in clients[:50]:  # أول 50 عميل فقط
-                self.client_combo.addItem(client.name, str(client.id))
+                # المشاريع والفواتير بتخزن اسم العميل في client_id
+                self.client_combo.addItem(client.name, client.name)
         except Exception as e:
             print(f"ERROR: Failed to load clients for filter: {e}")
     
@@ -950,7 +978,8 @@ class AdvancedSearchWidget(QWidget):
         try:
             projects = self.repository.get_all_projects()
             for project in projects[:50]:  # أول 50 مشروع فقط
-                self.project_combo.addItem(project.name, str(project.id))
+                # المصروفات والفواتير بتخزن اسم المشروع في project_id
+                self.project_combo.addItem(project.name, project.name)
         except Exception as e:
             print(f"ERROR: Failed to load projects for filter: {e}")
     
@@ -1,17 +1,21 @@
 # الملف: ui/client_manager.py
 
 from PyQt6.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QTableWidget, QTableWidgetItem,
-    QHeaderView, QPushButton, QLabel, QMessageBox, QGroupBox, QCheckBox,
+    QWidget, QHBoxLayout, QVBoxLayout, QTableView, QAbstractItemView,
+    QHeaderView, QPushButton, QMessageBox, QGroupBox, QCheckBox,
     QApplication, QDialog
 )
 from PyQt6.QtCore import Qt, QSize, QThread, pyqtSignal
 from PyQt6.QtGui import QPixmap, QColor, QFont
 from services.client_service import ClientService
 from core import schemas
-from typing import List, Optional
+from core.data_loader import data_loader
+from core.row_views import ensure_model
+from typing import Dict, List, Optional
 
 from ui.client_editor_dialog import ClientEditorDialog
+from ui.loading_overlay import LoadingOverlay
+from ui.paged_table_model import PagedTableModel, TableColumn
 from ui.styles import BUTTON_STYLES, TABLE_STYLE
 import os
 
@@ -28,8 +32,11 @@ class ClientManagerTab(QWidget):
         super().__init__(parent)
 
         self.client_service = client_service
-        self.clients_list: List[schemas.Client] = []
         self.selected_client: Optional[schemas.Client] = None
+        # ⚡ إجماليات العملاء (بتتحسب مرة مع كل تحميل) + cache صور اللوجو المصغرة
+        self.client_projects_total: Dict[str, float] = {}
+        self.client_payments_total: Dict[str, float] = {}
+        self._logo_cache: Dict[str, Optional[QPixmap]] = {}
 
         main_layout = QVBoxLayout()
         self.setLayout(main_layout)
@@ -85,12 +92,13 @@ class ClientManagerTab(QWidget):
         table_layout = QVBoxLayout()
         table_groupbox.setLayout(table_layout)
 
-        # استخدام الجدول العادي مع تفعيل الترتيب
-        self.clients_table = QTableWidget()
-        self.clients_table.setColumnCount(8)
-        self.clients_table.setHorizontalHeaderLabels(["اللوجو", "الاسم", "الشركة", "الهاتف", "الإيميل", "💰 إجمالي المشاريع", "✅ إجمالي المدفوعات", "الحالة"])
+        # ⚡ جدول بموديل بيتحمل صفحة صفحة (keyset) بدل QTableWidgetItem لكل خلية
+        self.clients_model = PagedTableModel(self._build_columns(), self._fetch_clients_page, parent=self)
+        self.clients_table = QTableView()
+        self.clients_table.setModel(self.clients_model)
         
-        # ⚡ تفعيل الترتيب بالضغط على رأس العمود
+        # ⚡ تفعيل الترتيب بالضغط على رأس العمود (من غير ترتيب مبدئي)
+        self.clients_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self.clients_table.setSortingEnabled(True)
         
         # === UNIVERSAL SEARCH BAR ===
@@ -102,9 +110,9 @@ class ClientManagerTab(QWidget):
         table_layout.addWidget(self.search_bar)
         # === END SEARCH BAR ===
         
-        self.clients_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.clients_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.clients_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.clients_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.clients_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.clients_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.clients_table.setAlternatingRowColors(True)
         self.clients_table.verticalHeader().setDefaultSectionSize(70)  # ⚡ ارتفاع الصفوف (تم تكبيره)
         self.clients_table.verticalHeader().setVisible(False)
@@ -119,14 +127,17 @@ class ClientManagerTab(QWidget):
         self.clients_table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
         self.clients_table.setColumnWidth(6, 150)
         self.clients_table.horizontalHeader().setSectionResizeMode(7, QHeaderView.ResizeMode.Stretch)
-        self.clients_table.itemSelectionChanged.connect(self.on_client_selection_changed)
+        self.clients_table.selectionModel().selectionChanged.connect(self.on_client_selection_changed)
         
         # إضافة دبل كليك للتعديل
-        self.clients_table.itemDoubleClicked.connect(self.open_editor_for_selected)
+        self.clients_table.doubleClicked.connect(self.open_editor_for_selected)
 
         table_layout.addWidget(self.clients_table)
         main_layout.addWidget(table_groupbox, 1)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
         # ⚡ تحميل البيانات بعد ظهور النافذة (لتجنب التجميد)
         # self.load_clients_data() - يتم استدعاؤها من MainWindow
         self.update_buttons_state(False)
@@ -145,14 +156,16 @@ class ClientManagerTab(QWidget):
                 QMessageBox.warning(self, "خدمة التصدير غير متوفرة", "يرجى تثبيت pandas: pip install pandas openpyxl")
                 return
             
-            # تصدير العملاء
-            filepath = export_service.export_clients_to_excel(self.clients_list)
+            # تصدير العملاء (كل الصفحات - مش الظاهرة بس)
+            self.clients_model.fetch_all()
+            clients = [ensure_model(client) for client in self.clients_model.rows]
+            filepath = export_service.export_clients_to_excel(clients)
             
             if filepath:
                 reply = QMessageBox.question(
                     self,
                     "تم التصدير",
-                    f"تم تصدير {len(self.clients_list)} عميل بنجاح إلى:\n{filepath}\n\nهل تريد فتح الملف؟",
+                    f"تم تصدير {len(clients)} عميل بنجاح إلى:\n{filepath}\n\nهل تريد فتح الملف؟",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 
@@ -243,167 +256,115 @@ class ClientManagerTab(QWidget):
     def update_buttons_state(self, has_selection: bool):
         self.edit_button.setEnabled(has_selection)
 
-    def on_client_selection_changed(self):
-        selected_rows = self.clients_table.selectedIndexes()
+    def on_client_selection_changed(self, *args):
+        selected_rows = self.clients_table.selectionModel().selectedRows()
         if selected_rows:
-            selected_index = selected_rows[0].row()
-            if 0 <= selected_index < len(self.clients_list):
-                self.selected_client = self.clients_list[selected_index]
+            # ⚡ الصف من الـ index نفسه (الجدول بيتعرض من خلال proxy البحث)
+            client = selected_rows[0].data(Qt.ItemDataRole.UserRole)
+            if client is not None:
+                self.selected_client = client
                 self.update_buttons_state(True)
                 return
         self.selected_client = None
         self.update_buttons_state(False)
 
     def load_clients_data(self):
-        """⚡ تحميل بيانات العملاء بشكل محسّن للسرعة"""
+        """⚡ تحميل بيانات العملاء في الخلفية (الإجماليات + أول صفحة) - الجدول بيتحدث لما النتيجة توصل"""
         print("INFO: [ClientManager] جاري تحميل بيانات العملاء...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
-        try:
-            if self.show_archived_checkbox.isChecked():
-                self.clients_list = self.client_service.get_archived_clients()
-            else:
-                self.clients_list = self.client_service.get_all_clients()
+        archived = self.show_archived_checkbox.isChecked()
+        self.loading_overlay.show_loading("جاري تحميل العملاء...")
+        data_loader.load(
+            key=("ClientManager", archived),
+            fetch=lambda token: self._fetch_clients_data(archived, token),
+            on_result=self._apply_clients_data,
+            on_error=lambda e: print(f"ERROR: [ClientManager] فشل تحميل العملاء: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+            group="ClientManager",
+        )
 
-            # ⚡ تعطيل الترتيب مؤقتاً أثناء التحميل (للسرعة)
-            self.clients_table.setSortingEnabled(False)
-            self.clients_table.setRowCount(0)
+    def _fetch_clients_data(self, archived: bool, token):
+        """(في الخلفية) إجماليات كل عميل بـ SQL مباشر + أول صفحة من العملاء"""
+        repo = self.client_service.repo
+        projects_total, payments_total = repo.get_client_totals()
+        print(f"INFO: [ClientManager] === إجماليات العملاء ===")
+        print(f"INFO: [ClientManager] مشاريع: {len(projects_total)} عميل")
+        print(f"INFO: [ClientManager] مدفوعات: {len(payments_total)} عميل")
+        token.raise_if_cancelled()
+        first_page = self._fetch_clients_page(None, self.clients_model.page_size, archived=archived)
+        return projects_total, payments_total, first_page
+
+    def _apply_clients_data(self, result):
+        """عرض نتيجة _fetch_clients_data (في الـ UI thread)"""
+        projects_total, payments_total, (rows, after) = result
+        self.client_projects_total = projects_total
+        self.client_payments_total = payments_total
+
+        # ⚡ أول صفحة بس - الباقي بيتحمل لما الجدول يوصل لآخره (fetchMore)
+        self.clients_model.set_first_page(rows, after)
+        print(f"INFO: [ClientManager] تم جلب {self.clients_model.rowCount()} عميل (أول صفحة).")
 
-            # ⚡ حساب الإجماليات بدون جلب كل الفواتير (استعلام SQL مباشر محسّن)
-            client_invoices_total = {}
-            client_payments_total = {}
-            
-            try:
-                # ⚡ استعلام لحساب إجمالي المشاريع (total_amount) لكل عميل
-                # نأخذ أحدث قيمة لكل مشروع بناءً على last_modified
-                self.client_service.repo.sqlite_cursor.execute("""
-                    SELECT client_id, SUM(total_amount) as total_projects
-                    FROM (
-                        SELECT p1._mongo_id, p1.client_id, p1.total_amount
-                        FROM projects p1
-                        INNER JOIN (
-                            SELECT _mongo_id, MAX(last_modified) as max_date
-                            FROM projects
-                            WHERE _mongo_id IS NOT NULL AND _mongo_id != ''
-                            GROUP BY _mongo_id
-                        ) p2 ON p1._mongo_id = p2._mongo_id AND p1.last_modified = p2.max_date
-                        WHERE p1.status != 'مؤرشف' AND p1.status != 'ملغي'
-                        GROUP BY p1._mongo_id
-                    )
-                    GROUP BY client_id
-                """)
-                client_projects_total = {str(row[0]): float(row[1]) if row[1] else 0.0 
-                                        for row in self.client_service.repo.sqlite_cursor.fetchall()}
-                
-                # ⚡ استعلام لحساب إجمالي المدفوعات لكل عميل من جدول الدفعات
-                # نأخذ أحدث قيمة لكل دفعة بناءً على last_modified
-                self.client_service.repo.sqlite_cursor.execute("""
-                    SELECT client_id, SUM(amount) as total_paid
-                    FROM (
-                        SELECT p1._mongo_id, p1.client_id, p1.amount
-                        FROM payments p1
-                        INNER JOIN (
-                            SELECT _mongo_id, MAX(last_modified) as max_date
-                            FROM payments
-                            WHERE _mongo_id IS NOT NULL AND _mongo_id != ''
-                            GROUP BY _mongo_id
-                        ) p2 ON p1._mongo_id = p2._mongo_id AND p1.last_modified = p2.max_date
-                        WHERE p1.client_id IS NOT NULL AND p1.client_id != ''
-                        GROUP BY p1._mongo_id
-                    )
-                    GROUP BY client_id
-                """)
-                client_payments_total = {str(row[0]): float(row[1]) if row[1] else 0.0 
-                                        for row in self.client_service.repo.sqlite_cursor.fetchall()}
-                
-                # استخدام client_projects_total
-                client_invoices_total = client_projects_total
-                
-                print(f"INFO: [ClientManager] === إجماليات العملاء ===")
-                print(f"INFO: [ClientManager] مشاريع: {len(client_invoices_total)} عميل")
-                print(f"INFO: [ClientManager] مدفوعات: {len(client_payments_total)} عميل")
-                for name, total in client_invoices_total.items():
-                    print(f"  📄 {name}: مشاريع={total:,.0f}, مدفوعات={client_payments_total.get(name, 0):,.0f}")
-            except Exception as e:
-                print(f"ERROR: فشل حساب الإجماليات: {e}")
-                import traceback
-                traceback.print_exc()
-
-            for index, client in enumerate(self.clients_list):
-                self.clients_table.insertRow(index)
-
-                logo_label = QLabel()
-                logo_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                if client.logo_path and os.path.exists(client.logo_path):
-                    pixmap = QPixmap(client.logo_path)
-                    scaled_pixmap = pixmap.scaled(
-                        QSize(50, 50),
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    logo_label.setPixmap(scaled_pixmap)
-                else:
-                    logo_label.setText("🚫")
-                    logo_label.setStyleSheet("font-size: 20px; color: #888;")
-
-                self.clients_table.setCellWidget(index, 0, logo_label)
-
-                self.clients_table.setItem(index, 1, QTableWidgetItem(client.name or ""))
-                self.clients_table.setItem(index, 2, QTableWidgetItem(client.company_name or ""))
-                self.clients_table.setItem(index, 3, QTableWidgetItem(client.phone or ""))
-                self.clients_table.setItem(index, 4, QTableWidgetItem(client.email or ""))
-
-                # ⚡ جلب إجماليات العميل - client_id في المشاريع = اسم العميل
-                client_name = client.name
-                
-                # البحث بالاسم أولاً (الطريقة الأساسية)
-                total_invoices = client_invoices_total.get(client_name, 0.0)
-                total_payments = client_payments_total.get(client_name, 0.0)
-                
-                # عرض إجمالي الفواتير (المبلغ الإجمالي)
-                total_item = QTableWidgetItem(f"{total_invoices:,.0f} ج.م")
-                total_item.setData(Qt.ItemDataRole.UserRole, total_invoices)  # ⚡ للترتيب الرقمي
-                total_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                total_item.setForeground(QColor("#2454a5"))
-                total_item.setFont(QFont("Cairo", 10, QFont.Weight.Bold))
-                self.clients_table.setItem(index, 5, total_item)
-
-                # عرض إجمالي المدفوعات
-                payment_item = QTableWidgetItem(f"{total_payments:,.0f} ج.م")
-                payment_item.setData(Qt.ItemDataRole.UserRole, total_payments)  # ⚡ للترتيب الرقمي
-                payment_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                payment_item.setForeground(QColor("#00a876"))
-                payment_item.setFont(QFont("Cairo", 10, QFont.Weight.Bold))
-                self.clients_table.setItem(index, 6, payment_item)
-
-                status_item = QTableWidgetItem(client.status.value)
-                try:
-                    if client.status == schemas.ClientStatus.ARCHIVED:
-                        status_item.setBackground(QColor("#ef4444"))
-                        status_item.setForeground(QColor("white"))
-                    else:
-                        status_item.setBackground(QColor("#0A6CF1"))
-                        status_item.setForeground(QColor("white"))
-                except Exception as e:
-                    print(f"WARNING: فشل تعيين لون الخلفية: {e}")
-                status_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.clients_table.setItem(index, 7, status_item)
-
-            print(f"INFO: [ClientManager] تم جلب {len(self.clients_list)} عميل.")
-            
-            # ⚡ إعادة تفعيل الترتيب بعد التحميل
-            self.clients_table.setSortingEnabled(True)
-            
-            self.selected_client = None
-            self.update_buttons_state(False)
+        self.selected_client = None
+        self.update_buttons_state(False)
 
-        except Exception as e:
-            print(f"ERROR: [ClientManager] فشل تحميل العملاء: {e}")
-            # ⚡ إعادة تفعيل الترتيب حتى في حالة الخطأ
-            self.clients_table.setSortingEnabled(True)
+    def _fetch_clients_page(self, after, limit, archived: Optional[bool] = None):
+        """صفحة من العملاء النشطين أو المؤرشفين (حسب الـ checkbox لو archived مش متحدد)"""
+        if archived is None:
+            archived = self.show_archived_checkbox.isChecked()
+        status = schemas.ClientStatus.ARCHIVED if archived else schemas.ClientStatus.ACTIVE
+        return self.client_service.repo.get_clients_page(after=after, limit=limit, status=status)
+
+    def _client_logo(self, client) -> Optional[QPixmap]:
+        """اللوجو المصغر (بيتحمل من الملف مرة واحدة لكل مسار)"""
+        path = client.logo_path
+        if not path:
+            return None
+        if path not in self._logo_cache:
+            pixmap = None
+            if os.path.exists(path):
+                pixmap = QPixmap(path).scaled(
+                    QSize(50, 50),
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+            self._logo_cache[path] = pixmap
+        return self._logo_cache[path]
+
+    def _build_columns(self) -> List[TableColumn]:
+        """أعمدة جدول العملاء (⚡ إجماليات العميل بالاسم - client_id في المشاريع = اسم العميل)"""
+        center = Qt.AlignmentFlag.AlignCenter
+        bold_font = QFont("Cairo", 10, QFont.Weight.Bold)
+
+        def status_background(client):
+            if client.status == schemas.ClientStatus.ARCHIVED:
+                return QColor("#ef4444")
+            return QColor("#0A6CF1")
+
+        return [
+            TableColumn(
+                "اللوجو", lambda client, _: "" if self._client_logo(client) else "🚫",
+                alignment=center, foreground=QColor("#888"), decoration=self._client_logo,
+            ),
+            TableColumn("الاسم", lambda client, _: client.name or ""),
+            TableColumn("الشركة", lambda client, _: client.company_name or ""),
+            TableColumn("الهاتف", lambda client, _: client.phone or ""),
+            TableColumn("الإيميل", lambda client, _: client.email or ""),
+            TableColumn(
+                "💰 إجمالي المشاريع",
+                lambda client, _: f"{self.client_projects_total.get(client.name, 0.0):,.0f} ج.م",
+                alignment=center, foreground=QColor("#2454a5"), font=bold_font,
+                sort_key=lambda client: self.client_projects_total.get(client.name, 0.0),  # ⚡ للترتيب الرقمي
+            ),
+            TableColumn(
+                "✅ إجمالي المدفوعات",
+                lambda client, _: f"{self.client_payments_total.get(client.name, 0.0):,.0f} ج.م",
+                alignment=center, foreground=QColor("#00a876"), font=bold_font,
+                sort_key=lambda client: self.client_payments_total.get(client.name, 0.0),
+            ),
+            TableColumn(
+                "الحالة", lambda client, _: client.status.value,
+                alignment=center, foreground=QColor("white"), background=status_background,
+            ),
+        ]
 
     def _on_clients_changed(self):
         """⚡ استجابة لإشارة تحديث العملاء - تحديث الجدول أوتوماتيك"""
@@ -413,7 +374,7 @@ class ClientManagerTab(QWidget):
     def open_editor(self, client_to_edit: Optional[schemas.Client]):
         dialog = ClientEditorDialog(
             client_service=self.client_service,
-            client_to_edit=client_to_edit,
+            client_to_edit=ensure_model(client_to_edit),
             parent=self
         )
         if dialog.exec() == QDialog.DialogCode.Accepted:
@@ -4,6 +4,8 @@ from PyQt6.QtGui import QFont
 
 from services.accounting_service import AccountingService
 from core.signals import app_signals
+from core.data_loader import data_loader
+from ui.loading_overlay import LoadingOverlay
 
 
 class DashboardTab(QWidget):
@@ -78,6 +80,9 @@ class DashboardTab(QWidget):
         main_layout.addLayout(grid_layout)
         main_layout.addStretch()
         
+        # ⚡ overlay التحميل (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+        
         # ⚡ تحميل البيانات بعد ظهور النافذة (لتجنب التجميد)
         # self.refresh_data() - تم نقله لـ QTimer.singleShot في MainWindow
 
@@ -115,23 +120,24 @@ class DashboardTab(QWidget):
     def refresh_data(self):
         """
         (جديدة) تجلب الأرقام من الـ Service وتحدّث الكروت
+        ⚡ الحساب في الخلفية (data_loader) - الكروت بتتحدث لما النتيجة توصل
         """
         print("INFO: [Dashboard] جاري تحديث أرقام الداشبورد...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
-        try:
-            kpis = self.accounting_service.get_dashboard_kpis()
-
-            self.update_card_value(self.collected_card, kpis.get("total_collected", 0))
-            self.update_card_value(self.outstanding_card, kpis.get("total_outstanding", 0))
-            self.update_card_value(self.expenses_card, kpis.get("total_expenses", 0))
-            self.update_card_value(self.net_profit_card, kpis.get("net_profit_cash", 0))
+        self.loading_overlay.show_loading("جاري تحديث الأرقام...")
+        data_loader.load(
+            key="Dashboard.kpis",
+            fetch=lambda token: self.accounting_service.get_dashboard_kpis(),
+            on_result=self._apply_kpis,
+            on_error=lambda e: print(f"ERROR: [Dashboard] فشل تحديث الأرقام: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+        )
 
-        except Exception as e:
-            print(f"ERROR: [Dashboard] فشل تحديث الأرقام: {e}")
+    def _apply_kpis(self, kpis: dict):
+        """تحديث الكروت بنتيجة get_dashboard_kpis (في الـ UI thread)"""
+        self.update_card_value(self.collected_card, kpis.get("total_collected", 0))
+        self.update_card_value(self.outstanding_card, kpis.get("total_outstanding", 0))
+        self.update_card_value(self.expenses_card, kpis.get("total_expenses", 0))
+        self.update_card_value(self.net_profit_card, kpis.get("net_profit_cash", 0))
 
     def update_card_value(self, card: QFrame, value: float):
         """ (جديدة) دالة مساعدة لتحديث الرقم جوه الكارت """
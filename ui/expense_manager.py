@@ -14,10 +14,13 @@ from services.expense_service import ExpenseService
 from services.accounting_service import AccountingService
 from services.project_service import ProjectService
 from core import schemas
+from core.data_loader import data_loader
+from core.row_views import ensure_model
 from typing import List, Optional
 
 from ui.styles import BUTTON_STYLES
 from ui.expense_editor_dialog import ExpenseEditorDialog
+from ui.loading_overlay import LoadingOverlay
 
 
 class ExpenseManagerTab(QWidget):
@@ -113,16 +116,26 @@ class ExpenseManagerTab(QWidget):
         self.total_label.setStyleSheet("color: #ef4444; padding: 10px;")
         layout.addWidget(self.total_label, 0, Qt.AlignmentFlag.AlignRight)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
     def load_expenses_data(self):
-        """تحميل المصروفات"""
+        """⚡ تحميل المصروفات في الخلفية - الجدول بيتملي لما النتيجة توصل"""
         print("INFO: [ExpenseManager] جاري تحميل المصروفات...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
+        self.loading_overlay.show_loading("جاري تحميل المصروفات...")
+        data_loader.load(
+            key="ExpenseManager",
+            # ⚡ row views: الجدول بيقرا 5 حقول بس - مفيش validation لكل صف
+            fetch=lambda token: self.expense_service.get_all_expenses(as_views=True),
+            on_result=self._apply_expenses,
+            on_error=lambda e: print(f"ERROR: [ExpenseManager] فشل تحميل المصروفات: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+        )
+
+    def _apply_expenses(self, expenses: list):
+        """ملء جدول المصروفات (في الـ UI thread)"""
         try:
-            self.expenses_list = self.expense_service.get_all_expenses()
+            self.expenses_list = expenses
             self.expenses_table.setRowCount(0)
 
             total_sum = 0.0
@@ -198,7 +211,7 @@ class ExpenseManagerTab(QWidget):
             expense_service=self.expense_service,
             accounting_service=self.accounting_service,
             project_service=self.project_service,
-            expense_to_edit=selected_expense,
+            expense_to_edit=ensure_model(selected_expense),
             parent=self
         )
         if dialog.exec() == QDialog.DialogCode.Accepted:
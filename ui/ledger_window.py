@@ -286,20 +286,17 @@ class LedgerWindow(QDialog):
             start_datetime = datetime.combine(start_date, datetime.min.time())
             end_datetime = datetime.combine(end_date, datetime.max.time())
             
-            # جلب جميع القيود المحاسبية
-            all_entries = self.accounting_service.repo.get_all_journal_entries()
+            # ⚡ جلب قيود الحساب في الفترة فقط (الفلترة على السيرفر/SQLite)
+            entries = self.accounting_service.repo.get_journal_entries(
+                start_datetime, end_datetime, account_codes=[self.account.code]
+            )
             
-            # فلترة القيود حسب الحساب والفترة
             movements = []
             running_balance = 0.0
             
-            for entry in all_entries:
+            for entry in entries:
                 entry_date = entry.date
                 
-                # التحقق من الفترة
-                if entry_date < start_datetime or entry_date > end_datetime:
-                    continue
-                
                 # البحث عن بنود تخص هذا الحساب
                 for line in entry.lines:
                     acc_code = line.account_code or line.account_id
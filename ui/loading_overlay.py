@@ -4,6 +4,8 @@
 تظهر أثناء تحميل البيانات مع تأثير بصري احترافي
 """
 
+from typing import Optional
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QGraphicsOpacityEffect
 )
@@ -26,6 +28,10 @@ class SpinnerWidget(QWidget):
         self.timer.timeout.connect(self.rotate)
         self.timer.start(50)
     
+    def start(self):
+        if not self.timer.isActive():
+            self.timer.start(50)
+    
     def rotate(self):
         self.angle = (self.angle + 10) % 360
         self.update()
@@ -58,7 +64,12 @@ class LoadingOverlay(QWidget):
     تغطي النافذة بالكامل مع شعار ورسالة تحميل
     """
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, start_hidden: bool = False):
+        """
+        Args:
+            parent: الـ widget اللي الـ overlay بيغطيه
+            start_hidden: يفضل مستخبي لحد show_loading() (overlay التابات)
+        """
         super().__init__(parent)
         self.setObjectName("loadingOverlay")
         
@@ -75,6 +86,15 @@ class LoadingOverlay(QWidget):
         self.init_ui()
         self.setup_animation()
         
+        # ⚡ مؤقت الظهور المتأخر (show_loading) - التحميل السريع مبيظهرش overlay خالص
+        self._show_timer = QTimer(self)
+        self._show_timer.setSingleShot(True)
+        self._show_timer.timeout.connect(self._show_now)
+        
+        if start_hidden:
+            self.spinner.stop()
+            self.hide()
+        
         print("INFO: [LoadingOverlay] تم إنشاء شاشة التحميل")
     
     def init_ui(self):
@@ -131,6 +151,30 @@ class LoadingOverlay(QWidget):
         """تغيير رسالة التحميل"""
         self.message_label.setText(message)
     
+    def show_loading(self, message: Optional[str] = None, delay_ms: int = 250):
+        """
+        ⚡ إظهار الـ overlay فوق الأب أثناء تحميل في الخلفية
+        بيظهر بعد delay_ms بس لو التحميل لسه مخلصش (عشان ميرمشش مع التحميل السريع)
+        """
+        if message:
+            self.set_message(message)
+        if self.isVisible() and self.fade_animation.state() != QPropertyAnimation.State.Running:
+            return
+        self._show_timer.start(max(0, delay_ms))
+    
+    def hide_loading(self):
+        """إخفاء الـ overlay بعد ما التحميل يخلص (لو ملحقش يظهر مبيظهرش)"""
+        self._show_timer.stop()
+        if self.isVisible():
+            self.fade_out()
+    
+    def _show_now(self):
+        self.fade_animation.stop()
+        self.opacity_effect.setOpacity(1.0)
+        self.spinner.start()
+        self.show()
+        self.raise_()
+    
     def fade_out(self):
         """بدء حركة الاختفاء"""
         print("INFO: [LoadingOverlay] بدء إخفاء شاشة التحميل...")
@@ -148,6 +192,11 @@ class LoadingOverlay(QWidget):
             # ✅ تغطية الأب فقط (التابات) وليس النافذة الرئيسية
             self.setGeometry(0, 0, self.parent().width(), self.parent().height())
     
+    def hideEvent(self, event):
+        """⚡ وقف الـ spinner وهو مستخبي"""
+        super().hideEvent(event)
+        self.spinner.stop()
+    
     def showEvent(self, event):
         """عند الظهور"""
         super().showEvent(event)
@@ -19,20 +19,15 @@ from services.project_service import ProjectService
 # (تم مسح PaymentService لأنه بقى جوه ProjectService)
 
 # (استيراد التابات الجديدة)
+# ⚡ الرئيسية بس بتتعمل import دلوقتي - باقي التابات (والموديولات بتاعتها) أول ما تتفتح
 from ui.dashboard_tab import DashboardTab
-from ui.project_manager import ProjectManagerTab
-from ui.quotation_manager import QuotationManagerTab
-from ui.client_manager import ClientManagerTab
-from ui.service_manager import ServiceManagerTab
-from ui.accounting_manager import AccountingManagerTab  # (التاب الجديد أبو تابات داخلية)
-from ui.expense_manager import ExpenseManagerTab  # (التاب الجديد بتاع المصروفات)
-from ui.payments_manager import PaymentsManagerTab  # (الجديد) تاب الدفعات
-from ui.settings_tab import SettingsTab
 from ui.notification_widget import NotificationWidget  # (الجديد) ويدجت الإشعارات
 from ui.shortcuts_help_dialog import ShortcutsHelpDialog  # (الجديد) نافذة مساعدة الاختصارات
 from ui.loading_overlay import LoadingOverlay  # (الجديد) شاشة التحميل
-from core.sync_manager import SyncManager  # (الجديد) مدير المزامنة
+from core.sync_engine import SyncEngine  # محرك المزامنة الموحّد
 from core.keyboard_shortcuts import KeyboardShortcutManager  # (الجديد) مدير الاختصارات
+from core.performance import startup_trace
+from core.speed_optimizer import LazyService
 from services.notification_service import NotificationService  # (الجديد) خدمة الإشعارات
 from PyQt6.QtCore import QTimer
 
@@ -53,11 +48,11 @@ class MainWindow(QMainWindow):
         invoice_service: InvoiceService,
         quotation_service: QuotationService,
         project_service: ProjectService,
-        sync_manager: SyncManager = None,
+        sync_engine: SyncEngine = None,
         notification_service: NotificationService = None,
         printing_service = None,
         export_service = None,
-        advanced_sync_manager = None,
+        template_service = None,
     ):
         super().__init__()
         
@@ -77,11 +72,10 @@ class MainWindow(QMainWindow):
         self.invoice_service = invoice_service
         self.quotation_service = quotation_service
         self.project_service = project_service
-        self.sync_manager = sync_manager
+        self.sync_engine = sync_engine
         self.notification_service = notification_service
         self.printing_service = printing_service
         self.export_service = export_service
-        self.advanced_sync_manager = advanced_sync_manager
 
         role_display = current_user.role.value if hasattr(current_user.role, 'value') else str(current_user.role)
         self.setWindowTitle(f"Sky Wave ERP - {current_user.full_name or current_user.username} ({role_display})")
@@ -131,7 +125,6 @@ class MainWindow(QMainWindow):
             toolbar.addWidget(self.notification_widget)
             
             # إعداد مؤقت لفحص مواعيد استحقاق المشاريع (كل 24 ساعة)
-            from PyQt6.QtCore import QTimer
             self.project_check_timer = QTimer()
             self.project_check_timer.timeout.connect(
                 self.notification_service.check_project_due_dates
@@ -196,79 +189,32 @@ class MainWindow(QMainWindow):
             }
         """)
 
-        # --- 2. إنشاء خدمة القوالب أولاً ---
-        from services.template_service import TemplateService
-        self.template_service = TemplateService(
-            repository=self.accounting_service.repo,
-            settings_service=self.settings_service
-        )
-        
-        # تحديث template_service في printing_service إذا كان موجوداً
-        if self.printing_service:
-            self.printing_service.template_service = self.template_service
+        # --- 2. خدمة القوالب (⚡ بتتعمل أول ما مشروع يتطبع أو يتعاين) ---
+        if template_service is None:
+            from services.template_service import TemplateService
+            template_service = LazyService("TemplateService", lambda: TemplateService(
+                repository=self.accounting_service.repo,
+                settings_service=self.settings_service
+            ))
+        self.template_service = template_service
 
         # --- 3. إنشاء التابات (بالترتيب الصح) ---
-        self.dashboard_tab = DashboardTab(self.accounting_service)
+        # ⚡ الرئيسية بس بتتعمل دلوقتي - الباقي placeholder لحد أول مرة يتفتح (on_tab_changed)
+        self._lazy_tabs = {}          # placeholder -> (اسم الـ attribute, factory)
+        self._tab_placeholders = {}   # اسم الـ attribute -> placeholder
+        with startup_trace.step("DashboardTab"):
+            self.dashboard_tab = DashboardTab(self.accounting_service)
         self.tabs.insertTab(0, self.dashboard_tab, "🏠 الصفحة الرئيسية")
 
-        self.projects_tab = ProjectManagerTab(
-            self.project_service,
-            self.client_service,
-            self.service_service,
-            self.accounting_service,
-            self.printing_service,
-            template_service=self.template_service,
-        )
-        self.tabs.insertTab(1, self.projects_tab, "🚀 المشاريع")
-
-        self.quotes_tab = QuotationManagerTab(
-            self.quotation_service,
-            self.client_service,
-            self.service_service,
-            self.settings_service,
-        )
-        self.tabs.insertTab(2, self.quotes_tab, "📝 عروض الأسعار")
-
-        # (الجديد) إضافة تاب المصروفات (لوحده)
-        self.expense_tab = ExpenseManagerTab(
-            self.expense_service,
-            self.accounting_service,
-            self.project_service,
-        )
-        self.tabs.insertTab(3, self.expense_tab, "💳 المصروفات")
-
-        # (الجديد) إضافة تاب الدفعات (التحصيلات)
-        self.payments_tab = PaymentsManagerTab(
-            self.project_service,
-            self.accounting_service,
-            self.client_service,
-            current_user=self.current_user,
-        )
-        self.tabs.insertTab(4, self.payments_tab, "💰 الدفعات")
-
-        self.clients_tab = ClientManagerTab(self.client_service)
-        self.tabs.insertTab(5, self.clients_tab, "👤 العملاء")
-
-        self.services_tab = ServiceManagerTab(self.service_service)
-        self.tabs.insertTab(6, self.services_tab, "🛠️ الخدمات والباقات")
-
-        # (الجديد) إضافة تاب المحاسبة (الجديد أبو تابات داخلية)
-        self.accounting_tab = AccountingManagerTab(
-            self.expense_service,
-            self.accounting_service,
-            self.project_service,
-        )
-        self.tabs.insertTab(7, self.accounting_tab, "📊 المحاسبة")
-        
-        # (جديد) إضافة تاب إدارة المهام (TODO) - مرتبط بقاعدة البيانات
-        from ui.todo_manager import TodoManagerWidget, TaskService
-        # تمرير Repository لـ TaskService لربط المهام بقاعدة البيانات
-        TaskService.set_repository(self.accounting_service.repo)
-        self.todo_tab = TodoManagerWidget()
-        self.tabs.insertTab(8, self.todo_tab, "📋 المهام")
-        
-        self.settings_tab = SettingsTab(self.settings_service, repository=self.accounting_service.repo)
-        self.tabs.insertTab(9, self.settings_tab, "🔧 الإعدادات")
+        self._add_lazy_tab(1, "projects_tab", "🚀 المشاريع", self._create_projects_tab)
+        self._add_lazy_tab(2, "quotes_tab", "📝 عروض الأسعار", self._create_quotes_tab)
+        self._add_lazy_tab(3, "expense_tab", "💳 المصروفات", self._create_expense_tab)
+        self._add_lazy_tab(4, "payments_tab", "💰 الدفعات", self._create_payments_tab)
+        self._add_lazy_tab(5, "clients_tab", "👤 العملاء", self._create_clients_tab)
+        self._add_lazy_tab(6, "services_tab", "🛠️ الخدمات والباقات", self._create_services_tab)
+        self._add_lazy_tab(7, "accounting_tab", "📊 المحاسبة", self._create_accounting_tab)
+        self._add_lazy_tab(8, "todo_tab", "📋 المهام", self._create_todo_tab)
+        self._add_lazy_tab(9, "settings_tab", "🔧 الإعدادات", self._create_settings_tab)
 
         # تطبيق الصلاحيات حسب دور المستخدم (بعد إنشاء كل التابات)
         self.apply_permissions()
@@ -280,14 +226,22 @@ class MainWindow(QMainWindow):
         # تعيين المستخدم الحالي في شريط الحالة
         self.status_bar.set_current_user(self.current_user)
         
-        # ربط مدير المزامنة المتقدم بشريط الحالة
-        if self.advanced_sync_manager:
-            self.advanced_sync_manager.connection_status_changed.connect(
-                lambda online: self.status_bar.update_sync_status("synced" if online else "offline")
-            )
-            self.advanced_sync_manager.sync_status_changed.connect(self.status_bar.update_sync_status)
-            self.advanced_sync_manager.sync_progress.connect(self.status_bar.update_sync_progress)
-            self.advanced_sync_manager.notification_ready.connect(self.status_bar.show_notification)
+        # --- 4. إعداد المزامنة (إذا لم يتم تمريرها) ---
+        if not self.sync_engine:
+            self.sync_engine = SyncEngine(self.accounting_service.repo)
+            self.sync_engine.start()
+        
+        # ربط محرك المزامنة بشريط الحالة
+        self.sync_engine.connection_status_changed.connect(
+            lambda online: self.status_bar.update_sync_status("synced" if online else "offline")
+        )
+        self.sync_engine.sync_status_changed.connect(self.status_bar.update_sync_status)
+        self.sync_engine.circuit_state_changed.connect(
+            lambda state: self.status_bar.update_sync_status("synced" if state == "closed" else "degraded")
+        )
+        self.sync_engine.sync_progress.connect(self.status_bar.update_sync_progress)
+        self.sync_engine.notification_ready.connect(self.status_bar.show_notification)
+        self.sync_engine.sync_completed.connect(self.on_auto_sync_completed)
         
         # إنشاء container widget للـ tabs
         central_widget = QWidget()
@@ -319,25 +273,134 @@ class MainWindow(QMainWindow):
         # البيانات تحمل في الخلفية بدون الحاجة لشاشة تحميل
         self.loading_overlay = None
 
-        # --- 4. إعداد المزامنة (إذا لم يتم تمريرها) ---
-        if not self.sync_manager:
-            self.sync_manager = SyncManager(self.accounting_service.repo)
-        
-        # إعداد المزامنة التلقائية كل 10 دقائق
-        self.setup_auto_sync()
-
         # --- 4. تحميل البيانات في الخلفية ---
         self.tabs.currentChanged.connect(self.on_tab_changed)
         
         # ✅ تحميل البيانات بعد ظهور النافذة (لتجنب التجميد)
         QTimer.singleShot(500, self._load_initial_data_safely)
 
+    # --- التابات الكسولة (بتتعمل أول مرة تتفتح) ---
+
+    def _add_lazy_tab(self, index: int, attr_name: str, title: str, factory):
+        """placeholder فاضي مكان التاب لحد ما المستخدم يفتحه"""
+        placeholder = QWidget()
+        self._lazy_tabs[placeholder] = (attr_name, factory)
+        self._tab_placeholders[attr_name] = placeholder
+        self.tabs.insertTab(index, placeholder, title)
+
+    def _ensure_tab(self, index: int):
+        """التاب الحقيقي في المكان ده (لو لسه placeholder بيتعمل دلوقتي ويتحط مكانه)"""
+        placeholder = self.tabs.widget(index)
+        spec = self._lazy_tabs.pop(placeholder, None)
+        if spec is None:
+            return placeholder
+        attr_name, factory = spec
+        self._tab_placeholders.pop(attr_name, None)
+
+        with startup_trace.step(f"tab:{attr_name}") as entry:
+            tab = factory()
+        print(f"INFO: [MainWindow] تم إنشاء {type(tab).__name__} عند أول فتح ({entry['ms']:.0f}ms)")
+
+        title = self.tabs.tabText(index)
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(index)
+            self.tabs.insertTab(index, tab, title)
+            self.tabs.setCurrentIndex(index)
+        finally:
+            self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        setattr(self, attr_name, tab)
+
+        from ui.styles import apply_center_alignment_to_all_tables
+        apply_center_alignment_to_all_tables(tab)
+        return tab
+
+    def _show_tab(self, attr_name: str):
+        """فتح التاب بالاسم (وإنشاؤه لو لسه) - None لو التاب مخفي بالصلاحيات"""
+        widget = getattr(self, attr_name, None) or self._tab_placeholders.get(attr_name)
+        index = self.tabs.indexOf(widget) if widget is not None else -1
+        if index < 0:
+            return None
+        self.tabs.setCurrentIndex(index)
+        return self._ensure_tab(index)
+
+    def _create_projects_tab(self):
+        from ui.project_manager import ProjectManagerTab
+        return ProjectManagerTab(
+            self.project_service,
+            self.client_service,
+            self.service_service,
+            self.accounting_service,
+            self.printing_service,
+            template_service=self.template_service,
+        )
+
+    def _create_quotes_tab(self):
+        from ui.quotation_manager import QuotationManagerTab
+        return QuotationManagerTab(
+            self.quotation_service,
+            self.client_service,
+            self.service_service,
+            self.settings_service,
+        )
+
+    def _create_expense_tab(self):
+        # (الجديد) تاب المصروفات (لوحده)
+        from ui.expense_manager import ExpenseManagerTab
+        return ExpenseManagerTab(
+            self.expense_service,
+            self.accounting_service,
+            self.project_service,
+        )
+
+    def _create_payments_tab(self):
+        # (الجديد) تاب الدفعات (التحصيلات)
+        from ui.payments_manager import PaymentsManagerTab
+        return PaymentsManagerTab(
+            self.project_service,
+            self.accounting_service,
+            self.client_service,
+            current_user=self.current_user,
+        )
+
+    def _create_clients_tab(self):
+        from ui.client_manager import ClientManagerTab
+        return ClientManagerTab(self.client_service)
+
+    def _create_services_tab(self):
+        from ui.service_manager import ServiceManagerTab
+        return ServiceManagerTab(self.service_service)
+
+    def _create_accounting_tab(self):
+        # (الجديد) تاب المحاسبة (الجديد أبو تابات داخلية)
+        from ui.accounting_manager import AccountingManagerTab
+        return AccountingManagerTab(
+            self.expense_service,
+            self.accounting_service,
+            self.project_service,
+        )
+
+    def _create_todo_tab(self):
+        # (جديد) تاب إدارة المهام (TODO) - مرتبط بقاعدة البيانات
+        from ui.todo_manager import TodoManagerWidget, TaskService
+        # تمرير Repository لـ TaskService لربط المهام بقاعدة البيانات
+        TaskService.set_repository(self.accounting_service.repo)
+        return TodoManagerWidget()
+
+    def _create_settings_tab(self):
+        from ui.settings_tab import SettingsTab
+        return SettingsTab(self.settings_service, repository=self.accounting_service.repo)
+
     def on_tab_changed(self, index):
         """ (معدلة) بالتابات الجديدة - مع حماية من التجميد """
         try:
             tab_name = self.tabs.tabText(index)
             print(f"INFO: [MainWindow] تغيير إلى التاب: {tab_name}")
             
+            # ⚡ إنشاء التاب أول مرة يتفتح (الـ placeholder بيتبدل بالتاب الحقيقي)
+            self._ensure_tab(index)
+            
             # تأخير قصير لتجنب التجميد
             QTimer.singleShot(100, lambda: self._load_tab_data_safely(tab_name))
             
@@ -391,9 +454,8 @@ class MainWindow(QMainWindow):
         """تحميل البيانات الأولية بأمان وبدون تجميد"""
         try:
             print("INFO: [MainWindow] بدء تحميل البيانات الأولية...")
-            # تحميل بيانات الداشبورد فقط (التاب الأول)
-            if hasattr(self, 'dashboard_tab'):
-                self.dashboard_tab.refresh_data()
+            # تحميل بيانات التاب المفتوح بس (الداشبورد - أو أول تاب مسموح لو الداشبورد مخفي)
+            self.on_tab_changed(self.tabs.currentIndex())
             print("INFO: [MainWindow] تم تحميل البيانات الأولية بنجاح")
         except Exception as e:
             print(f"ERROR: فشل تحميل البيانات الأولية: {e}")
@@ -408,40 +470,23 @@ class MainWindow(QMainWindow):
         """
         self.on_tab_changed(self.tabs.currentIndex())
     
-    def setup_auto_sync(self):
-        """
-        إعداد المزامنة التلقائية في الخلفية
-        """
-        from PyQt6.QtCore import QTimer
-        
-        # مؤقت للمزامنة التلقائية كل 10 دقائق (600000 ميلي ثانية)
-        self.auto_sync_timer = QTimer(self)
-        self.auto_sync_timer.timeout.connect(self.trigger_background_sync)
-        self.auto_sync_timer.start(600000)  # 10 دقائق
-        
-        # تشغيل المزامنة فوراً عند بدء التطبيق (بعد ثانيتين)
-        QTimer.singleShot(2000, self.trigger_background_sync)
-        
-        print("INFO: تم تفعيل المزامنة التلقائية (كل 10 دقائق)")
-    
     def trigger_background_sync(self):
         """
-        تشغيل المزامنة في الخلفية
+        طلب دورة مزامنة فورية من محرك المزامنة
+        (الجدولة الدورية نفسها جوه SyncEngine)
         """
         try:
-            if not self.sync_manager:
-                print("INFO: مدير المزامنة غير متاح")
+            if not self.sync_engine:
+                print("INFO: محرك المزامنة غير متاح")
                 return
             
             # التحقق من الاتصال
-            if not self.sync_manager.repository.online:
-                print("INFO: تخطي المزامنة التلقائية (غير متصل)")
+            if not self.sync_engine.repository.online:
+                print("INFO: تخطي المزامنة (غير متصل)")
                 return
             
-            print("INFO: بدء المزامنة التلقائية في الخلفية...")
-            
-            # تشغيل المزامنة
-            self.sync_manager.start_sync()
+            print("INFO: طلب مزامنة فورية في الخلفية...")
+            self.sync_engine.request_sync()
             
         except Exception as e:
             print(f"ERROR: خطأ في المزامنة التلقائية: {e}")
@@ -451,7 +496,7 @@ class MainWindow(QMainWindow):
         معالج حدث اكتمال المزامنة التلقائية
         """
         try:
-            synced = result.get('synced', 0)
+            synced = result.get('pulled', 0) + result.get('pushed', 0)
             failed = result.get('failed', 0)
             print(f"INFO: اكتملت المزامنة التلقائية - نجح: {synced}, فشل: {failed}")
             
@@ -492,26 +537,26 @@ class MainWindow(QMainWindow):
     def _on_new_project(self):
         """معالج اختصار مشروع جديد"""
         # التبديل إلى تاب المشاريع
-        self.tabs.setCurrentIndex(1)
+        projects_tab = self._show_tab('projects_tab')
         # محاولة فتح نافذة مشروع جديد
-        if hasattr(self.projects_tab, 'on_add_project'):
-            self.projects_tab.on_add_project()
+        if hasattr(projects_tab, 'on_add_project'):
+            projects_tab.on_add_project()
     
     def _on_new_client(self):
         """معالج اختصار عميل جديد"""
         # التبديل إلى تاب العملاء
-        self.tabs.setCurrentIndex(5)
+        clients_tab = self._show_tab('clients_tab')
         # محاولة فتح نافذة عميل جديد
-        if hasattr(self.clients_tab, 'on_add_client'):
-            self.clients_tab.on_add_client()
+        if hasattr(clients_tab, 'on_add_client'):
+            clients_tab.on_add_client()
     
     def _on_new_expense(self):
         """معالج اختصار مصروف جديد"""
         # التبديل إلى تاب المصروفات
-        self.tabs.setCurrentIndex(3)
+        expense_tab = self._show_tab('expense_tab')
         # محاولة فتح نافذة مصروف جديد
-        if hasattr(self.expense_tab, 'on_add_expense'):
-            self.expense_tab.on_add_expense()
+        if hasattr(expense_tab, 'on_add_expense'):
+            expense_tab.on_add_expense()
     
     def _on_search_activated(self):
         """معالج اختصار تفعيل البحث"""
@@ -0,0 +1,184 @@
+# الملف: ui/paged_table_model.py
+"""
+⚡ موديل جدول بيتحمل صفحة صفحة (QAbstractTableModel + canFetchMore/fetchMore)
+- أول صفحة بس بتتحمل مع reload() - الباقي بيتجاب لما الـ view يوصل لآخر الصفوف
+- الصفحات جاية من Repository بـ keyset (after cursor) فكل صفحة وقتها ثابت مهما كبر الجدول
+- مفيش QTableWidgetItem لكل خلية: النص والألوان بتتحسب وقت الرسم للصفوف الظاهرة بس
+- الترتيب بالضغط على رأس العمود بيحمل الباقي الأول (الترتيب على جزء من البيانات غلط)
+
+الاستخدام:
+    model = PagedTableModel(
+        columns=[TableColumn("الاسم", lambda row, i: row.name)],
+        fetch_page=lambda after, limit: repo.get_clients_page(after=after, limit=limit),
+    )
+    table_view.setModel(model)
+    model.reload()
+
+    # أو أول صفحة في الخلفية (core.data_loader) وبعدين:
+    model.set_first_page(rows, after)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+# (after, limit) -> (صفوف, cursor الصفحة التالية أو None)
+FetchPage = Callable[[Optional[Tuple[Any, Any]], int], Tuple[list, Optional[Tuple[Any, Any]]]]
+
+
+@dataclass
+class TableColumn:
+    """
+    تعريف عمود: text(row, row_number) بيرجع النص المعروض.
+    foreground / background / decoration: قيمة ثابتة أو دالة بتاخد الصف.
+    """
+    title: str
+    text: Callable[[Any, int], str]
+    alignment: Optional[Qt.AlignmentFlag] = None
+    foreground: Any = None
+    background: Any = None
+    font: Any = None
+    decoration: Optional[Callable[[Any], Any]] = None
+    sort_key: Optional[Callable[[Any], Any]] = None  # الافتراضي: النص
+
+
+def _resolve(value, row):
+    return value(row) if callable(value) else value
+
+
+class PagedTableModel(QAbstractTableModel):
+    """موديل للقراءة بس فوق صفحات Repository (الصف الكامل متاح بـ UserRole و row_at)"""
+
+    def __init__(self, columns: List[TableColumn], fetch_page: FetchPage,
+                 page_size: int = 100, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self._rows: list = []
+        self._after: Optional[Tuple[Any, Any]] = None
+        self._exhausted = True
+        self._sort: Optional[Tuple[int, Qt.SortOrder]] = None
+
+    # --- التحميل ---
+
+    def reload(self):
+        """تحميل من الأول (أول صفحة بس - أو كل الصفوف لو المستخدم مرتب بعمود)"""
+        self._after = None
+        rows = self._fetch_next_page()
+        self.set_first_page(rows, self._after)
+
+    def set_first_page(self, rows: list, after: Optional[Tuple[Any, Any]]):
+        """
+        ⚡ عرض أول صفحة اتجابت برا الموديل (مثلاً في الخلفية بـ data_loader)
+        الصفحات اللي بعدها بتتجاب بـ fetch_page العادي مع الـ scroll
+        """
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._after = after
+        self._exhausted = after is None
+        self.endResetModel()
+        if self._sort is not None:
+            self.sort(*self._sort)
+
+    def _fetch_next_page(self) -> list:
+        try:
+            rows, after = self.fetch_page(self._after, self.page_size)
+        except Exception as e:
+            print(f"ERROR: [PagedTableModel] فشل تحميل صفحة: {e}")
+            rows, after = [], None
+        self._after = after
+        self._exhausted = after is None
+        return rows
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        first = len(self._rows)
+        rows = self._fetch_next_page()
+        if rows:
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._rows.extend(rows)
+            self.endInsertRows()
+
+    def fetch_all(self):
+        """تحميل كل الصفحات الباقية (للترتيب والبحث والتصدير)"""
+        while self.canFetchMore():
+            self.fetchMore()
+
+    # --- الوصول للصفوف ---
+
+    @property
+    def rows(self) -> list:
+        """الصفوف اللي اتحملت لحد دلوقتي"""
+        return self._rows
+
+    def row_at(self, row: int) -> Optional[Any]:
+        if 0 <= row < len(self._rows):
+            return self._rows[row]
+        return None
+
+    # --- QAbstractTableModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if (role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal
+                and 0 <= section < len(self.columns)):
+            return self.columns[section].title
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = self.columns[index.column()]
+        try:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return column.text(row, index.row())
+            if role == Qt.ItemDataRole.UserRole:
+                return row
+            if role == Qt.ItemDataRole.TextAlignmentRole and column.alignment is not None:
+                return column.alignment
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return _resolve(column.foreground, row)
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return _resolve(column.background, row)
+            if role == Qt.ItemDataRole.FontRole:
+                return column.font
+            if role == Qt.ItemDataRole.DecorationRole and column.decoration is not None:
+                return column.decoration(row)
+        except Exception as e:
+            print(f"WARNING: [PagedTableModel] فشل عرض خلية ({index.row()}, {index.column()}): {e}")
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        if not 0 <= column < len(self.columns):
+            return
+        self._sort = (column, order)
+        self.fetch_all()
+        spec = self.columns[column]
+        if spec.sort_key is not None:
+            key = spec.sort_key
+        else:
+            key = lambda row: spec.text(row, 0) or ""
+
+        self.layoutAboutToBeChanged.emit()
+        # الـ selection بيفضل على نفس الصف بعد الترتيب
+        persistent = self.persistentIndexList()
+        persistent_rows = [self._rows[index.row()] for index in persistent]
+        self._rows.sort(key=key, reverse=order == Qt.SortOrder.DescendingOrder)
+        positions = {id(row): number for number, row in enumerate(self._rows)}
+        self.changePersistentIndexList(persistent, [
+            self.index(positions[id(row)], index.column())
+            for row, index in zip(persistent_rows, persistent)
+        ])
+        self.layoutChanged.emit()
@@ -4,7 +4,7 @@
 """
 
 from PyQt6.QtWidgets import (
-    QWidget, QHBoxLayout, QVBoxLayout, QTableWidget, QTableWidgetItem,
+    QWidget, QHBoxLayout, QVBoxLayout, QTableView, QAbstractItemView,
     QHeaderView, QPushButton, QLabel, QMessageBox, QDialog,
     QFormLayout, QComboBox, QDateEdit, QTextEdit
 )
@@ -16,8 +16,12 @@ from services.project_service import ProjectService
 from services.accounting_service import AccountingService
 from services.client_service import ClientService
 from core import schemas
+from core.data_loader import data_loader
+from core.row_views import ensure_model
 from typing import List, Optional
 
+from ui.loading_overlay import LoadingOverlay
+from ui.paged_table_model import PagedTableModel, TableColumn
 from ui.styles import BUTTON_STYLES, TABLE_STYLE_DARK
 
 
@@ -243,8 +247,9 @@ class PaymentsManagerTab(QWidget):
         self.client_service = client_service
         self.current_user = current_user
 
-        self.payments_list: List[schemas.Payment] = []
-        self.clients_cache = {}  # cache للعملاء
+        self.clients_cache = {}  # cache للعملاء (بالاسم والـ mongo_id والـ id)
+        self.accounts_cache = {}  # cache للحسابات بالكود
+        self.projects_cache = {}  # cache للمشاريع بالاسم
 
         self.setup_ui()
         self.apply_permissions()
@@ -282,12 +287,14 @@ class PaymentsManagerTab(QWidget):
         buttons_layout.addStretch()
         layout.addLayout(buttons_layout)
 
-        # جدول الدفعات
-        self.payments_table = QTableWidget()
-        self.payments_table.setColumnCount(7)
-        self.payments_table.setHorizontalHeaderLabels([
-            "#", "التاريخ", "النوع", "العميل/المشروع", "المبلغ", "طريقة الدفع", "الحساب"
-        ])
+        # جدول الدفعات (⚡ موديل بيتحمل صفحة صفحة بدل QTableWidgetItem لكل خلية)
+        self.payments_model = PagedTableModel(
+            self._build_columns(),
+            lambda after, limit: self.accounting_service.repo.get_payments_page(after=after, limit=limit),
+            parent=self,
+        )
+        self.payments_table = QTableView()
+        self.payments_table.setModel(self.payments_model)
         
         # === UNIVERSAL SEARCH BAR ===
         from ui.universal_search import UniversalSearchBar
@@ -300,15 +307,15 @@ class PaymentsManagerTab(QWidget):
         
         self.payments_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.payments_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
-        self.payments_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.payments_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.payments_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.payments_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.payments_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.payments_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.payments_table.setAlternatingRowColors(True)
-        self.payments_table.verticalHeader().setDefaultSectionSize(45)  # ⚡ ارتفاع الصفوف
+        self.payments_table.verticalHeader().setDefaultSectionSize(40)  # ⚡ ارتفاع الصفوف
         self.payments_table.verticalHeader().setVisible(False)
         
         # ربط الدبل كليك
-        self.payments_table.itemDoubleClicked.connect(self.open_edit_dialog)
+        self.payments_table.doubleClicked.connect(self.open_edit_dialog)
         
         self.payments_table.setStyleSheet(TABLE_STYLE_DARK)
         layout.addWidget(self.payments_table)
@@ -319,124 +326,115 @@ class PaymentsManagerTab(QWidget):
         self.total_label.setStyleSheet("color: #0A6CF1; padding: 10px;")
         layout.addWidget(self.total_label, 0, Qt.AlignmentFlag.AlignRight)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
     def load_payments_data(self):
-        """تحميل جميع الدفعات"""
+        """⚡ تحميل الدفعات في الخلفية (الـ caches + أول صفحة + الإجمالي) - الجدول بيتحدث لما النتيجة توصل"""
         print("INFO: [PaymentsManager] جاري تحميل الدفعات...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
-        try:
-            # تحميل الدفعات
-            self.payments_list = self.accounting_service.repo.get_all_payments()
-            
-            # تحميل الحسابات للـ cache (لعرض الأسماء بدل الأكواد)
-            all_accounts = self.accounting_service.repo.get_all_accounts()
-            accounts_cache = {acc.code: acc for acc in all_accounts}
-            
-            # تحميل المشاريع للـ cache (لعرض أسماء العملاء)
-            all_projects = self.project_service.get_all_projects()
-            projects_cache = {proj.name: proj for proj in all_projects}
-            
-            # تحميل العملاء للـ cache
-            clients = self.client_service.get_all_clients()
-            clients_cache = {}
-            for c in clients:
-                # إضافة العميل بكل الطرق الممكنة للبحث
-                clients_cache[c.name] = c  # بالاسم
-                if c._mongo_id:
-                    clients_cache[c._mongo_id] = c  # بالـ mongo_id
-                if c.id:
-                    clients_cache[str(c.id)] = c  # بالـ id
-
-            self.payments_table.setRowCount(0)
-            total_sum = 0.0
-
-            for i, payment in enumerate(self.payments_list):
-                self.payments_table.insertRow(i)
-
-                # الرقم
-                num_item = QTableWidgetItem(str(i + 1))
-                num_item.setData(Qt.ItemDataRole.UserRole, payment)
-                num_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.payments_table.setItem(i, 0, num_item)
-
-                # التاريخ
-                date_str = payment.date.strftime("%Y-%m-%d") if payment.date else ""
-                date_item = QTableWidgetItem(date_str)
-                date_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.payments_table.setItem(i, 1, date_item)
-
-                # النوع (دائماً تحصيل/وارد للدفعات)
-                type_item = QTableWidgetItem("💰 وارد")
-                type_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                type_item.setForeground(QColor("#0A6CF1"))
-                self.payments_table.setItem(i, 2, type_item)
-
-                # العميل/المشروع - عرض اسم العميل الحقيقي واسم المشروع
-                entity_text = "---"
-                client_name = "عميل غير محدد"
-                project_name = payment.project_id or "مشروع غير محدد"
-                
-                # البحث عن المشروع
-                if payment.project_id and payment.project_id in projects_cache:
-                    project = projects_cache[payment.project_id]
-                    project_name = project.name  # اسم المشروع الحقيقي
-                    
-                    # البحث عن العميل
-                    client_id = project.client_id
-                    if client_id and client_id in clients_cache:
-                        client_name = clients_cache[client_id].name
-                    elif client_id:
-                        # محاولة البحث بطرق أخرى
-                        for client in clients_cache.values():
-                            if (client._mongo_id == client_id or 
-                                str(client.id) == client_id or 
-                                client.name == client_id):
-                                client_name = client.name
-                                break
-                
-                entity_text = f"{client_name} - {project_name}"
-                
-                entity_item = QTableWidgetItem(entity_text)
-                entity_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.payments_table.setItem(i, 3, entity_item)
-
-                # المبلغ
-                amount_item = QTableWidgetItem(f"{payment.amount:,.2f}")
-                amount_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                amount_item.setForeground(QColor("#0A6CF1"))
-                self.payments_table.setItem(i, 4, amount_item)
-
-                # طريقة الدفع - حساب من الحساب المستلم
-                payment_method = self._get_payment_method_from_account(payment.account_id, accounts_cache)
-                method_item = QTableWidgetItem(payment_method)
-                method_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.payments_table.setItem(i, 5, method_item)
-
-                # الحساب - عرض الاسم بدل الكود
-                account_display = "---"
-                if payment.account_id and payment.account_id in accounts_cache:
-                    account = accounts_cache[payment.account_id]
-                    account_display = f"{account.name} ({account.code})"
-                elif payment.account_id:
-                    account_display = payment.account_id
-                
-                account_item = QTableWidgetItem(account_display)
-                account_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.payments_table.setItem(i, 6, account_item)
-
-                # ارتفاع الصف
-                self.payments_table.setRowHeight(i, 40)
-
-                total_sum += payment.amount
-
-            self.total_label.setText(f"إجمالي التحصيلات: {total_sum:,.2f} ج.م")
-            print(f"INFO: [PaymentsManager] تم جلب {len(self.payments_list)} دفعة.")
+        self.loading_overlay.show_loading("جاري تحميل الدفعات...")
+        data_loader.load(
+            key="PaymentsManager",
+            fetch=self._fetch_payments_data,
+            on_result=self._apply_payments_data,
+            on_error=lambda e: print(f"ERROR: [PaymentsManager] فشل تحميل الدفعات: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+        )
 
-        except Exception as e:
-            print(f"ERROR: [PaymentsManager] فشل تحميل الدفعات: {e}")
+    def _fetch_payments_data(self, token) -> dict:
+        """(في الخلفية) الحسابات والمشاريع والعملاء للـ caches + أول صفحة دفعات + الإجمالي"""
+        repo = self.accounting_service.repo
+
+        # تحميل الحسابات للـ cache (لعرض الأسماء بدل الأكواد)
+        accounts_cache = {acc.code: acc for acc in repo.get_all_accounts()}
+
+        # تحميل المشاريع للـ cache (لعرض أسماء العملاء) - ⚡ row views (الاسم والعميل بس)
+        all_projects = repo.get_all_projects(exclude_status=schemas.ProjectStatus.ARCHIVED, as_views=True)
+        projects_cache = {proj.name: proj for proj in all_projects}
+        token.raise_if_cancelled()
+
+        # تحميل العملاء للـ cache
+        clients_cache = {}
+        for c in repo.get_all_clients(as_views=True):
+            # إضافة العميل بكل الطرق الممكنة للبحث
+            clients_cache[c.name] = c  # بالاسم
+            if c._mongo_id:
+                clients_cache[c._mongo_id] = c  # بالـ mongo_id
+            if c.id:
+                clients_cache[str(c.id)] = c  # بالـ id
+        token.raise_if_cancelled()
+
+        # ⚡ أول صفحة بس (الباقي مع الـ scroll) - والإجمالي من SQL مباشرة
+        return {
+            'accounts': accounts_cache,
+            'projects': projects_cache,
+            'clients': clients_cache,
+            'first_page': repo.get_payments_page(limit=self.payments_model.page_size),
+            'summary': repo.get_payments_summary(),
+        }
+
+    def _apply_payments_data(self, data: dict):
+        """عرض نتيجة _fetch_payments_data (في الـ UI thread)"""
+        self.accounts_cache = data['accounts']
+        self.projects_cache = data['projects']
+        self.clients_cache = data['clients']
+
+        rows, after = data['first_page']
+        self.payments_model.set_first_page(rows, after)
+        payments_count, total_sum = data['summary']
+
+        self.total_label.setText(f"إجمالي التحصيلات: {total_sum:,.2f} ج.م")
+        print(f"INFO: [PaymentsManager] تم جلب {self.payments_model.rowCount()} من {payments_count} دفعة (أول صفحة).")
+
+    def _entity_text(self, payment) -> str:
+        """العميل/المشروع - اسم العميل الحقيقي واسم المشروع"""
+        client_name = "عميل غير محدد"
+        project_name = payment.project_id or "مشروع غير محدد"
+
+        # البحث عن المشروع
+        project = self.projects_cache.get(payment.project_id) if payment.project_id else None
+        if project is not None:
+            project_name = project.name  # اسم المشروع الحقيقي
+            # البحث عن العميل (الـ cache فيه الاسم والـ mongo_id والـ id)
+            client = self.clients_cache.get(project.client_id) if project.client_id else None
+            if client is not None:
+                client_name = client.name
+
+        return f"{client_name} - {project_name}"
+
+    def _account_text(self, payment) -> str:
+        """الحساب - عرض الاسم بدل الكود"""
+        if payment.account_id and payment.account_id in self.accounts_cache:
+            account = self.accounts_cache[payment.account_id]
+            return f"{account.name} ({account.code})"
+        return payment.account_id or "---"
+
+    def _build_columns(self) -> List[TableColumn]:
+        """أعمدة جدول الدفعات"""
+        center = Qt.AlignmentFlag.AlignCenter
+        blue = QColor("#0A6CF1")
+        return [
+            TableColumn("#", lambda payment, row: str(row + 1), alignment=center),
+            TableColumn(
+                "التاريخ",
+                lambda payment, _: payment.date.strftime("%Y-%m-%d") if payment.date else "",
+                alignment=center,
+            ),
+            # النوع (دائماً تحصيل/وارد للدفعات)
+            TableColumn("النوع", lambda payment, _: "💰 وارد", alignment=center, foreground=blue),
+            TableColumn("العميل/المشروع", lambda payment, _: self._entity_text(payment), alignment=center),
+            TableColumn(
+                "المبلغ", lambda payment, _: f"{payment.amount:,.2f}",
+                alignment=center, foreground=blue, sort_key=lambda payment: payment.amount,
+            ),
+            # طريقة الدفع - حساب من الحساب المستلم
+            TableColumn(
+                "طريقة الدفع",
+                lambda payment, _: self._get_payment_method_from_account(payment.account_id, self.accounts_cache),
+                alignment=center,
+            ),
+            TableColumn("الحساب", lambda payment, _: self._account_text(payment), alignment=center),
+        ]
 
     def _on_payments_changed(self):
         """⚡ استجابة لإشارة تحديث الدفعات - تحديث الجدول أوتوماتيك"""
@@ -445,30 +443,10 @@ class PaymentsManagerTab(QWidget):
 
     def get_selected_payment(self) -> Optional[schemas.Payment]:
         """الحصول على الدفعة المحددة"""
-        # محاولة الحصول على الصف من الخلية المحددة
-        current_item = self.payments_table.currentItem()
-        if current_item:
-            current_row = current_item.row()
-        else:
-            current_row = self.payments_table.currentRow()
-        
-        if current_row < 0 or current_row >= len(self.payments_list):
-            return None
-        
-        # الحصول على البيانات من العمود الأول (الرقم)
-        num_item = self.payments_table.item(current_row, 0)
-        if not num_item:
-            return None
-        
-        payment = num_item.data(Qt.ItemDataRole.UserRole)
-        if payment:
-            return payment
-        
-        # fallback: استخدام الفهرس مباشرة
-        if 0 <= current_row < len(self.payments_list):
-            return self.payments_list[current_row]
-        
-        return None
+        selected_rows = self.payments_table.selectionModel().selectedRows()
+        index = selected_rows[0] if selected_rows else self.payments_table.currentIndex()
+        # ⚡ الصف من الـ index نفسه (الجدول بيتعرض من خلال proxy البحث)
+        return index.data(Qt.ItemDataRole.UserRole) if index.isValid() else None
 
     def open_edit_dialog(self):
         """فتح نافذة تعديل الدفعة"""
@@ -481,7 +459,7 @@ class PaymentsManagerTab(QWidget):
         accounts = self._get_cash_accounts()
 
         dialog = PaymentEditorDialog(
-            payment=selected_payment,
+            payment=ensure_model(selected_payment),  # الـ dialog بيعدل الدفعة نفسها
             accounts=accounts,
             accounting_service=self.accounting_service,
             project_service=self.project_service,
@@ -11,6 +11,8 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QTableWidget,
     QTableWidgetItem,
+    QTableView,
+    QAbstractItemView,
     QHeaderView,
     QPushButton,
     QLabel,
@@ -28,12 +30,16 @@ from PyQt6.QtWidgets import (
 from ui.custom_spinbox import CustomSpinBox
 
 from core import schemas
+from core.data_loader import data_loader
+from core.row_views import ensure_model
 from services.client_service import ClientService
 from services.project_service import ProjectService
 from services.service_service import ServiceService
 from services.accounting_service import AccountingService
 from ui.styles import BUTTON_STYLES, TABLE_STYLE, GROUPBOX_STYLE
 from ui.auto_open_combobox import SimpleComboBox
+from ui.loading_overlay import LoadingOverlay
+from ui.paged_table_model import PagedTableModel, TableColumn
 
 
 class ProjectItemDialog(QDialog):
@@ -989,7 +995,6 @@ class ProjectManagerTab(QWidget):
         self.accounting_service = accounting_service
         self.printing_service = printing_service
         self.template_service = template_service
-        self.projects_list: List[schemas.Project] = []
         self.selected_project: Optional[schemas.Project] = None
 
         main_layout = QHBoxLayout()
@@ -1072,11 +1077,23 @@ class ProjectManagerTab(QWidget):
         
         # === UNIVERSAL SEARCH BAR ===
         from ui.universal_search import UniversalSearchBar
-        self.projects_table = QTableWidget()
-        self.projects_table.setColumnCount(5)
-        self.projects_table.setHorizontalHeaderLabels(["رقم الفاتورة", "اسم المشروع", "العميل", "الحالة", "تاريخ البدء"])
+        # ⚡ موديل بيتحمل صفحة صفحة (keyset) بدل QTableWidgetItem لكل خلية
+        self.projects_model = PagedTableModel(
+            [
+                TableColumn("رقم الفاتورة", self._invoice_number),
+                TableColumn("اسم المشروع", lambda project, _: project.name),
+                TableColumn("العميل", lambda project, _: project.client_id),
+                TableColumn("الحالة", lambda project, _: project.status.value),
+                TableColumn("تاريخ البدء", lambda project, _: self._format_date(project.start_date)),
+            ],
+            self._fetch_projects_page,
+            parent=self,
+        )
+        self.projects_table = QTableView()
+        self.projects_table.setModel(self.projects_model)
         
-        # ⚡ تفعيل الترتيب بالضغط على رأس العمود
+        # ⚡ تفعيل الترتيب بالضغط على رأس العمود (من غير ترتيب مبدئي)
+        self.projects_table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self.projects_table.setSortingEnabled(True)
         
         self.search_bar = UniversalSearchBar(
@@ -1086,17 +1103,17 @@ class ProjectManagerTab(QWidget):
         table_layout.addWidget(self.search_bar)
         # === END SEARCH BAR ===
         
-        self.projects_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.projects_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.projects_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.projects_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.projects_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.projects_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.projects_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         self.projects_table.verticalHeader().setDefaultSectionSize(45)  # ⚡ ارتفاع الصفوف
         self.projects_table.verticalHeader().setVisible(False)
-        self.projects_table.itemSelectionChanged.connect(self.on_project_selection_changed)
+        self.projects_table.selectionModel().selectionChanged.connect(self.on_project_selection_changed)
         
 
         # إضافة دبل كليك للتعديل
-        self.projects_table.itemDoubleClicked.connect(self.open_editor_for_selected)
+        self.projects_table.doubleClicked.connect(self.open_editor_for_selected)
         table_layout.addWidget(self.projects_table)
         left_panel.addWidget(table_groupbox, 1)
         main_layout.addLayout(left_panel, 3)
@@ -1133,6 +1150,9 @@ class ProjectManagerTab(QWidget):
 
         main_layout.addWidget(self.preview_groupbox, 1)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
         # ⚡ تحميل البيانات بعد ظهور النافذة (لتجنب التجميد)
         # self.load_projects_data() - يتم استدعاؤها من MainWindow
         self.on_project_selection_changed()
@@ -1165,28 +1185,16 @@ class ProjectManagerTab(QWidget):
         except Exception as e:
             print(f"ERROR: [ProjectManager] فشل تحديث الكارت: {e}")
 
-    def on_project_selection_changed(self):
+    def on_project_selection_changed(self, *args):
         """ (معدلة) تملى لوحة المعاينة بكل التفاصيل """
-        selected_rows = self.projects_table.selectedIndexes()
+        selected_rows = self.projects_table.selectionModel().selectedRows()
         if selected_rows:
-            selected_row = selected_rows[0].row()
-            
-            # ⚡ جلب اسم المشروع من الجدول مباشرة (يعمل مع الترتيب)
-            project_name_item = self.projects_table.item(selected_row, 1)  # عمود اسم المشروع
-            if not project_name_item:
-                return
-            
-            project_name = project_name_item.text()
-            
-            # البحث عن المشروع في القائمة بالاسم
-            self.selected_project = None
-            for proj in self.projects_list:
-                if proj.name == project_name:
-                    self.selected_project = proj
-                    break
-            
-            if not self.selected_project:
+            # ⚡ الصف من الـ index نفسه (يعمل مع الترتيب و proxy البحث) - والـ model الكامل للـ dialogs
+            project_view = selected_rows[0].data(Qt.ItemDataRole.UserRole)
+            if project_view is None:
                 return
+            self.selected_project = ensure_model(project_view)
+            project_name = self.selected_project.name
                 
             self.edit_button.setEnabled(True)
             self.profit_button.setEnabled(True)
@@ -1297,44 +1305,46 @@ class ProjectManagerTab(QWidget):
         self.preview_groupbox.setVisible(False)
 
     def load_projects_data(self):
+        """⚡ تحميل أول صفحة مشاريع في الخلفية - الجدول بيتحدث لما النتيجة توصل"""
         print("INFO: [ProjectManager] جاري تحميل بيانات المشاريع...")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
-        try:
-            # ⚡ تحديث حالات المشاريع أوتوماتيك قبل التحميل
-            self.project_service.update_all_projects_status()
-            
-            # ⚡ تعطيل الترتيب مؤقتاً أثناء التحميل (للسرعة)
-            self.projects_table.setSortingEnabled(False)
-            
-            if self.show_archived_checkbox.isChecked():
-                self.projects_list = self.project_service.get_archived_projects()
-            else:
-                self.projects_list = self.project_service.get_all_projects()
-
-            self.projects_table.setRowCount(0)
-            for row, project in enumerate(self.projects_list):
-                self.projects_table.insertRow(row)
-                # توليد رقم الفاتورة من ID المشروع
-                project_id = getattr(project, '_mongo_id', None) or str(getattr(project, 'id', row + 1))
-                invoice_number = f"SW-{str(project_id)[-4:].zfill(4)}" if project_id else f"SW-{str(row + 1).zfill(4)}"
-                self.projects_table.setItem(row, 0, QTableWidgetItem(invoice_number))
-                self.projects_table.setItem(row, 1, QTableWidgetItem(project.name))
-                self.projects_table.setItem(row, 2, QTableWidgetItem(project.client_id))
-                self.projects_table.setItem(row, 3, QTableWidgetItem(project.status.value))
-                self.projects_table.setItem(row, 4, QTableWidgetItem(self._format_date(project.start_date)))
-
-            # ⚡ إعادة تفعيل الترتيب بعد التحميل
-            self.projects_table.setSortingEnabled(True)
-            
-            self.on_project_selection_changed()
-        except Exception as e:
-            print(f"ERROR: [ProjectManager] فشل تحميل المشاريع: {e}")
-            # ⚡ إعادة تفعيل الترتيب حتى في حالة الخطأ
-            self.projects_table.setSortingEnabled(True)
+
+        # ⚡ تحديث حالات المشاريع أوتوماتيك في الخلفية
+        # (لو في تغيير هيوصل projects_changed والجدول يتحدث تاني)
+        self.project_service.update_all_projects_status_async()
+
+        archived = self.show_archived_checkbox.isChecked()
+        self.loading_overlay.show_loading("جاري تحميل المشاريع...")
+        data_loader.load(
+            key=("ProjectManager", archived),
+            fetch=lambda token: self._fetch_projects_page(None, self.projects_model.page_size, archived=archived),
+            on_result=self._apply_projects_page,
+            on_error=lambda e: print(f"ERROR: [ProjectManager] فشل تحميل المشاريع: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+            group="ProjectManager",
+        )
+
+    def _apply_projects_page(self, first_page):
+        """عرض أول صفحة (في الـ UI thread) - الباقي بيتحمل لما الجدول يوصل لآخره (fetchMore)"""
+        rows, after = first_page
+        self.projects_model.set_first_page(rows, after)
+        print(f"INFO: [ProjectManager] تم جلب {self.projects_model.rowCount()} مشروع (أول صفحة).")
+        self.on_project_selection_changed()
+
+    def _fetch_projects_page(self, after, limit, archived: Optional[bool] = None):
+        """صفحة مشاريع: المؤرشفة بس لو الـ checkbox متعلم - غير كده كل اللي مش مؤرشف"""
+        if archived is None:
+            archived = self.show_archived_checkbox.isChecked()
+        if archived:
+            return self.project_service.repo.get_projects_page(
+                after=after, limit=limit, status=schemas.ProjectStatus.ARCHIVED)
+        return self.project_service.repo.get_projects_page(
+            after=after, limit=limit, exclude_status=schemas.ProjectStatus.ARCHIVED)
+
+    @staticmethod
+    def _invoice_number(project, row: int) -> str:
+        """توليد رقم الفاتورة من ID المشروع"""
+        project_id = project._mongo_id or (str(project.id) if project.id is not None else None)
+        return f"SW-{str(project_id)[-4:].zfill(4)}" if project_id else f"SW-{str(row + 1).zfill(4)}"
 
     def _on_projects_changed(self):
         """⚡ استجابة لإشارة تحديث المشاريع - تحديث الجدول أوتوماتيك"""
@@ -18,7 +18,9 @@ from services.client_service import ClientService
 from services.service_service import ServiceService
 from services.settings_service import SettingsService
 from core import schemas
+from core.data_loader import data_loader
 
+from ui.loading_overlay import LoadingOverlay
 from ui.quotation_editor import QuotationEditorWindow
 from ui.styles import BUTTON_STYLES, TABLE_STYLE
 
@@ -105,10 +107,25 @@ class QuotationManagerTab(QWidget):
 
         layout.addWidget(self.quotes_table)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
     def load_quotations_data(self):
+        """⚡ تحميل عروض الأسعار في الخلفية - الجدول بيتملي لما النتيجة توصل"""
         print("INFO: [QuoteManager] جاري تحميل عروض الأسعار...")
+        self.loading_overlay.show_loading("جاري تحميل عروض الأسعار...")
+        data_loader.load(
+            key="QuoteManager",
+            fetch=lambda token: self.quotation_service.get_all_quotations(),
+            on_result=self._apply_quotations,
+            on_error=lambda e: print(f"ERROR: [QuoteManager] فشل تحميل عروض الأسعار: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+        )
+
+    def _apply_quotations(self, quotations: List[schemas.Quotation]):
+        """ملء جدول عروض الأسعار (في الـ UI thread)"""
         try:
-            self.quotations_list = self.quotation_service.get_all_quotations()
+            self.quotations_list = quotations
             self.quotes_table.setRowCount(0)
 
             colors_map = {
@@ -18,9 +18,11 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QColor
 from services.service_service import ServiceService
 from core import schemas
+from core.data_loader import data_loader
 from core.logger import get_logger
 from typing import List, Optional
 
+from ui.loading_overlay import LoadingOverlay
 from ui.service_editor_dialog import ServiceEditorDialog
 from ui.styles import BUTTON_STYLES, TABLE_STYLE
 
@@ -123,6 +125,9 @@ class ServiceManagerTab(QWidget):
         table_layout.addWidget(self.services_table)
         main_layout.addWidget(table_groupbox, 1)
 
+        # ⚡ overlay التحميل فوق التاب (بيظهر بس لو التحميل في الخلفية طول)
+        self.loading_overlay = LoadingOverlay(self, start_hidden=True)
+
         # ⚡ تحميل البيانات بعد ظهور النافذة (لتجنب التجميد)
         # self.load_services_data() - يتم استدعاؤها من MainWindow
         self.update_buttons_state(False)
@@ -145,18 +150,25 @@ class ServiceManagerTab(QWidget):
     def load_services_data(self) -> None:
         """
         تحميل بيانات الخدمات من قاعدة البيانات وعرضها في الجدول
+        ⚡ الجلب في الخلفية (data_loader) والجدول بيتملي لما النتيجة توصل
         """
         logger.info("[ServiceManager] جاري تحميل بيانات الخدمات")
-        
-        # ⚡ منع التجميد - معالجة الأحداث
-        from PyQt6.QtWidgets import QApplication
-        QApplication.processEvents()
-        
+        archived = self.show_archived_checkbox.isChecked()
+        self.loading_overlay.show_loading("جاري تحميل الخدمات...")
+        data_loader.load(
+            key=("ServiceManager", archived),
+            fetch=lambda token: (self.service_service.get_archived_services() if archived
+                                 else self.service_service.get_all_services()),
+            on_result=self._apply_services,
+            on_error=lambda e: logger.error(f"[ServiceManager] فشل تحميل الخدمات: {e}"),
+            on_finished=self.loading_overlay.hide_loading,
+            group="ServiceManager",
+        )
+
+    def _apply_services(self, services: List[schemas.Service]) -> None:
+        """ملء جدول الخدمات (في الـ UI thread)"""
         try:
-            if self.show_archived_checkbox.isChecked():
-                self.services_list = self.service_service.get_archived_services()
-            else:
-                self.services_list = self.service_service.get_all_services()
+            self.services_list = services
 
             self.services_table.setRowCount(0)
             for index, service in enumerate(self.services_list):
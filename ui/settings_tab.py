@@ -22,6 +22,8 @@ from services.settings_service import SettingsService
 from ui.styles import BUTTON_STYLES, TABLE_STYLE, COLORS
 from ui.currency_editor_dialog import CurrencyEditorDialog
 from core.repository import Repository
+from core.data_loader import data_loader
+from ui.loading_overlay import LoadingOverlay
 import json
 import os
 from datetime import datetime
@@ -282,6 +284,9 @@ class SettingsTab(QWidget):
         self.users_table.setTabKeyNavigation(False)
         self.users_table.setStyleSheet(self._get_table_style())
         layout.addWidget(self.users_table)
+        
+        # ⚡ overlay التحميل فوق تاب المستخدمين
+        self.users_loading_overlay = LoadingOverlay(self.users_tab, start_hidden=True)
 
     def setup_backup_tab(self):
         """إعداد تاب النسخ الاحتياطي"""
@@ -763,8 +768,9 @@ class SettingsTab(QWidget):
                 
                 # جلب قيود اليومية
                 try:
-                    journal_entries = self.repository.get_all_journal_entries()
-                    backup_data["journal_entries"] = [self._serialize_object(j) for j in journal_entries]
+                    backup_data["journal_entries"] = [
+                        self._serialize_object(j) for j in self.repository.get_journal_entries()
+                    ]
                 except Exception as e:
                     print(f"WARNING: فشل جلب قيود اليومية: {e}")
                 
@@ -898,7 +904,7 @@ class SettingsTab(QWidget):
                 expenses_count = len(self.repository.get_all_expenses())
                 accounts_count = len(self.repository.get_all_accounts())
                 currencies_count = len(self.repository.get_all_currencies())
-                journal_count = len(self.repository.get_all_journal_entries())
+                journal_count = self.repository.count_journal_entries()
                 
                 # محاولة جلب المشاريع وعروض الأسعار
                 try:
@@ -1128,16 +1134,29 @@ class SettingsTab(QWidget):
             QMessageBox.critical(self, "خطأ", f"فشل الحفظ: {e}")
 
     def load_users(self):
-        """تحميل المستخدمين من قاعدة البيانات"""
-        self.users_table.setRowCount(0)
-        
+        """تحميل المستخدمين من قاعدة البيانات (⚡ الجلب في الخلفية - الجدول بيتملي لما النتيجة توصل)"""
         if not self.repository:
+            self.users_table.setRowCount(0)
             return
         
+        self.users_loading_overlay.show_loading("جاري تحميل المستخدمين...")
+        data_loader.load(
+            key="SettingsTab.users",
+            fetch=lambda token: self.repository.get_all_users(),
+            on_result=self._apply_users,
+            on_error=self._on_users_load_failed,
+            on_finished=self.users_loading_overlay.hide_loading,
+        )
+    
+    def _on_users_load_failed(self, error: Exception):
+        print(f"ERROR: فشل تحميل المستخدمين: {error}")
+        QMessageBox.warning(self, "خطأ", f"فشل تحميل المستخدمين: {error}")
+    
+    def _apply_users(self, users):
+        """ملء جدول المستخدمين (في الـ UI thread)"""
+        self.users_table.setRowCount(0)
+        
         try:
-            # جلب المستخدمين من قاعدة البيانات
-            users = self.repository.get_all_users()
-            
             for i, user in enumerate(users):
                 self.users_table.insertRow(i)
                 
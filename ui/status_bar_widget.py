@@ -93,6 +93,12 @@ class SyncIndicator(QWidget):
             self.status_text.setText("غير متصل")
             self.status_text.setStyleSheet(f"color: {COLORS['danger']}; background-color: transparent; border: none;")
             
+        elif status == "degraded":
+            # ⚡ الـ circuit breaker مفتوح: MongoDB بطيء/مش بيرد والشغل من البيانات المحلية
+            self.status_icon.setText("🟠")
+            self.status_text.setText("اتصال ضعيف - بيانات محلية")
+            self.status_text.setStyleSheet(f"color: {COLORS['warning']}; background-color: transparent; border: none;")
+            
         elif status == "error":
             self.status_icon.setText("❌")
             self.status_text.setText("خطأ في المزامنة")
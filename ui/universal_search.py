@@ -1,21 +1,184 @@
 """
 Universal Search Widget - Reusable search bar for all tables
+⚡ كل صف ليه مفتاح بحث جاهز: نص كل الأعمدة متوحد (core/text_normalize.py) ومتجمع مرة واحدة
+لما البيانات تتحمل - والكتابة بعدها substring على المفتاح بس (مفيش item.text() لكل خلية)
+- QTableView (موديل): الجدول بيتعرض من خلال RowFilterProxyModel
+- QTableWidget: الصفوف بتتخفى كلها في دفعة واحدة (من غير رسم بين كل صف والتاني)
 """
-from PyQt6.QtWidgets import QLineEdit, QTableWidget
-from PyQt6.QtCore import Qt
+from typing import List, Optional, Sequence, Union
+
+from PyQt6.QtWidgets import QLineEdit, QTableView, QTableWidget
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QSortFilterProxyModel, QTimer
+
+from core.data_loader import CancellationToken, data_loader
+from core.text_normalize import normalize_text
+
+
+def row_search_key(model: QAbstractItemModel, row: int) -> str:
+    """مفتاح البحث لصف: نص كل الأعمدة (DisplayRole) متوحد - كل عمود في سطر"""
+    parts = []
+    for column in range(model.columnCount()):
+        value = model.data(model.index(row, column), Qt.ItemDataRole.DisplayRole)
+        if value is not None:
+            parts.append(str(value))
+    return normalize_text("\n".join(parts))
+
+
+def _match_mask(keys: Sequence[str], needle: str, token: CancellationToken) -> List[bool]:
+    """الصفوف اللي بتطابق (في الخلفية - بيقف لو اتكتب نص أحدث)"""
+    mask = []
+    for start in range(0, len(keys), 2000):
+        token.raise_if_cancelled()
+        mask.extend(needle in key for key in keys[start:start + 2000])
+    return mask
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """
+    ⚡ فلتر صفوف بمفاتيح جاهزة (row_search_key) - المفاتيح بتتحسب مع كل reset / صفحة جديدة /
+    ترتيب / تعديل في الموديل الأصلي، مش مع كل حرف
+    - من WORKER_THRESHOLD صف: التطابق بيتحسب في الخلفية (core.data_loader) والنتيجة بتتطبق
+      مرة واحدة (invalidateFilter = layout change واحد للـ view)
+    - الترتيب بيروح للموديل الأصلي (PagedTableModel بيحمل الباقي ويرتب بـ sort_key)
+    - الصف الكامل: index.data(Qt.ItemDataRole.UserRole) (بيعدي من الـ proxy)
+    """
+
+    WORKER_THRESHOLD = 5000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._keys: List[str] = []
+        self._needle = ""
+        self._mask: Optional[List[bool]] = None
+        self._version = 0  # بيزيد مع أي تغيير في المفاتيح (نتيجة الخلفية القديمة بتتجاهل)
+
+    # --- المفاتيح ---
+
+    def setSourceModel(self, model: QAbstractItemModel):
+        old = self.sourceModel()
+        if old is not None:
+            for signal, slot in self._source_connections(old):
+                try:
+                    signal.disconnect(slot)
+                except (TypeError, RuntimeError):
+                    pass
+        # ⚡ قبل super: المفاتيح بتتحدث قبل ما الـ proxy يعيد الفلترة على نفس الإشارة
+        if model is not None:
+            for signal, slot in self._source_connections(model):
+                signal.connect(slot)
+        super().setSourceModel(model)
+        self._rebuild_keys()
+
+    def _source_connections(self, model: QAbstractItemModel):
+        return (
+            (model.modelReset, self._on_model_reset),
+            (model.layoutChanged, self._rebuild_keys),
+            (model.rowsRemoved, self._rebuild_keys),
+            (model.rowsInserted, self._on_rows_inserted),
+            (model.dataChanged, self._on_data_changed),
+        )
+
+    def _rebuild_keys(self, *args):
+        model = self.sourceModel()
+        self._keys = [row_search_key(model, row) for row in range(model.rowCount())] if model is not None else []
+        self._mask = None
+        self._version += 1
+
+    def _on_model_reset(self):
+        self._rebuild_keys()
+        if self._needle:
+            # إعادة تحميل والمستخدم بيدور: باقي الصفحات بعد ما الـ reset يخلص
+            QTimer.singleShot(0, self._fetch_all_rows)
+
+    def _fetch_all_rows(self):
+        model = self.sourceModel()
+        if model is None:
+            return
+        while model.canFetchMore(QModelIndex()):
+            model.fetchMore(QModelIndex())
+
+    def _on_rows_inserted(self, parent: QModelIndex, first: int, last: int):
+        if parent.isValid():
+            return
+        if first != len(self._keys):
+            self._rebuild_keys()
+            return
+        # صفحة جديدة في الآخر (fetchMore): مفاتيحها بس - والفلتر بيتحسب لها مباشرة
+        model = self.sourceModel()
+        self._keys.extend(row_search_key(model, row) for row in range(first, last + 1))
+
+    def _on_data_changed(self, top_left: QModelIndex, bottom_right: QModelIndex, *args):
+        model = self.sourceModel()
+        for row in range(top_left.row(), min(bottom_right.row() + 1, len(self._keys))):
+            self._keys[row] = row_search_key(model, row)
+        self._mask = None
+        self._version += 1
+
+    # --- الفلترة ---
+
+    @property
+    def filter_text(self) -> str:
+        return self._needle
+
+    def set_filter_text(self, text: str):
+        """فلترة بنص (جزء من أي عمود بعد التوحيد) - النص الفاضي بيعرض الكل"""
+        needle = normalize_text(text.strip())
+        if needle == self._needle:
+            return
+        self._needle = needle
+        self._mask = None
+
+        if needle:
+            # البحث على كل الصفوف مش الصفحات اللي اتحملت بس
+            self._fetch_all_rows()
+
+        if needle and len(self._keys) >= self.WORKER_THRESHOLD:
+            keys, version = tuple(self._keys), self._version
+            data_loader.load(
+                key=("RowFilterProxyModel", id(self), version, needle),
+                fetch=lambda token: _match_mask(keys, needle, token),
+                on_result=lambda mask: self._apply_mask(version, needle, mask),
+                group=f"RowFilterProxyModel:{id(self)}",
+            )
+            return
+        self.invalidateFilter()
+
+    def _apply_mask(self, version: int, needle: str, mask: List[bool]):
+        if version != self._version or needle != self._needle:
+            return
+        self._mask = mask
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if not self._needle:
+            return True
+        mask = self._mask
+        if mask is not None and source_row < len(mask):
+            return mask[source_row]
+        if source_row < len(self._keys):
+            return self._needle in self._keys[source_row]
+        return self._needle in row_search_key(self.sourceModel(), source_row)
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """الترتيب في الموديل الأصلي (الـ proxy بيعرض بنفس ترتيبه)"""
+        model = self.sourceModel()
+        if model is not None:
+            model.sort(column, order)
 
 
 class UniversalSearchBar(QLineEdit):
     """
-    Universal search bar that can filter any QTableWidget in real-time
+    Universal search bar that can filter any QTableWidget (or model-based QTableView) in real-time
     """
-    
-    def __init__(self, table: QTableWidget, placeholder: str = "بحث...", parent=None):
+
+    def __init__(self, table: Union[QTableWidget, QTableView], placeholder: str = "بحث...", parent=None):
         super().__init__(parent)
         self.table = table
+        self.proxy: Optional[RowFilterProxyModel] = None
+        self._widget_keys: Optional[List[str]] = None
         self.setPlaceholderText(placeholder)
         self.setClearButtonEnabled(True)
-        
+
         # Apply styling
         self.setStyleSheet("""
             QLineEdit {
@@ -34,34 +197,53 @@ class UniversalSearchBar(QLineEdit):
                 color: #6B7280;
             }
         """)
-        
+
+        if isinstance(self.table, QTableWidget):
+            # المفاتيح بتتحسب من جديد بعد أي تغيير في الجدول (أول بحث بعده)
+            model = self.table.model()
+            for signal in (model.modelReset, model.layoutChanged, model.rowsInserted,
+                           model.rowsRemoved, model.dataChanged):
+                signal.connect(self._invalidate_widget_keys)
+        else:
+            self._install_proxy()
+
         # Connect search signal
         self.textChanged.connect(self.filter_table)
-    
+
+    def _install_proxy(self) -> bool:
+        """⚡ الجدول بيتعرض من خلال RowFilterProxyModel (قبل ربط الـ selectionModel في الشاشة)"""
+        model = self.table.model()
+        if model is None:
+            return False
+        if isinstance(model, RowFilterProxyModel):
+            self.proxy = model
+            return True
+        self.proxy = RowFilterProxyModel(self.table)
+        self.proxy.setSourceModel(model)
+        self.table.setModel(self.proxy)
+        return True
+
+    def _invalidate_widget_keys(self, *args):
+        self._widget_keys = None
+
     def filter_table(self, search_text: str):
         """
         Filter table rows based on search text (case-insensitive, searches all columns)
         """
-        search_text = search_text.strip().lower()
-        
-        # If search is empty, show all rows
-        if not search_text:
-            for row in range(self.table.rowCount()):
-                self.table.setRowHidden(row, False)
+        if not isinstance(self.table, QTableWidget):
+            if self.proxy is not None or self._install_proxy():
+                self.proxy.set_filter_text(search_text)
             return
-        
-        # Filter rows
-        for row in range(self.table.rowCount()):
-            match_found = False
-            
-            # Search across all columns
-            for col in range(self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item:
-                    cell_text = item.text().lower()
-                    if search_text in cell_text:
-                        match_found = True
-                        break
-            
-            # Hide row if no match found
-            self.table.setRowHidden(row, not match_found)
+
+        needle = normalize_text(search_text.strip())
+        if self._widget_keys is None:
+            model = self.table.model()
+            self._widget_keys = [row_search_key(model, row) for row in range(model.rowCount())]
+
+        # ⚡ كل الصفوف في دفعة واحدة (الرسم بعد الآخر بس)
+        self.table.setUpdatesEnabled(False)
+        try:
+            for row, key in enumerate(self._widget_keys):
+                self.table.setRowHidden(row, bool(needle) and needle not in key)
+        finally:
+            self.table.setUpdatesEnabled(True)